@@ -0,0 +1,221 @@
+'''
+Per-source boilerplate detector for scraped articles.
+Share prompts, "read more" lines and copyright footers repeat across the articles of
+a source (the host of the article link). Every line, and every sentence of a
+multi-sentence line, is normalized and hashed to 64 bits; the model counts in how
+many articles of a source each hash appears. Lines and sentences that appear in
+enough of a source's articles are stripped before the NLP stages run.
+The table is stored compactly as parallel NumPy arrays (source id, hash, count).
+'''
+import glob
+import hashlib
+import os
+import re
+from collections import Counter
+from urllib.parse import urlparse
+
+import numpy as np
+import pandas as pd
+
+BOILERPLATE_PATH = os.getenv("BOILERPLATE_PATH", os.path.join("data", "models", "boilerplate.npz"))
+# Sections that are stripped; headers are kept as they are
+SECTIONS = ["Summary", "Detail"]
+UNKNOWN_SOURCE = "unknown"
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+_DIGITS_RE = re.compile(r"\d+")
+
+
+def source_of(link):
+    """Host of an article link ("www." dropped), the unit boilerplate is learned per."""
+    if not isinstance(link, str):
+        return UNKNOWN_SOURCE
+    host = urlparse(link.strip()).netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    return host or UNKNOWN_SOURCE
+
+
+def line_hash(text):
+    # Case, spacing and numbers (dates, years, counters) do not make a line unique
+    key = _DIGITS_RE.sub("0", " ".join(text.lower().split()))
+    if not key:
+        return None
+    return int.from_bytes(hashlib.blake2b(key.encode("utf8"), digest_size=8).digest(), "little")
+
+
+def _units(line):
+    """The line itself and, when it has several sentences, each of them."""
+    sentences = _SENTENCE_RE.split(line.strip())
+    return [line] + sentences if len(sentences) > 1 else [line]
+
+
+class BoilerplateModel:
+
+    def __init__(self, min_count=5, min_share=0.1, max_lines=500000):
+        # A hash is boilerplate for a source once it appears in at least `min_count`
+        # articles and in at least `min_share` of that source's articles
+        self.min_count = min_count
+        self.min_share = min_share
+        # Lines seen once are pruned when a source's table grows past this size
+        self.max_lines = max_lines
+        self.docs = Counter()
+        self.counts = {}
+        self._boilerplate = {}
+
+    @property
+    def fitted(self):
+        return bool(self.docs)
+
+    # ---------------------
+    # LEARNING
+    # ---------------------
+    def observe(self, link, *texts):
+        """Count the line and sentence hashes of one article (all its sections) for its source."""
+        source = source_of(link)
+        hashes = set()
+        for text in texts:
+            if not isinstance(text, str):
+                continue
+            for line in text.split("\n"):
+                for unit in _units(line):
+                    h = line_hash(unit)
+                    if h is not None:
+                        hashes.add(h)
+        counts = self.counts.setdefault(source, Counter())
+        counts.update(hashes)
+        self.docs[source] += 1
+        if len(counts) > self.max_lines:
+            self.counts[source] = Counter({h: c for h, c in counts.items() if c > 1})
+        self._boilerplate.pop(source, None)
+        return self
+
+    def fit(self, articles):
+        """Observe an iterable of (link, summary, details) tuples."""
+        for link, *texts in articles:
+            self.observe(link, *texts)
+        return self
+
+    def boilerplate_hashes(self, source):
+        hashes = self._boilerplate.get(source)
+        if hashes is None:
+            docs = self.docs.get(source, 0)
+            threshold = max(self.min_count, self.min_share * docs)
+            counts = self.counts.get(source, {})
+            hashes = frozenset(h for h, c in counts.items() if c >= threshold)
+            self._boilerplate[source] = hashes
+        return hashes
+
+    def covers(self, link):
+        """True when boilerplate has been learned for the source of `link`."""
+        return bool(self.boilerplate_hashes(source_of(link)))
+
+    # ---------------------
+    # STRIPPING
+    # ---------------------
+    def strip(self, link, text):
+        """(text without boilerplate lines and sentences, number of characters removed)."""
+        if not isinstance(text, str) or not text:
+            return text, 0
+        hashes = self.boilerplate_hashes(source_of(link))
+        if not hashes:
+            return text, 0
+        kept = []
+        for line in text.split("\n"):
+            if line_hash(line) in hashes:
+                continue
+            units = _units(line)
+            if len(units) > 1:
+                sentences = [s for s in units[1:] if line_hash(s) not in hashes]
+                if len(sentences) < len(units) - 1:
+                    line = " ".join(sentences)
+            kept.append(line)
+        stripped = "\n".join(kept)
+        return stripped, len(text) - len(stripped)
+
+    def strip_article(self, row):
+        """Copy of a scraped row (Series or dict) with its sections stripped, and the characters removed."""
+        row = row.copy()
+        removed = 0
+        for section in SECTIONS:
+            if section in row:
+                row[section], n = self.strip(row.get("Link"), row[section])
+                removed += n
+        return row, removed
+
+    # ---------------------
+    # PERSISTENCE
+    # ---------------------
+    def save(self, path=BOILERPLATE_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        sources = sorted(self.docs)
+        source_ids, hashes, counts = [], [], []
+        for i, source in enumerate(sources):
+            # Hashes seen in a single article can never become boilerplate, they are not kept
+            table = [(h, c) for h, c in self.counts.get(source, {}).items() if c > 1]
+            source_ids.extend([i] * len(table))
+            hashes.extend(h for h, _ in table)
+            counts.extend(c for _, c in table)
+        with open(path, "wb") as f:
+            np.savez_compressed(
+                f,
+                sources=np.array(sources, dtype=str),
+                docs=np.array([self.docs[s] for s in sources], dtype=np.int64),
+                source_ids=np.array(source_ids, dtype=np.int32),
+                hashes=np.array(hashes, dtype=np.uint64),
+                counts=np.array(counts, dtype=np.uint32),
+                params=np.array([self.min_count, self.min_share, self.max_lines], dtype=np.float64),
+            )
+        return path
+
+    @staticmethod
+    def load(path=BOILERPLATE_PATH):
+        with np.load(path) as data:
+            min_count, min_share, max_lines = data["params"]
+            model = BoilerplateModel(int(min_count), float(min_share), int(max_lines))
+            sources = data["sources"].tolist()
+            model.docs = Counter(dict(zip(sources, data["docs"].tolist())))
+            for source in sources:
+                model.counts[source] = Counter()
+            for i, h, c in zip(data["source_ids"].tolist(), data["hashes"].tolist(), data["counts"].tolist()):
+                model.counts[sources[i]][h] = c
+        return model
+
+
+_boilerplate_model = None
+
+
+def get_boilerplate_model(path=BOILERPLATE_PATH):
+    """Shared model loaded from disk once per process; None when none has been trained."""
+    global _boilerplate_model
+    if _boilerplate_model is None and os.path.exists(path):
+        _boilerplate_model = BoilerplateModel.load(path)
+    return _boilerplate_model
+
+
+def train(articles, path=BOILERPLATE_PATH, model=None):
+    """Count (link, summary, details) articles into `model` (or a new one) and save it to `path`."""
+    model = (model or BoilerplateModel()).fit(articles)
+    model.save(path)
+    return model
+
+
+def main():
+    # Learn over the scraped corpus, continuing from the saved table if there is one
+    def articles():
+        for filename in glob.iglob(r'/opt/bitnami/spark/data/Scrapper/2024/**/*.csv', recursive=True):
+            df = pd.read_csv(filename, index_col=None, header=0, dtype="string")
+            for row in df.itertuples(index=False):
+                row = row._asdict()
+                yield row.get("Link"), row.get("Summary"), row.get("Detail")
+
+    model = BoilerplateModel.load() if os.path.exists(BOILERPLATE_PATH) else None
+    model = train(articles(), model=model)
+    print(f"Boilerplate table learned from {sum(model.docs.values())} articles of {len(model.docs)} sources, "
+          f"saved to {BOILERPLATE_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,446 @@
+'''
+Batch driver for the parser.
+Scraped CSVs are streamed in chunks; every chunk is a shard that a worker process
+(with the parser and its models loaded once) turns into one JSONL file. Completed
+shards are recorded in a checkpoint, so a crashed run started again skips straight
+past them. A manifest records size, mtime and content hash of every fully processed
+input file with the shards it produced, so reruns only touch new or changed files,
+and watch mode polls the scraper folder to process new CSVs as they land.
+Results go to JSONL shards, a partitioned Parquet store (results_store.py) or both.
+Progress and the final report are given in articles per second, with the time per
+article spent in each parser stage (boilerplate, location, time, topics, sentiment)
+and the boilerplate characters stripped before the NLP stages.
+With dedup on, near-duplicate articles (the same story from another outlet, found by
+MinHash/LSH against every article seen so far) are dropped before a shard is sent to
+the workers; the LSH index is kept in the output folder across runs.
+'''
+import argparse
+import glob
+import hashlib
+import json
+import os
+import pathlib
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import pandas as pd
+
+from Parsing_Tools.results_store import PARQUET_DIR, write_results, remove_shard
+from utils.minhash import MinHasher, LSHIndex
+
+INPUT_GLOB = r'/opt/bitnami/spark/data/Scrapper/2024/**/*.csv'
+OUTPUT_DIR = './data/Parser/shards'
+CHECKPOINT = '_checkpoint.json'
+MANIFEST = '_manifest.json'
+DEDUP_INDEX = '_dedup.npz'
+# Columns whose text is compared for near-duplicates
+DEDUP_COLUMNS = ["Header", "Summary", "Detail"]
+CHUNK_SIZE = 500
+WORKERS = os.cpu_count() or 1
+# Watch mode: seconds between scans, and how long a file must stay untouched before
+# it is considered completely written by the scraper
+POLL_INTERVAL = 30.0
+SETTLE_SECONDS = 5.0
+
+
+# ---------------------
+# WORKER SIDE
+# ---------------------
+_parser = None
+
+
+def _init_worker():
+    # Build the parser once per worker process, the models load with its module
+    global _parser
+    from Parsing_Tools.parser import parser
+    _parser = parser()
+
+
+def process_article(row, timings=None, counters=None):
+    """Same result as one iteration of the former parser.main loop, None when no location is found."""
+    result = _parser.parse_article(row, timings, counters)
+    return result.to_dict() if result is not None else None
+
+
+def process_shard(shard_id, frame, output_dir, output_format="jsonl", parquet_dir=None):
+    """
+    Parse one shard and write it as <shard_id>.jsonl (the file only appears once
+    complete) and/or into the partitioned Parquet store.
+    """
+    if _parser is None:
+        _init_worker()
+    start = time.time()
+    to_jsonl = output_format in ("jsonl", "both")
+    to_parquet = output_format in ("parquet", "both")
+    path = os.path.join(output_dir, f"{shard_id}.jsonl")
+    results = []
+    written = 0
+    timings = {}
+    counters = {}
+    out = open(path + ".tmp", "w", encoding="utf8") if to_jsonl else None
+    try:
+        for _, row in frame.iterrows():
+            result = process_article(row, timings, counters)
+            if result is None:
+                continue
+            if out is not None:
+                out.write(json.dumps(result, default=str))
+                out.write("\n")
+            if to_parquet:
+                results.append(result)
+            written += 1
+    finally:
+        if out is not None:
+            out.close()
+    if to_parquet:
+        write_results(results, shard_id, parquet_dir or PARQUET_DIR)
+    if to_jsonl:
+        os.replace(path + ".tmp", path)
+    return shard_id, len(frame), written, time.time() - start, timings, counters
+
+
+# ---------------------
+# DRIVER SIDE
+# ---------------------
+def shard_id_for(filename, content_hash, chunk):
+    # Stem for readability, path hash so equal file names in different folders never
+    # collide, content hash so a rewritten file never reuses stale shards
+    path = pathlib.PurePath(filename)
+    digest = hashlib.sha1(str(path).encode("utf8")).hexdigest()[:8]
+    return f"{path.stem}-{digest}-{content_hash[:8]}-{chunk:05d}"
+
+
+def file_hash(filename, block_size=1 << 20):
+    digest = hashlib.sha1()
+    with open(filename, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def iter_chunks(filename, chunk_size):
+    """DataFrame chunks of one CSV, read lazily in `chunk_size` rows."""
+    reader = pd.read_csv(filename, index_col=None, header=0, dtype="string", chunksize=chunk_size)
+    for frame in reader:
+        # Fill NaN values with "No data"
+        yield frame.fillna("No data")
+
+
+def _load_json(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, encoding="utf8") as f:
+        return json.load(f)
+
+
+def _save_json(path, data):
+    with open(path + ".tmp", "w", encoding="utf8") as f:
+        json.dump(data, f)
+    os.replace(path + ".tmp", path)
+
+
+def load_checkpoint(output_dir):
+    return _load_json(os.path.join(output_dir, CHECKPOINT), {"completed": {}})
+
+
+def save_checkpoint(output_dir, checkpoint):
+    _save_json(os.path.join(output_dir, CHECKPOINT), checkpoint)
+
+
+def load_manifest(output_dir):
+    return _load_json(os.path.join(output_dir, MANIFEST), {"files": {}})
+
+
+def save_manifest(output_dir, manifest):
+    _save_json(os.path.join(output_dir, MANIFEST), manifest)
+
+
+def merge_shards(output_dir, target):
+    """Write every shard into one JSON array at `target` (the former data.json), streaming."""
+    first = True
+    with open(target, "w", encoding="utf8") as out:
+        out.write("[\n")
+        for path in sorted(glob.glob(os.path.join(output_dir, "*.jsonl"))):
+            with open(path, encoding="utf8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    if not first:
+                        out.write(",\n")
+                    out.write(line)
+                    first = False
+        out.write("\n]\n")
+    return target
+
+
+class BatchDriver:
+
+    def __init__(self, output_dir=OUTPUT_DIR, chunk_size=CHUNK_SIZE, workers=WORKERS, report_every=10.0,
+                 output_format="jsonl", parquet_dir=PARQUET_DIR, dedup=False):
+        if output_format not in ("jsonl", "parquet", "both"):
+            raise ValueError(f"Unknown output format: {output_format}")
+        self.output_dir = output_dir
+        self.output_format = output_format
+        self.parquet_dir = parquet_dir
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.report_every = report_every
+        os.makedirs(output_dir, exist_ok=True)
+        self.checkpoint = load_checkpoint(output_dir)
+        self.manifest = load_manifest(output_dir)
+        self.dedup = None
+        if dedup:
+            path = os.path.join(output_dir, DEDUP_INDEX)
+            self.dedup = LSHIndex.load(path) if os.path.exists(path) else LSHIndex()
+            self._hasher = MinHasher(self.dedup.num_perm)
+        self._pool = None
+        # filename -> (file state, shard ids) for files whose shards are still running
+        self._open_files = {}
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.stats = {"files": 0, "unchanged": 0, "shards": 0, "skipped": 0, "articles": 0, "written": 0, "stages": {},
+                      "chars": 0, "boilerplate_chars": 0, "duplicates": 0}
+        self._started = time.time()
+        self._last_report = self._started
+
+    # ---------------------
+    # MANIFEST
+    # ---------------------
+    def changed(self, filename):
+        """File state {"size", "mtime", "sha1"} when `filename` is new or changed, None otherwise."""
+        st = os.stat(filename)
+        known = self.manifest["files"].get(filename)
+        if known and known["size"] == st.st_size and known["mtime"] == st.st_mtime:
+            return None
+        state = {"size": st.st_size, "mtime": st.st_mtime, "sha1": file_hash(filename)}
+        if known and known["sha1"] == state["sha1"]:
+            # Touched but identical, only refresh the stat fields
+            known.update(size=state["size"], mtime=state["mtime"])
+            save_manifest(self.output_dir, self.manifest)
+            return None
+        return state
+
+    def _drop_shards(self, filename):
+        # Remove the output of a previous version of a changed file
+        known = self.manifest["files"].pop(filename, None)
+        if not known:
+            return
+        for shard_id in known["shards"]:
+            self.checkpoint["completed"].pop(shard_id, None)
+            path = os.path.join(self.output_dir, f"{shard_id}.jsonl")
+            if os.path.exists(path):
+                os.remove(path)
+            remove_shard(shard_id, self.parquet_dir)
+        save_checkpoint(self.output_dir, self.checkpoint)
+        save_manifest(self.output_dir, self.manifest)
+
+    def _close_files(self):
+        # A file enters the manifest once every one of its shards has completed
+        completed = self.checkpoint["completed"]
+        closed = [f for f, (_, shards) in self._open_files.items() if all(s in completed for s in shards)]
+        for filename in closed:
+            state, shards = self._open_files.pop(filename)
+            self.manifest["files"][filename] = dict(state, shards=shards)
+        if closed:
+            save_manifest(self.output_dir, self.manifest)
+
+    # ---------------------
+    # NEAR-DUPLICATES
+    # ---------------------
+    def drop_duplicates(self, frame):
+        """
+        `frame` without the rows that near-duplicate an article already indexed (or an
+        earlier row of the frame); the rest are added to the index. Articles are keyed
+        on their link (their text hash without one), so a file that is processed again
+        is not matched against itself.
+        """
+        columns = [c for c in DEDUP_COLUMNS if c in frame.columns]
+        texts = frame[columns].astype(str).agg("\n".join, axis=1).tolist() if columns else [""] * len(frame)
+        links = frame["Link"].tolist() if "Link" in frame.columns else [None] * len(frame)
+        keep = []
+        for text, link in zip(texts, links):
+            if isinstance(link, str) and link != "No data":
+                key = link
+            else:
+                key = hashlib.sha1(text.encode("utf8")).hexdigest()
+            if key in self.dedup:
+                keep.append(True)
+                continue
+            signature = self._hasher.signature(text)
+            if self.dedup.query(signature) is not None:
+                keep.append(False)
+                continue
+            self.dedup.insert(key, signature)
+            keep.append(True)
+        self.stats["duplicates"] += len(keep) - sum(keep)
+        return frame[keep]
+
+    def save_dedup(self):
+        if self.dedup is not None:
+            path = os.path.join(self.output_dir, DEDUP_INDEX)
+            self.dedup.save(path + ".tmp")
+            os.replace(path + ".tmp", path)
+
+    # ---------------------
+    # PROCESSING
+    # ---------------------
+    def report(self, final=False):
+        stats = self.stats
+        elapsed = max(time.time() - self._started, 1e-9)
+        rate = stats["articles"] / elapsed
+        label = "Done" if final else "Progress"
+        print(f"{label}: {stats['files']} files ({stats['unchanged']} unchanged), {stats['shards']} shards, "
+              f"{stats['articles']} articles ({stats['written']} with location, {stats['skipped']} shards skipped) "
+              f"in {elapsed:.1f}s -> {rate:.1f} articles/sec")
+        if stats["stages"] and stats["articles"]:
+            # Worker time per processed article, per stage
+            stages = ", ".join(f"{name} {seconds / stats['articles'] * 1000:.1f}ms" for name, seconds in stats["stages"].items())
+            print(f"  per article: {stages}")
+        if stats["boilerplate_chars"]:
+            removed = stats["boilerplate_chars"]
+            kept = stats["chars"] - removed
+            line = f"  boilerplate: {removed} of {stats['chars']} chars removed ({removed / max(stats['chars'], 1):.1%})"
+            if kept > 0:
+                # NLP stage cost scales with text length: the stripped characters would have
+                # cost about removed/kept of the time spent on the characters that remained
+                nlp_seconds = sum(v for k, v in stats["stages"].items() if k != "boilerplate")
+                line += f", stage time saved ~{nlp_seconds * removed / kept:.1f}s (estimate, not measured)"
+            print(line)
+        if self.dedup is not None:
+            print(f"  near-duplicates dropped before parsing: {stats['duplicates']}")
+        stats["articles_per_sec"] = rate
+        return rate
+
+    def _finish(self, future):
+        shard_id, n_in, n_out, seconds, timings, counters = future.result()
+        self.checkpoint["completed"][shard_id] = {
+            "articles": n_in, "written": n_out, "seconds": round(seconds, 3),
+            "stages": {name: round(value, 3) for name, value in timings.items()},
+            "boilerplate_chars": counters.get("boilerplate_chars", 0),
+        }
+        save_checkpoint(self.output_dir, self.checkpoint)
+        for name, value in timings.items():
+            self.stats["stages"][name] = self.stats["stages"].get(name, 0.0) + value
+        self.stats["chars"] += counters.get("chars", 0)
+        self.stats["boilerplate_chars"] += counters.get("boilerplate_chars", 0)
+        self.stats["shards"] += 1
+        self.stats["articles"] += n_in
+        self.stats["written"] += n_out
+
+    def process(self, filenames):
+        """Process the new or changed files among `filenames`; returns the run statistics."""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        completed = self.checkpoint["completed"]
+        pending = set()
+        for filename in filenames:
+            state = self.changed(filename)
+            if state is None:
+                self.stats["unchanged"] += 1
+                continue
+            self._drop_shards(filename)
+            self.stats["files"] += 1
+            shards = []
+            for chunk, frame in enumerate(iter_chunks(filename, self.chunk_size)):
+                shard_id = shard_id_for(filename, state["sha1"], chunk)
+                shards.append(shard_id)
+                if shard_id in completed:
+                    self.stats["skipped"] += 1
+                    continue
+                if self.dedup is not None:
+                    frame = self.drop_duplicates(frame)
+                pending.add(self._pool.submit(
+                    process_shard, shard_id, frame, self.output_dir, self.output_format, self.parquet_dir
+                ))
+                # Bounded number of shards in flight keeps memory flat
+                if len(pending) >= 2 * self.workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self._finish(future)
+                    self._close_files()
+                if time.time() - self._last_report >= self.report_every:
+                    self.report()
+                    self._last_report = time.time()
+            # Fully read: closed into the manifest as soon as its last shard completes
+            self._open_files[filename] = (state, shards)
+            self.save_dedup()
+        for future in pending:
+            self._finish(future)
+        self._close_files()
+        return self.stats
+
+    def run(self, input_glob=INPUT_GLOB):
+        return self.process(sorted(glob.iglob(input_glob, recursive=True)))
+
+    def watch(self, input_glob=INPUT_GLOB, poll_interval=POLL_INTERVAL, settle_seconds=SETTLE_SECONDS, iterations=None):
+        """
+        Keep processing CSVs as they appear or change. A file is picked up on the first
+        scan after it has stayed unmodified for `settle_seconds`, so the latency is
+        bounded by poll_interval + settle_seconds + its own processing time.
+        """
+        n = 0
+        while iterations is None or n < iterations:
+            now = time.time()
+            ready = [
+                f for f in sorted(glob.iglob(input_glob, recursive=True))
+                if now - os.stat(f).st_mtime >= settle_seconds
+            ]
+            self.reset_stats()
+            stats = self.process(ready)
+            if stats["files"]:
+                self.report(final=True)
+            n += 1
+            if iterations is None or n < iterations:
+                time.sleep(poll_interval)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+def run(input_glob=INPUT_GLOB, output_dir=OUTPUT_DIR, chunk_size=CHUNK_SIZE, workers=WORKERS, merge_to=None, report_every=10.0,
+        output_format="jsonl", parquet_dir=PARQUET_DIR, dedup=False):
+    driver = BatchDriver(output_dir, chunk_size, workers, report_every, output_format, parquet_dir, dedup)
+    try:
+        driver.run(input_glob)
+    finally:
+        driver.close()
+    driver.report(final=True)
+    if merge_to and output_format != "parquet":
+        merge_shards(output_dir, merge_to)
+    return driver.stats
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Run the parser over the scraped CSVs")
+    ap.add_argument("--input-glob", default=INPUT_GLOB)
+    ap.add_argument("--output-dir", default=OUTPUT_DIR)
+    ap.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    ap.add_argument("--workers", type=int, default=WORKERS)
+    ap.add_argument("--merge-to", default=None, help="Also write all results as one JSON array")
+    ap.add_argument("--format", choices=["jsonl", "parquet", "both"], default="jsonl",
+                    help="JSONL shards, a month/province partitioned Parquet store (needs pyarrow), or both")
+    ap.add_argument("--parquet-dir", default=PARQUET_DIR)
+    ap.add_argument("--dedup", action="store_true",
+                    help="Drop near-duplicates of already seen articles before they are parsed")
+    ap.add_argument("--watch", action="store_true", help="Keep polling the input folder for new or changed CSVs")
+    ap.add_argument("--poll-interval", type=float, default=POLL_INTERVAL)
+    ap.add_argument("--settle-seconds", type=float, default=SETTLE_SECONDS)
+    args = ap.parse_args()
+    if args.watch:
+        driver = BatchDriver(args.output_dir, args.chunk_size, args.workers,
+                             output_format=args.format, parquet_dir=args.parquet_dir, dedup=args.dedup)
+        try:
+            driver.watch(args.input_glob, args.poll_interval, args.settle_seconds)
+        finally:
+            driver.close()
+    else:
+        run(args.input_glob, args.output_dir, args.chunk_size, args.workers, args.merge_to,
+            output_format=args.format, parquet_dir=args.parquet_dir, dedup=args.dedup)
+
+
+if __name__ == "__main__":
+    main()
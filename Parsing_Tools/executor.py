@@ -0,0 +1,102 @@
+'''
+Executor-style batch API for distributed runs.
+parse_batches() takes an iterator of pandas DataFrames in the scraper schema and
+yields one result DataFrame per input batch, so it can be handed to Spark directly:
+
+    df.mapInPandas(parse_batches, schema=RESULT_SCHEMA)
+
+The parser (spaCy, the gazetteer, sentiment lexicons, the topic model) is built once
+per executor process and reused for every batch. Every article goes through
+parser.locate_article, the per-article part of parse_article used by the batch driver
+(boilerplate, location, focus time); sentiment and topics are then computed per batch.
+run_local() runs the same function over a multiprocessing pool, so it can be tested
+without a cluster.
+'''
+import glob
+from multiprocessing import Pool
+
+import pandas as pd
+
+from Parsing_Tools.results_store import flatten
+
+# Scraper columns, by name
+HEADER = "Header"
+DETAIL = "Detail"
+PICTURE = "Pic_url"
+
+RESULT_COLUMNS = [
+    "month", "province", "focusTime", "creationDate", "focusLocation",
+    "header", "summary", "details", "link", "category", "topics", "sentiment", "picture",
+]
+
+# Spark DDL schema of the yielded DataFrames
+RESULT_SCHEMA = (
+    "month string, province string, focusTime string, creationDate string, focusLocation string, "
+    "header string, summary string, details string, link string, category string, "
+    "topics array<string>, sentiment double, picture string"
+)
+
+_parser = None
+
+
+def get_parser():
+    """Parser shared by every batch of this executor process."""
+    global _parser
+    if _parser is None:
+        from Parsing_Tools.parser import parser
+        _parser = parser()
+    return _parser
+
+
+def parse_frame(frame):
+    """Result DataFrame (RESULT_COLUMNS) for one scraper batch; articles without a location are dropped."""
+    Parser = get_parser()
+    from Parsing_Tools.parser import ArticleResult
+    frame = frame.fillna("No data")
+    located = [
+        article for article in (Parser.locate_article(row) for _, row in frame.iterrows()) if article is not None
+    ]
+    if not located:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+
+    # Batched per located article: one sentiment pass and one topic transform
+    sentiments = Parser.get_sentiment_bulk([row[HEADER] for row, _, _ in located])
+    topics = Parser.extract_topics_bulk([row[DETAIL] for row, _, _ in located])
+
+    rows = []
+    for (row, location, time_data), sentiment, article_topics in zip(located, sentiments, topics):
+        picture = row[PICTURE] if PICTURE in row else None
+        result = ArticleResult(location, time_data, article_topics, sentiment, picture)
+        rows.append(flatten(result.to_dict()))
+    return pd.DataFrame(rows, columns=RESULT_COLUMNS)
+
+
+def parse_batches(iterator):
+    """mapInPandas-compatible: iterator of scraper DataFrames -> iterator of result DataFrames."""
+    for frame in iterator:
+        yield parse_frame(frame)
+
+
+# ---------------------
+# LOCAL RUNNER
+# ---------------------
+def _parse_one(frame):
+    return parse_frame(frame)
+
+
+def iter_csv_batches(input_glob, batch_size=500):
+    """Scraper CSVs as DataFrame batches of at most `batch_size` rows."""
+    for filename in sorted(glob.iglob(input_glob, recursive=True)):
+        yield from pd.read_csv(filename, index_col=None, header=0, dtype="string", chunksize=batch_size)
+
+
+def run_local(batches, workers=None):
+    """
+    Run parse_batches over a local process pool (one parser per process, like one per
+    executor) and return all results as one DataFrame.
+    """
+    with Pool(processes=workers, initializer=get_parser) as pool:
+        results = list(pool.imap(_parse_one, batches))
+    if not results:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+    return pd.concat(results, ignore_index=True)
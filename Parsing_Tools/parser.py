@@ -15,13 +15,19 @@ import pathlib
 import json
 from sutime import SUTime
 from datetime import datetime
-import datefinder
 import numpy as np
 import csv
 import os
+import threading
+import time
+from functools import lru_cache
 from copy import deepcopy
-from Parsing_Tools.timetag import TimeTag
-from dateparser.search import search_dates
+from types import MappingProxyType
+from Parsing_Tools.timetag import TimeTag, TagStore
+from Parsing_Tools.sentiment import get_vader, get_sentiment_bulk
+from Parsing_Tools.topicmodel import get_topic_model
+from Parsing_Tools.temporal import get_tagger
+from Parsing_Tools.boilerplate import get_boilerplate_model
 
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.decomposition import NMF
@@ -33,60 +39,110 @@ import nltk
 nltk.download('vader_lexicon')
 nlp = spacy.load('en_core_web_sm', disable=['ner', 'textcat'])
 
-# Main parser class that handles all the information extraction
-class parser():
-    def __init__(self):
-        self.index = {}
-        self.city = ""
-        self.Data_of_region = {}
-        self.cities = {}
+# One lemmatizer per process; WordNet is loaded on first use (under a lock, its lazy
+# corpus loader is not thread safe) and every lemma is memoized
+_lemmatizer = None
+_lemmatizer_lock = threading.Lock()
 
-    # Function to clean the string
-    def clean(self, doc):
-        # Convert all alphabets to lower case
-        doc = doc.lower()
-        # Loading string in to nlp model 
-        doc = nlp(doc)
-        # Tokenizing the string
-
-        tokens = [tokens.lower_ for tokens in doc]
-        # Removing all stopping words from the string
-        tokens = [tokens for tokens in doc if (tokens.is_stop == False)]
-        # Removing all punctuation from the string
-        tokens = [tokens for tokens in tokens if (tokens.is_punct == False)]
-        # Changing all verbs to its base form (changing - > change , changed -> change etc)
-        try:
-            final_token = [WordNetLemmatizer().lemmatize(token.text)
-                       for token in tokens]
-        except:
-            # If modules are not loaded properly 
-            import nltk
-            nltk.download('wordnet')
-            nltk.download('omw-1.4')
-            final_token = [WordNetLemmatizer().lemmatize(token.text)
-                       for token in tokens]
-        
-        # Returning back the final string 
-        return " ".join(final_token)
 
-    
-    # Converting string into sentences 
-    def sentences(self, text):
-        # split sentences and questions
-        text = re.split('[.?]', text)
-        clean_sent = []
-        for sent in text:
-            clean_sent.append(sent)
-        return clean_sent
+def get_lemmatizer():
+    global _lemmatizer
+    if _lemmatizer is None:
+        with _lemmatizer_lock:
+            if _lemmatizer is None:
+                lemmatizer = WordNetLemmatizer()
+                try:
+                    lemmatizer.lemmatize("warm")
+                except LookupError:
+                    # If modules are not loaded properly
+                    nltk.download('wordnet')
+                    nltk.download('omw-1.4')
+                _lemmatizer = lemmatizer
+    return _lemmatizer
 
-    # Load cities from data set provided by ECP Election commission of Pakistan
-    def load_cities(self, file):
+
+@lru_cache(maxsize=200000)
+def lemmatize(word):
+    return get_lemmatizer().lemmatize(word)
+
+
+# Cleaned form of a lexeme, keyed on its orth id (None for stop words and punctuation).
+# Both flags are lexeme attributes, so clean() only needs the tokenizer.
+@lru_cache(maxsize=100000)
+def _clean_lexeme(orth):
+    lexeme = nlp.vocab[orth]
+    return None if lexeme.is_stop or lexeme.is_punct else lemmatize(lexeme.text)
+
+
+def _clean_form(token):
+    return _clean_lexeme(token.orth)
+
+
+def _join_clean(doc):
+    return " ".join(form for form in map(_clean_form, doc) if form is not None)
+
+# Scraper column holding the creation date, by name (sources differ)
+CREATION_DATE_COLUMNS = ["Creation date", "Creation_Date", "CreationDate", "Date"]
+
+
+def creation_date(row):
+    for column in CREATION_DATE_COLUMNS:
+        if column in row:
+            return row[column]
+    raise KeyError(f"No creation date column, expected one of {CREATION_DATE_COLUMNS}")
+
+# Location dataset provided by ECP Election commission of Pakistan
+CITIES_FILE = os.getenv("CITIES_FILE", "/opt/bitnami/spark/data/Parser/Alldata_refined.csv")
+
+
+class ReferenceData:
+    """
+    Gazetteer loaded from the ECP dataset. It is built once and never mutated, so a
+    single instance is shared by every call and every thread using a parser.
+    """
+
+    def __init__(self, regions, index, locations=None):
+        # Sorted, de-duplicated lower case location names
+        self.regions = tuple(regions)
+        # First alphabet -> index of the last location starting with it
+        self.index = MappingProxyType(dict(index))
+        # Upper case names of every location in the dataset, to validate the chosen city
+        self.locations = frozenset(locations if locations is not None else (r.upper() for r in self.regions))
+        self.first_word_matches = lru_cache(maxsize=100000)(self.first_word_matches)
+
+    def first_word_matches(self, word):
+        """
+        Split names of the locations whose first word fuzzy-matches `word`, None when
+        the first alphabet of `word` has no range in the index.
+        """
+        index = self.index
+        try:
+            # Extracting the start and end index where the first alphabet of proper noun matches with the the location loaded
+            end = index[word[0]]
+            if end == index['a']:
+                start = 0
+            else:
+                start = index[chr(ord(word[0])-1)] + 1
+        except (KeyError, IndexError):
+            return None
+        matches = []
+        # Check only those entries which first alphabet matches with the first alphabet of proper noun
+        for areas in range(start, end):
+            words = self.regions[areas].split()
+            # Check the match (not exact matching of the noun and the location)
+            if words and fuzz.ratio(word, words[0]) >= 95:
+                matches.append(tuple(words))
+        return tuple(matches)
+
+    @classmethod
+    def load(cls, file=CITIES_FILE):
         # Loading dataset
         df = pd.read_csv(file)
         # Droping NULL rows
         df = df.dropna()
         # Extracting location col
         df = df["Locations"]
+        locations = {each_city.upper() for each_city in df.values.tolist()}
         # Converting Data frame to sorted list in lower case
         Data_of_region = df.values.tolist()
         Data_of_region = [each_city.lower() for each_city in Data_of_region]
@@ -111,8 +167,90 @@ class parser():
                 start = i
                 current_alphabet = Data_of_region[i][0]
                 index.__setitem__(current_alphabet, start)
-        self.index = index
-        self.Data_of_region = Data_of_region
+        return cls(Data_of_region, index, locations)
+
+
+class LocationResult:
+    """Focus location of one article ("null" when none) and the weight of every candidate location."""
+
+    def __init__(self, city, cities):
+        self.city = city
+        self.cities = cities
+
+    def __repr__(self):
+        return f'city: {self.city}, cities: {self.cities}'
+
+
+class ArticleResult:
+    """Everything extracted from one article; to_dict() gives the record written by the batch driver."""
+
+    def __init__(self, location, time, topics, sentiment, picture=None):
+        self.location = location
+        self.time = time
+        self.topics = topics
+        self.sentiment = sentiment
+        self.picture = picture
+
+    def to_dict(self):
+        results = dict(self.time)
+        results["focusLocation"] = self.location.city
+        results["topics"] = self.topics
+        results["sentiment"] = self.sentiment
+        if self.picture is not None:
+            results["picture"] = self.picture
+        return results
+
+
+# Main parser class that handles all the information extraction.
+# Loaded models and reference data are read-only and every extraction returns its own
+# result, so one instance can serve many threads at once.
+class parser():
+    def __init__(self, reference=None):
+        # Immutable reference data, loaded on first use when not given
+        self._reference = reference
+        self._reference_lock = threading.Lock()
+        # Last result of Get_location, kept for older callers (not safe to share across threads)
+        self.city = ""
+        self.cities = {}
+
+    @property
+    def reference(self):
+        if self._reference is None:
+            with self._reference_lock:
+                if self._reference is None:
+                    self._reference = ReferenceData.load(CITIES_FILE)
+        return self._reference
+
+    @property
+    def index(self):
+        return self.reference.index
+
+    @property
+    def Data_of_region(self):
+        return self.reference.regions
+
+    # Function to clean the string: lower case, without stop words and punctuation, lemmatized
+    # (changing - > change , changed -> change etc). Only the tokenizer runs, no tagger or parser
+    def clean(self, doc):
+        return _join_clean(nlp.tokenizer(doc.lower()))
+
+    # Same output as clean() for many strings, streamed through the tokenizer
+    def clean_bulk(self, docs, batch_size=1000):
+        return [_join_clean(doc) for doc in nlp.tokenizer.pipe((d.lower() for d in docs), batch_size=batch_size)]
+
+    
+    # Converting string into sentences 
+    def sentences(self, text):
+        # split sentences and questions
+        text = re.split('[.?]', text)
+        clean_sent = []
+        for sent in text:
+            clean_sent.append(sent)
+        return clean_sent
+
+    # Load cities from data set provided by ECP Election commission of Pakistan
+    def load_cities(self, file):
+        self._reference = ReferenceData.load(file)
 
 
         # Define a function to preprocess the text
@@ -155,11 +293,26 @@ class parser():
         return topics
     
     def extract_topics(self, details):
-        topics_nmf = self.topic_model_nmf(list(self.preprocess_text(details).split(" ")), num_topics=3, num_words=3)
-        topics_lda = self.Lda(list(self.preprocess_text(details).split(" ")), num_topics=3, num_words=3)
+        preprocessed = self.preprocess_text(details)
+        # Transform against the shared corpus-level model when one has been trained
+        model = get_topic_model()
+        if model is not None and model.fitted:
+            return model.article_topics([preprocessed], num_topics=3, num_words=3)[0]
+        # Fallback: per-article NMF and LDA over the article's own words
+        words = preprocessed.split(" ")
+        topics_nmf = self.topic_model_nmf(words, num_topics=3, num_words=3)
+        topics_lda = self.Lda(words, num_topics=3, num_words=3)
         topics = [topic for topic in topics_lda if topic in topics_nmf]
         return topics
 
+    def extract_topics_bulk(self, details):
+        """extract_topics for a list of articles, transformed as one batch when a model is available."""
+        model = get_topic_model()
+        if model is not None and model.fitted:
+            preprocessed = [self.preprocess_text(d) for d in details]
+            return model.article_topics(preprocessed, num_topics=3, num_words=3)
+        return [self.extract_topics(d) for d in details]
+
     def get_sentiment_tb(self, text):
         """
         This function takes a paragraph as string and returns the sentiment analysis 
@@ -175,7 +328,7 @@ class parser():
         This function takes a paragraph as string and returns the sentiment analysis 
         on the scale of 0 to 1, where 0 means most negative and 1 means really good.
         """
-        sid = SentimentIntensityAnalyzer()
+        sid = get_vader()
         sentiment_scores = sid.polarity_scores(text)
         compound_score = sentiment_scores['compound']
         normalized_score = (compound_score + 1) / 2  # Normalize the score to a range of 0 to 1
@@ -196,22 +349,14 @@ class parser():
         #     sentiment = "null"
         return final_score
 
+    def get_sentiment_bulk(self, texts):
+        """Same scores as get_sentiment for a list of texts, scored as one batch."""
+        return get_sentiment_bulk(texts)
 
-    def createTags(self, tags):
-        tagValues = []
-        newTags = []
-        for tag in tags:
-            try: 
-                tagValues.append(list(datefinder.find_dates(tag[0]))[0])
-                newTags.append(tag)
-            except:
-                pass
-        tagValues, indices, counts = np.unique(tagValues, return_index=True, return_counts=True)
-        newTags = [newTags[index] for index in indices]
-        newtags = []
-        for i in range(len(newTags)):
-            newtags.append(TimeTag(newTags[i][1], counts[i]))
-        return newtags
+
+    def createTags(self, tags, textType="details", textLength=0):
+        # One TimeTag per distinct date, weighted by section and position, best first
+        return TagStore().add(tags, textType, textLength).time_tags()
 
     # Function adds another element to the Timetags with the text type i.e header, summary or detail
     def addTextType(self, tags, textType):
@@ -219,13 +364,11 @@ class parser():
             tag["textType"] = textType
         return tags
 
-    # FGet location from the extracted news 
-    def Get_location(self, read_more, header):
-        # flag = False
-       
-        if len(self.index) <= 0:
-            # Loading data set of ECP Election commission of Pakistan 
-            self.load_cities("/opt/bitnami/spark/data/Parser/Alldata_refined.csv")
+    # Get location from the extracted news. Only reads shared state, so it is safe to call concurrently
+    def locate(self, read_more, header):
+        # Loading data set of ECP Election commission of Pakistan (once, shared)
+        reference = self.reference
+        locations = reference.locations
         # Clean header of news
         header = self.clean(header)
         # Split header
@@ -235,9 +378,8 @@ class parser():
         flag = False
         # Dictionary to store the City counts from news
         cities = dict()
-        for i in text:
-            # For each sentence in the article load it in nlp model
-            doc = nlp(i)
+        # Every sentence of the article goes through the nlp model in one batch
+        for doc in nlp.pipe(text):
             # A skipper variable  
             jump = 0
             # Foe each word in the sentence 
@@ -250,39 +392,28 @@ class parser():
                     # Check if the extracted word is a proper noun
                     if doc[token].pos_ == "PROPN":
                         flag = False
-                        # Extracting the start and end index where the first alphabet of proper noun matches with the the location loaded
-                        # From ECP data
-                        end = self.index[doc[token].text.lower()[0]]
-                        if end == self.index['a']:
-                            start = 0
-                        else:
-                            start = chr(ord(doc[token].text.lower()[0])-1)
-                            # print(self.index, start)
-                            start = self.index[start]
-                            start += 1
+                        # Locations from ECP data whose first word matches the proper noun (memoized per word)
+                        matches = reference.first_word_matches(doc[token].text.lower())
+                        if matches is None:
+                            continue
                         area_count = 0
                         previous = ""
-                        # Check only those entries which first alphabet matches with the first alphabet of proper noun
-                        for areas in range(start, end):
-                            words = self.Data_of_region[areas].split()
+                        for words in matches:
                             subtoken = token
-                            checker = []
-                            # Check the match (not exact matching of the noun and the location)
-                            if fuzz.ratio(doc[subtoken].text.lower(),words[0])>=95:
-                                checker.append(words[0])
-                                for iterator in range(len(words)-1):
-                                    # If first token matches extract more data from sentence and compare it for full name of the location
-                                    if subtoken + (iterator + 1 ) < len(doc):
-                                        if fuzz.ratio(doc[subtoken + iterator+1 ].text.lower(),words[iterator+1])>=70:
-                                            checker.append(words[iterator+1])
-                                city = ' '.join(checker)
-                                # If noun and the location matches (turn on the match flag)
-                                if len(previous) < len(city): 
-                                    area_count = len(checker)
-                                    flag = True
-                                    previous = city
-                                else:
-                                    city = previous
+                            checker = [words[0]]
+                            for iterator in range(len(words)-1):
+                                # If first token matches extract more data from sentence and compare it for full name of the location
+                                if subtoken + (iterator + 1 ) < len(doc):
+                                    if fuzz.ratio(doc[subtoken + iterator+1 ].text.lower(),words[iterator+1])>=70:
+                                        checker.append(words[iterator+1])
+                            city = ' '.join(checker)
+                            # If noun and the location matches (turn on the match flag)
+                            if len(previous) < len(city): 
+                                area_count = len(checker)
+                                flag = True
+                                previous = city
+                            else:
+                                city = previous
                         # Check if the extracted location has any match with the header
                         if flag == True:
                             match = False
@@ -312,81 +443,57 @@ class parser():
                     # print("entering exception")
                     continue
         # Extract the maximum count which will represent the focused locaiton of the news
-        self.city = max(cities, key=cities.get, default="null")
-        if self.city == 0:
-            print(cities)
-        df = pd.read_csv("/opt/bitnami/spark/data/Parser/Alldata_refined.csv")
-        # Droping NULL rows
-        df = df.dropna()
-        # Extracting location col
-        # Only keeping locations that are actually present in our database
-        df["Locations"] = df["Locations"].apply(lambda x: x.upper())
+        focus = max(cities, key=cities.get, default="null")
         # Check if the extracted location is present in our database
-        if df[df["Locations"] == self.city.upper()].empty:
-            if self.city != "null":
+        if focus.upper() not in locations:
+            if focus != "null":
                 flag = False
                 cityList = sorted(((v,k) for k,v in cities.items()), reverse=True)
                 for city in cityList:
-                    if df[df["Locations"] == city[1].upper()].empty == False:
-                        self.city = city[1]
+                    if city[1].upper() in locations:
+                        focus = city[1]
                         flag = True
                         break
             
             if flag == False: 
-                self.city = "null"
-        self.cities = cities
+                focus = "null"
+        return LocationResult(focus, cities)
+
+    # Older entry point: stores the result on the instance
+    def Get_location(self, read_more, header):
+        result = self.locate(read_more, header)
+        self.city = result.city
+        self.cities = result.cities
+        return result
 
     # Our main focus time extraction function. Takes in a dataframe of news article and returns the focus location in a dictionary
-    def Get_Time(self, data, timeData):
+    # strip_footer drops the second to last line of the details (the scraped footer); not
+    # needed when the boilerplate model has stripped the article with a table for its source
+    def Get_Time(self, data, timeData, strip_footer=True):
         tags = []
-        settings = {'PREFER_DAY_OF_MONTH': 'first', 'RELATIVE_BASE': datetime.strptime(data[6], "%Y-%m-%d")}
-        # timeData[data[0]] = dict()
-        # headerParse = list(datefinder.find_dates(data[1], index=True, source=True, first="month", base_date=datetime.datetime.strptime(data[6], "%Y-%m-%d")))
-        headers = data[1].split("\n")
-        # print(headers)
-        headerParse = [search_dates(header, settings=settings) for header in headers]
-        headerParse1 = search_dates(data[1], settings=settings)
-        headerParse.append(headerParse1)
-
-        summaries = data[2].split("\n")
-        # print(summaries)
-        summaryParse = [search_dates(summary, settings=settings) for summary in summaries]
-        # summaryParse = list(datefinder.find_dates(data[2], index=True, source=True, first="month", base_date=datetime.datetime.strptime(data[6], "%Y-%m-%d")))
-        
-        summaryParse1 = search_dates(data[2], settings=settings)
-        summaryParse.append(summaryParse1)
+        base = datetime.strptime(data[6], "%Y-%m-%d")
+        tagger = get_tagger()
+        # Each section is scanned once; dateparser only sees the candidate spans
+        headerParse = tagger.tag(data[1], base)
 
-        # # headerParse = sutime.parse(data[1], reference_date=data[6])
-        # # headerParse = addTextType(headerParse, "Header")
-        
-        # # summaryParse = sutime.parse(data[2], reference_date=data[6])
-        # # summaryParse = addTextType(summaryParse, "Summary")
-        
-        details = data[3]
-        lines = details.split('\n')
-        del lines[-2]
-        details = '\n'.join(lines)    
-        # print(lines)
-        detailsParse = [search_dates(detail1, settings=settings) for detail1 in lines]
-        # detailsParse = [item for sublist in detailsParse for item in sublist]
-        # detailsParse = list(datefinder.find_dates(details, index=True, source=True, first="month", base_date=datetime.datetime.strptime(data[6], "%Y-%m-%d")))
-        detailsParse1 = search_dates(details, settings=settings)
-        detailsParse.append(detailsParse1)
-        tags = headerParse + summaryParse + detailsParse
-        
-        # # # print(tags)
+        summaryParse = tagger.tag(data[2], base)
 
-        # timeData["tags"] = tags
-        tags = [tag for tag in tags if isinstance(tag, type(None)) == False]
-        tags = [item for sublist in tags for item in sublist]
-
-
-        try:
-            tags = self.createTags(tags)
-        # # # print(tags)
-            tags = sorted(tags, key=lambda x: x.weight, reverse=True)
+        details = data[3]
+        if strip_footer:
+            lines = details.split('\n')
+            del lines[-2]
+            details = '\n'.join(lines)
+        detailsParse = tagger.tag(details, base)
+
+        store = TagStore()
+        store.add(headerParse, "header", len(data[1]))
+        store.add(summaryParse, "summary", len(data[2]))
+        store.add(detailsParse, "details", len(details))
+        tags = store.time_tags()
+
+        if tags:
             timeData["focusTime"] = tags[0].date.date().strftime('%Y-%m-%d')
-        except:
+        else:
             timeData["focusTime"] = data[6]
         
         timeData["CreationDate"] = data[6]
@@ -413,53 +520,72 @@ class parser():
 
     # Main function which executes the get location to extract focus location
     def read(self, dataFrame):
-        self.Get_location(dataFrame["Detail"], dataFrame["Header"])
-        return self.city
+        return self.locate(dataFrame["Detail"], dataFrame["Header"]).city
+
+    # Boilerplate stripped row, location and focus time of one scraped row, the per-article
+    # part of parse_article; None when no location is found. Batch callers (Parsing_Tools/executor.py)
+    # score the topics and sentiment of the located rows themselves.
+    # When a `timings` dict is given, the seconds spent in each stage are added to it, and a
+    # `counters` dict gets the characters of the article and the boilerplate characters removed
+    def locate_article(self, row, timings=None, counters=None):
+        stage = _stages(timings)
+
+        boilerplate = get_boilerplate_model()
+        if counters is not None:
+            counters["chars"] = counters.get("chars", 0) + sum(
+                len(row[section]) for section in ("Summary", "Detail") if isinstance(row[section], str)
+            )
+        if boilerplate is not None and boilerplate.fitted:
+            row, removed = boilerplate.strip_article(row)
+            if counters is not None:
+                counters["boilerplate_chars"] = counters.get("boilerplate_chars", 0) + removed
+            stage("boilerplate")
+
+        location = self.locate(row["Detail"], row["Header"])
+        stage("location")
+        if location.city == "null":
+            return None
+        # Get_Time reads the sections positionally: header, summary, details, link, category, date
+        data = [None, row["Header"], row["Summary"], row["Detail"], row["Link"], row["Category"], creation_date(row)]
+        # The positional footer cut stays for sources without a learned boilerplate table
+        covered = boilerplate is not None and boilerplate.fitted and boilerplate.covers(row.get("Link"))
+        time_data = self.Get_Time(data, dict(), strip_footer=not covered)
+        stage("time")
+        return row, location, time_data
+
+    # Location, focus time, topics and sentiment of one scraped row; None when no location is found.
+    # `timings` and `counters` as for locate_article
+    def parse_article(self, row, timings=None, counters=None):
+        located = self.locate_article(row, timings, counters)
+        if located is None:
+            return None
+        row, location, time_data = located
+        stage = _stages(timings)
+        topics = self.extract_topics(row["Detail"])
+        stage("topics")
+        sentiment = self.get_sentiment(row["Header"])
+        stage("sentiment")
+        return ArticleResult(location, time_data, topics, sentiment, row["Pic_url"] if "Pic_url" in row else None)
+
+
+def _stages(timings):
+    # stage(name) adds the seconds since the previous call (or since _stages) to timings[name]
+    clock = time.perf_counter()
+
+    def stage(name):
+        nonlocal clock
+        now = time.perf_counter()
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + now - clock
+        clock = now
+    return stage
 
 
 def main():
-    li = []
-    jsonObject = []
-    Parser = parser()
-    # Read files one by one
-    for filename in glob.iglob(r'/opt/bitnami/spark/data/Scrapper/2024/**/*.csv', recursive=True):
-        
-        path = pathlib.PurePath(filename)
-        fileName = path.name[:-4]
-
-        # print("FILENAME: ",filename)
-        df = pd.read_csv(filename, index_col=None, header=0, dtype="string")
-        # Fill NaN values with "No data"
-        df.fillna("No data", inplace=True)  # Replace NaN with "No data"
-        # df['Creation_Date'] = path.parent.name
-        # print("Now parsing", filename)
-        li.append(df)
-
-        df = pd.concat(li, axis=0, ignore_index=True)
-        
-    print(df)
-    for i in range(len(df)):
-        # print("ITER")
-        results = dict()
-        # Extract focus location
-        city = Parser.read(df.loc[i])
-        # Only extract focus time if location found
-        if city != "null":
-            # Extract focus time and save to dictionary
-            results = Parser.Get_Time(list(df.loc[i]), results)
-            results["focusLocation"] = city
-            results["topics"] = Parser.extract_topics(df.iloc[i]["Detail"])
-            results["sentiment"] = Parser.get_sentiment(df.iloc[i]["Header"])
-            if "Pic_url" in df.iloc[i]:
-                results["picture"] = df.iloc[i]["Pic_url"]
-            jsonObject.append(deepcopy(results))
-        else:
-            continue
-    # read funtion, get time function, get topics, get sentiment functions for text & (list of text) for bulk
-    print(f"JSON DUMP: {jsonObject}")
-    print("ENTERING DATA INTO JSON FILE. ")
-    with open("./data/Parser/data.json", "w") as file:
-        json.dump(jsonObject, file, indent=4)
+    # Streaming, sharded and resumable run over the scraped CSVs (see Parsing_Tools/driver.py).
+    # Results are written per shard as JSONL and merged into the former data.json at the end.
+    from Parsing_Tools.driver import run
+    run(merge_to="./data/Parser/data.json")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,120 @@
+'''
+Columnar results store for parsed articles.
+Every shard of the batch driver is written as Parquet files in a hive-partitioned
+dataset (month=YYYY-MM/province=...), keyed on focusTime month and the province of
+focusLocation. Article text columns are zstd-compressed. Readers filter on the
+partition columns and select columns, so a trend or location query only opens the
+partitions and columns it needs.
+Requires pyarrow (optional dependency, only imported by the parquet output mode).
+'''
+import glob
+import os
+
+from utils.admin_map import province_of
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = ds = pq = None
+
+PARQUET_DIR = './data/Parser/parquet'
+PARTITIONS = ["month", "province"]
+UNKNOWN = "unknown"
+TEXT_COLUMNS = ["header", "summary", "details"]
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("Parquet output needs pyarrow (pip install pyarrow)")
+
+
+def _schema():
+    return pa.schema([
+        ("month", pa.string()),
+        ("province", pa.string()),
+        ("focusTime", pa.string()),
+        ("creationDate", pa.string()),
+        ("focusLocation", pa.string()),
+        ("header", pa.string()),
+        ("summary", pa.string()),
+        ("details", pa.string()),
+        ("link", pa.string()),
+        ("category", pa.string()),
+        ("topics", pa.list_(pa.string())),
+        ("sentiment", pa.float64()),
+        ("picture", pa.string()),
+    ])
+
+
+def flatten(result):
+    """One row of the store from a parser result dict (as produced by the batch driver)."""
+    focus = result.get("focusTime") or ""
+    location = result.get("focusLocation")
+    sentiment = result.get("sentiment")
+    return {
+        "month": focus[:7] if len(focus) >= 7 else UNKNOWN,
+        "province": province_of(location) or UNKNOWN,
+        "focusTime": focus or None,
+        "creationDate": result.get("CreationDate"),
+        "focusLocation": location,
+        "header": result.get("Header", {}).get("Text"),
+        "summary": result.get("Summary", {}).get("Text"),
+        "details": result.get("Details", {}).get("Text"),
+        "link": result.get("Link"),
+        "category": result.get("Category"),
+        "topics": [str(t) for t in result.get("topics") or []],
+        "sentiment": float(sentiment) if sentiment is not None else None,
+        "picture": result.get("picture"),
+    }
+
+
+def write_results(results, shard_id, root=PARQUET_DIR):
+    """Write one shard of results into the partitioned dataset; returns the number of rows."""
+    _require_pyarrow()
+    rows = [flatten(r) for r in results]
+    if not rows:
+        return 0
+    table = pa.Table.from_pylist(rows, schema=_schema())
+    # Deterministic file names per shard: a rerun of the shard overwrites its own files
+    pq.write_to_dataset(
+        table,
+        root_path=root,
+        partition_cols=PARTITIONS,
+        basename_template=f"{shard_id}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+        compression={c: ("zstd" if c in TEXT_COLUMNS else "snappy") for c in table.column_names if c not in PARTITIONS},
+    )
+    return len(rows)
+
+
+def remove_shard(shard_id, root=PARQUET_DIR):
+    for path in glob.glob(os.path.join(root, "**", f"{shard_id}-*.parquet"), recursive=True):
+        os.remove(path)
+
+
+def read_results(root=PARQUET_DIR, columns=None, start_month=None, end_month=None, provinces=None, locations=None, to_pandas=True):
+    """
+    Read the store with partition pruning and column projection.
+    start_month/end_month are inclusive "YYYY-MM" bounds; provinces and locations
+    restrict to those values.
+    """
+    _require_pyarrow()
+    dataset = ds.dataset(root, format="parquet", partitioning="hive")
+    conditions = []
+    if start_month or end_month:
+        conditions.append(ds.field("month") != UNKNOWN)
+    if start_month:
+        conditions.append(ds.field("month") >= start_month)
+    if end_month:
+        conditions.append(ds.field("month") <= end_month)
+    if provinces:
+        conditions.append(ds.field("province").isin(list(provinces)))
+    if locations:
+        conditions.append(ds.field("focusLocation").isin(list(locations)))
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    table = dataset.to_table(columns=columns, filter=expression)
+    return table.to_pandas() if to_pandas else table
@@ -1,10 +1,32 @@
+import re
+import string
+from functools import lru_cache
+
+import numpy as np
 from textblob import TextBlob
+from textblob.en import sentiment as pattern_sentiment
+from textblob._text import EMOTICONS, RE_EMOTICONS, RE_SARCASM
 from nltk.sentiment.vader import SentimentIntensityAnalyzer
 
+# Shared VADER analyzer, the lexicon is only read from disk once per process
+_vader = None
+
+
+def get_vader():
+    global _vader
+    if _vader is None:
+        try:
+            _vader = SentimentIntensityAnalyzer()
+        except LookupError:
+            import nltk
+            nltk.download('vader_lexicon')
+            _vader = SentimentIntensityAnalyzer()
+    return _vader
+
 
 def get_sentiment_tb(text):
     """
-    This function takes a paragraph as string and returns the sentiment analysis 
+    This function takes a paragraph as string and returns the sentiment analysis
     on the scale of 0 to 1, where 0 means most negative and 1 means really good.
     """
     blob = TextBlob(text)
@@ -14,10 +36,10 @@ def get_sentiment_tb(text):
 
 def get_sentiment_nl(text):
     """
-    This function takes a paragraph as string and returns the sentiment analysis 
+    This function takes a paragraph as string and returns the sentiment analysis
     on the scale of 0 to 1, where 0 means most negative and 1 means really good.
     """
-    sid = SentimentIntensityAnalyzer()
+    sid = get_vader()
     sentiment_scores = sid.polarity_scores(text)
     compound_score = sentiment_scores['compound']
     normalized_score = (compound_score + 1) / 2  # Normalize the score to a range of 0 to 1
@@ -27,4 +49,263 @@ def get_sentiment(text):
     scoretb = get_sentiment_tb(text)
     scorenl = get_sentiment_nl(text)
     final_score = ((scorenl + scoretb)) / 2
-    return final_score 
+    return final_score
+
+def get_sentiment_bulk(texts):
+    """
+    Same scores as get_sentiment for a list of texts, computed with the batch scorer
+    so every text is tokenized once for both lexicons.
+    """
+    scores = get_batch_scorer().score(texts)
+    return [((s["vader"] + 1) / 2 + (s["textblob"] + 1) / 2) / 2 for s in scores]
+
+
+'''
+Batch scorer combining VADER and TextBlob (pattern) lexicons.
+Every text is split on whitespace once; both lexicons derive their tokens from that
+single split and the per-token normalisation is cached across the whole process.
+A vocabulary shared by both lexicons is kept as arrays so that, for a whole batch,
+the texts that contain no lexicon word at all are resolved with a few NumPy ops.
+Only texts with hits go through the VADER and pattern rule passes, which give the
+same numbers as polarity_scores() and TextBlob(text).sentiment. They follow the nltk
+and textblob versions pinned in requirements.txt, tests/test_sentiment_parity.py
+checks them against both libraries.
+'''
+_PUNCT = set(string.punctuation)
+_PARAGRAPH = re.compile(r"\n{2,}")
+_CLOSERS = {"”", "’", "...", ".", "!", "?", ")"}
+_EMPTY_VADER = {"neg": 0.0, "neu": 0.0, "pos": 0.0, "compound": 0.0}
+_NEUTRAL_VADER = {"neg": 0.0, "neu": 1.0, "pos": 0.0, "compound": 0.0}
+
+
+class _LoadedSentiment(type(pattern_sentiment)):
+    # pattern's lexicon with the lazy-loading indirection removed from lookups
+    __contains__ = dict.__contains__
+    __getitem__ = dict.__getitem__
+
+
+class BatchSentimentScorer:
+
+    def __init__(self, vader=None):
+        self.vader = vader or get_vader()
+        if dict.__len__(pattern_sentiment) == 0:
+            pattern_sentiment.load()
+        self.pattern = _LoadedSentiment(
+            negations=pattern_sentiment.negations,
+            modifiers=pattern_sentiment.modifiers,
+            modifier=pattern_sentiment.modifier,
+            tokenizer=pattern_sentiment.tokenizer,
+        )
+        dict.update(self.pattern, pattern_sentiment)
+        dict.update(self.pattern.labeler, pattern_sentiment.labeler)
+        self._punc_list = set(self.vader.constants.PUNC_LIST)
+
+        # Array-backed lookup over the union of both lexicons
+        self.vocab = {}
+        for word in self.vader.lexicon:
+            self.vocab.setdefault(word, len(self.vocab))
+        vader_size = len(self.vocab)
+        # pattern also scores emoticons and the sarcasm mark "(!)"
+        emoticons = sorted({e.lower() for faces in EMOTICONS.values() for e in faces})
+        pattern_words = list(dict.keys(self.pattern)) + emoticons + ["(!)"]
+        for word in pattern_words:
+            self.vocab.setdefault(word, len(self.vocab))
+        self.in_vader = np.zeros(len(self.vocab) + 1, dtype=bool)
+        self.in_vader[:vader_size] = True
+        self.in_pattern = np.zeros(len(self.vocab) + 1, dtype=bool)
+        self.in_pattern[[self.vocab[word] for word in pattern_words]] = True
+        # Last slot is the "unknown word" id
+        self._unknown = len(self.vocab)
+
+        self._vader_token = lru_cache(maxsize=200000)(self._vader_token)
+        self._pattern_tokens = lru_cache(maxsize=200000)(self._pattern_tokens)
+        self._negated = lru_cache(maxsize=200000)(self._negated)
+
+    # ---------------------
+    # TOKENS (derived from one whitespace split)
+    # ---------------------
+    def _vader_token(self, token):
+        """Same result as nltk's SentiText for one whitespace token (leading/trailing punctuation stripped)."""
+        lead = 0
+        while lead < len(token) and token[lead] in _PUNCT:
+            lead += 1
+        rest = token[lead:]
+        if lead and len(rest) > 1 and token[:lead] in self._punc_list and not any(c in _PUNCT for c in rest):
+            return rest
+        trail = len(token)
+        while trail > 0 and token[trail - 1] in _PUNCT:
+            trail -= 1
+        rest = token[:trail]
+        if trail < len(token) and len(rest) > 1 and token[trail:] in self._punc_list and not any(c in _PUNCT for c in rest):
+            return rest
+        return token
+
+    def _pattern_tokens(self, token):
+        """pattern's tokenizer output for one whitespace token, lowercased."""
+        return tuple(" ".join(self.pattern.tokenizer(token)).lower().split())
+
+    def _tokenize(self, text):
+        raw = text.split()
+        vader_words = [self._vader_token(t) for t in raw if len(t) > 1]
+        # pattern treats a paragraph break as the end of a sentence, but closing
+        # marks right after it still belong to the previous sentence. Sarcasm
+        # marks and emoticons spanning whitespace are only joined within one.
+        segments = []
+        for paragraph in _PARAGRAPH.split(text.replace("\r\n", "\n")):
+            words = [w for t in paragraph.split() for w in self._pattern_tokens(t)]
+            if segments:
+                n = 0
+                while n < len(words) and words[n] in _CLOSERS:
+                    n += 1
+                segments[-1].extend(words[:n])
+                words = words[n:]
+            segments.append(words)
+        pattern_words = []
+        for words in segments:
+            words = RE_SARCASM.sub("(!)", " ".join(words))
+            words = RE_EMOTICONS.sub(lambda m: m.group(1).replace(" ", "") + m.group(2), words)
+            pattern_words.extend(words.split())
+        return vader_words, pattern_words
+
+    def _hits(self, token_lists, mask):
+        """Number of lexicon words per text, computed over the flattened batch."""
+        lengths = np.fromiter((len(t) for t in token_lists), dtype=np.int64, count=len(token_lists))
+        if lengths.sum() == 0:
+            return lengths
+        get = self.vocab.get
+        unknown = self._unknown
+        ids = np.fromiter((get(w, unknown) for tokens in token_lists for w in tokens), dtype=np.int64, count=int(lengths.sum()))
+        owner = np.repeat(np.arange(len(token_lists)), lengths)
+        return np.bincount(owner, weights=mask[ids], minlength=len(token_lists))
+
+    # ---------------------
+    # RULE PASSES (only for texts with lexicon hits)
+    # ---------------------
+    def _negated(self, lower):
+        return lower in self.vader.constants.NEGATE or "n't" in lower
+
+    def _valence(self, i, item, words, lower, negated, is_cap_diff):
+        """nltk's sentiment_valence for a lexicon word, with negation flags precomputed per token."""
+        vader = self.vader
+        constants = vader.constants
+        lexicon = vader.lexicon
+        valence = lexicon[lower[i]]
+        if item.isupper() and is_cap_diff:
+            if valence > 0:
+                valence += constants.C_INCR
+            else:
+                valence -= constants.C_INCR
+        for start_i in range(0, 3):
+            j = i - (start_i + 1)
+            if i > start_i and lower[j] not in lexicon:
+                s = constants.scalar_inc_dec(words[j], valence, is_cap_diff)
+                if start_i == 1 and s != 0:
+                    s = s * 0.95
+                if start_i == 2 and s != 0:
+                    s = s * 0.9
+                valence = valence + s
+                # _never_check
+                if start_i == 0:
+                    if negated[i - 1]:
+                        valence = valence * constants.N_SCALAR
+                elif start_i == 1:
+                    if words[i - 2] == "never" and (words[i - 1] == "so" or words[i - 1] == "this"):
+                        valence = valence * 1.5
+                    elif negated[j]:
+                        valence = valence * constants.N_SCALAR
+                else:
+                    if (
+                        words[i - 3] == "never"
+                        and (words[i - 2] == "so" or words[i - 2] == "this")
+                        or (words[i - 1] == "so" or words[i - 1] == "this")
+                    ):
+                        valence = valence * 1.25
+                    elif negated[j]:
+                        valence = valence * constants.N_SCALAR
+                    valence = vader._idioms_check(valence, words, i)
+        return vader._least_check(valence, words, i)
+
+    def _vader_rules(self, words, lower, text):
+        vader = self.vader
+        lexicon = vader.lexicon
+        boosters = vader.constants.BOOSTER_DICT
+        negated = [self._negated(w) for w in lower]
+        allcaps = sum(1 for w in words if w.isupper())
+        is_cap_diff = 0 < len(words) - allcaps < len(words)
+        # VADER always evaluates a repeated word at its first position, so the
+        # valence is computed once per distinct word; only lexicon words need
+        # the full rule set, everything else contributes 0
+        valence = {}
+        last = len(words) - 1
+        for i, item in enumerate(words):
+            if item in valence:
+                continue
+            low = lower[i]
+            if (i < last and low == "kind" and lower[i + 1] == "of") or low in boosters or low not in lexicon:
+                valence[item] = 0
+            else:
+                valence[item] = self._valence(i, item, words, lower, negated, is_cap_diff)
+        sentiments = [valence[item] for item in words]
+        sentiments = vader._but_check(lower, sentiments)
+        return vader.score_valence(sentiments, text)
+
+    def _pattern_rules(self, words):
+        assessments = self.pattern.assessments(((w, None) for w in words), True)
+        polarity = 0
+        for _, p, _, _ in assessments:
+            polarity += p
+        return polarity / float(len(assessments) or 1)
+
+    # ---------------------
+    # PUBLIC API
+    # ---------------------
+    def vader_scores(self, texts):
+        """VADER polarity_scores dicts (neg/neu/pos/compound) for a batch of texts."""
+        return self._score(texts, textblob=False)["vader"]
+
+    def textblob_scores(self, texts):
+        """TextBlob polarity (-1..1) for a batch of texts."""
+        return self._score(texts, vader=False)["textblob"]
+
+    def score(self, texts):
+        """Return [{"vader": compound, "textblob": polarity}] for a batch of texts."""
+        out = self._score(texts)
+        return [
+            {"vader": v["compound"], "textblob": tb}
+            for v, tb in zip(out["vader"], out["textblob"])
+        ]
+
+    def _score(self, texts, vader=True, textblob=True):
+        # Identical texts (wire copies, repeated headers) are scored once
+        unique = list(dict.fromkeys(texts))
+        tokens = [self._tokenize(t) for t in unique]
+        result = {}
+        if vader:
+            words = [v for v, _ in tokens]
+            lowers = [[w.lower() for w in ws] for ws in words]
+            hits = self._hits(lowers, self.in_vader)
+            scores = {}
+            for text, ws, lower, hit in zip(unique, words, lowers, hits):
+                if hit:
+                    scores[text] = self._vader_rules(ws, lower, text)
+                else:
+                    scores[text] = dict(_NEUTRAL_VADER if ws else _EMPTY_VADER)
+            result["vader"] = [dict(scores[t]) for t in texts]
+        if textblob:
+            words = [p for _, p in tokens]
+            hits = self._hits(words, self.in_pattern)
+            scores = {}
+            for text, ws, hit in zip(unique, words, hits):
+                scores[text] = self._pattern_rules(ws) if hit else 0.0
+            result["textblob"] = [scores[t] for t in texts]
+        return result
+
+
+_batch_scorer = None
+
+
+def get_batch_scorer():
+    global _batch_scorer
+    if _batch_scorer is None:
+        _batch_scorer = BatchSentimentScorer()
+    return _batch_scorer
@@ -0,0 +1,163 @@
+'''
+Temporal tagger used for focus-time extraction.
+Each section is scanned once with a single precompiled pattern that finds candidate
+date expressions (explicit dates, month names, weekdays, relative expressions and
+years). Only those short spans are handed to dateparser, and every normalized value
+is memoized per (span, relative base), so a date repeated across lines, sections or
+articles is parsed once.
+'''
+import re
+from datetime import datetime
+from functools import lru_cache
+
+MONTHS = (
+    r"(?:january|february|march|april|may|june|july|august|september|october|november|december"
+    r"|jan|feb|mar|apr|jun|jul|aug|sep|sept|oct|nov|dec)"
+)
+WEEKDAYS = r"(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday)"
+UNITS = r"(?:days?|weeks?|months?|years?|hours?)"
+ORDINAL = r"(?:st|nd|rd|th)?"
+
+# Alternatives are ordered longest first; finditer keeps the first that matches at a position
+CANDIDATE_PATTERNS = [
+    # 2024-03-05
+    r"\b\d{4}-\d{1,2}-\d{1,2}\b",
+    # 05/03/2024, 5.3.24
+    r"\b\d{1,2}[/.-]\d{1,2}[/.-](?:\d{4}|\d{2})\b",
+    # 5 March 2024, 5th of March, 2024, 5 March
+    rf"\b\d{{1,2}}{ORDINAL}\s+(?:of\s+)?{MONTHS}\b\.?(?:,?\s+\d{{4}}\b)?",
+    # March 5, 2024, March 5th, March 2024
+    rf"\b{MONTHS}\b\.?\s+\d{{1,2}}{ORDINAL}\b(?:,?\s+\d{{4}}\b)?",
+    rf"\b{MONTHS}\b\.?,?\s+\d{{4}}\b",
+    # 3 days ago, last week, next Monday, this month
+    rf"\b\d+\s+{UNITS}\s+ago\b",
+    rf"\b(?:last|next|this|coming|past)\s+(?:{UNITS}|weekend|{WEEKDAYS})\b",
+    r"\b(?:yesterday|today|tomorrow|tonight)\b",
+    rf"\b{WEEKDAYS}\b",
+    # 2024
+    r"\b(?:19|20)\d{2}\b",
+]
+
+CANDIDATE_RE = re.compile("|".join(f"(?:{p})" for p in CANDIDATE_PATTERNS), re.IGNORECASE)
+
+# A bare capitalised month name ("in March") is a candidate too; "may" is left out
+# because as a modal verb it is far more common than the month
+MONTH_NAME_RE = re.compile(
+    r"\b(?:January|February|March|April|June|July|August|September|October|November|December)\b"
+)
+
+
+class TemporalTagger:
+
+    def __init__(self, cache_size=100000):
+        self._parse = lru_cache(maxsize=cache_size)(self._parse)
+
+    def _parse(self, span, base):
+        # dateparser is slow to import, only load it once a span has to be normalized
+        import dateparser
+        settings = {"PREFER_DAY_OF_MONTH": "first"}
+        if base is not None:
+            settings["RELATIVE_BASE"] = base
+        return dateparser.parse(span, languages=["en"], settings=settings)
+
+    def normalize(self, span: str, base: datetime = None):
+        """datetime for one candidate span (None when it does not parse), memoized."""
+        return self._parse(" ".join(span.lower().split()), base)
+
+    def candidates(self, text: str):
+        """Candidate (start, end, span) tuples in text order, from one scan of `text`."""
+        spans = [(m.start(), m.end(), m.group()) for m in CANDIDATE_RE.finditer(text)]
+        covered = [(s, e) for s, e, _ in spans]
+        for m in MONTH_NAME_RE.finditer(text):
+            if not any(s <= m.start() < e for s, e in covered):
+                spans.append((m.start(), m.end(), m.group()))
+        spans.sort()
+        return spans
+
+    def tag(self, text: str, base: datetime = None):
+        """[(span, datetime, offset)] for every candidate in `text` that normalizes to a date."""
+        if not text:
+            return []
+        tags = []
+        for start, _, span in self.candidates(text):
+            value = self.normalize(span, base)
+            if value is not None:
+                tags.append((span, value, start))
+        return tags
+
+
+_tagger = None
+
+
+def get_tagger():
+    global _tagger
+    if _tagger is None:
+        _tagger = TemporalTagger()
+    return _tagger
+
+
+'''
+Compiled temporal grammar for the lightweight time endpoints.
+One regex covers ISO dates, "5 March 2024", "March 5, 2024" and bare years, so a text
+is scanned once; every match is returned with its character span and a normalized ISO
+value ("YYYY-MM-DD" for dates, "YYYY" for years). The year inside a full date is also
+reported as a year, as the separate year scan used to do, so the years are the same
+as before. The dates differ from the three separate date scans it replaces:
+- ISO dates accept 19xx years too ("1999-03-05" was only reported as the year 1999)
+- every form needs a word boundary on both ends ("x5 March 2024" and "5 March 20245"
+  used to be reported as "5 March 2024")
+- a date that starts inside an earlier match is not reported ("5 March 2024-03-05"
+  gives "5 March 2024" only, "2024 March 2025" no date where "24 March 2025" was found)
+'''
+GRAMMAR_MONTHS = (
+    r"(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|Jun(?:e)?|Jul(?:y)?|Aug(?:ust)?"
+    r"|Sep(?:tember)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)"
+)
+MONTH_NUMBERS = {
+    m: i + 1 for i, m in enumerate(["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"])
+}
+
+GRAMMAR_RE = re.compile(
+    rf"""
+    (?P<iso>\b(?P<iso_y>(?:19|20)\d{{2}})-(?P<iso_m>\d{{2}})-(?P<iso_d>\d{{2}})\b)
+    | (?P<dmy>\b(?P<dmy_d>\d{{1,2}})\s+(?P<dmy_m>{GRAMMAR_MONTHS})\s+(?P<dmy_y>\d{{4}})\b)
+    | (?P<mdy>\b(?P<mdy_m>{GRAMMAR_MONTHS})\s+(?P<mdy_d>\d{{1,2}}),?\s+(?P<mdy_y>\d{{4}})\b)
+    | (?P<year>\b(?:19|20)\d{{2}}\b)
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+YEAR_RE = re.compile(r"^(?:19|20)\d{2}$")
+
+
+def _iso_date(year, month, day):
+    try:
+        return datetime(int(year), int(month), int(day)).strftime("%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+def extract_temporal(text):
+    """[{"text", "type", "value", "start", "end"}] in text order, from a single scan."""
+    if not isinstance(text, str):
+        return []
+    found = []
+    for m in GRAMMAR_RE.finditer(text):
+        if m.group("year") is not None:
+            found.append({"text": m.group(), "type": "year", "value": m.group(), "start": m.start(), "end": m.end()})
+            continue
+        for kind in ("iso", "dmy", "mdy"):
+            if m.group(kind) is not None:
+                break
+        year, month, day = m.group(f"{kind}_y"), m.group(f"{kind}_m"), m.group(f"{kind}_d")
+        if kind != "iso":
+            month = MONTH_NUMBERS[month[:3].lower()]
+        found.append({"text": m.group(), "type": "date", "value": _iso_date(year, month, day), "start": m.start(), "end": m.end()})
+        if YEAR_RE.match(year):
+            start = m.start(f"{kind}_y")
+            found.append({"text": year, "type": "year", "value": year, "start": start, "end": start + 4})
+    found.sort(key=lambda t: t["start"])
+    return found
+
+
+def extract_temporal_bulk(texts):
+    return [extract_temporal(t) for t in texts]
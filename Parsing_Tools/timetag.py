@@ -1,24 +1,148 @@
 '''
-Timetag is a tag that is extracted from the NEWS documents. 
+Timetag is a tag that is extracted from the NEWS documents.
 Each timetag contains the weight and the values of the tag itself.
 '''
+from datetime import datetime
+
+import numpy as np
+
+# Section codes and their weights: a date in the header says more about the focus
+# time than one in the summary, which says more than one in the details
+SECTIONS = {"header": 0, "summary": 1, "details": 2}
+SECTION_NAMES = ["header", "summary", "details"]
+SECTION_WEIGHTS = np.array([3.0, 2.0, 1.0])
+# Extra weight for a tag at the very start of its section, decreasing linearly to 0 at the end
+POSITION_WEIGHT = 0.5
+
+_EPOCH = datetime(1970, 1, 1).toordinal()
+_DAY_BIAS = 1 << 31
+
 
 #The class for the timetag object
 class TimeTag:
-    def __init__(self, date, count):
+    def __init__(self, date, count, textType=None, appearence=None, weight=None):
         # The date or the value of the tag itself
         self.date = date
         # The texttype which would be either the header, summary or details. Weight is based on this.
-        # self.textType = textType
-        # # Appearence is the position of the number of bytes from the start of the article where the tag first appears
-        # self.appearence = appearence
+        self.textType = textType
+        # Appearence is the position of the number of bytes from the start of the article where the tag first appears
+        self.appearence = appearence
         # Count is the number of unique times the tag appears in the article
         self.count = count
         # The weight assigned to each tag. Weight specifies how much of a good focus time it is. The higher the weight, the better.
-        self.weight = count
+        self.weight = count if weight is None else weight
 
     # To print the tag for logging purposes
     def __repr__(self):
         # print({"date": self.date, "weight": self.weight, "count": self.count})
         return f'date: {self.date}, weight: {self.weight}, count: {self.count}'
 
+
+def to_epoch_day(value):
+    return value.toordinal() - _EPOCH
+
+
+def from_epoch_day(day):
+    return datetime.fromordinal(int(day) + _EPOCH)
+
+
+class TagStore:
+    """
+    Column store of time tags for one or many articles: epoch day (int64), section
+    code, character offset inside the section and the section length. Counting,
+    weighting and focus-time ranking are vectorized over all stored tags.
+    """
+
+    def __init__(self):
+        self._doc, self._day, self._section, self._offset, self._length = [], [], [], [], []
+        self._arrays = None
+
+    def add(self, tags, section, section_length, doc=0):
+        """Append (span, datetime, offset) tags found in one section of article `doc`."""
+        code = SECTIONS[section]
+        for tag in tags:
+            self._doc.append(doc)
+            self._day.append(to_epoch_day(tag[1]))
+            self._section.append(code)
+            self._offset.append(tag[2] if len(tag) > 2 else 0)
+            self._length.append(section_length)
+        self._arrays = None
+        return self
+
+    def __len__(self):
+        return len(self._day)
+
+    def arrays(self):
+        if self._arrays is None:
+            self._arrays = (
+                np.asarray(self._doc, dtype=np.int64),
+                np.asarray(self._day, dtype=np.int64),
+                np.asarray(self._section, dtype=np.int8),
+                np.asarray(self._offset, dtype=np.int64),
+                np.asarray(self._length, dtype=np.int64),
+            )
+        return self._arrays
+
+    def tag_weights(self):
+        """Weight of every stored tag: section weight times position weight."""
+        _, _, section, offset, length = self.arrays()
+        position = np.clip(1.0 - offset / np.maximum(length, 1), 0.0, 1.0)
+        return SECTION_WEIGHTS[section] * (1.0 + POSITION_WEIGHT * position)
+
+    def aggregate(self):
+        """
+        One row per distinct (doc, day): doc, day, count, weight, best section and first
+        offset, sorted by doc then descending weight (ties: earlier day first).
+        """
+        doc, day, section, offset, _ = self.arrays()
+        if not len(day):
+            empty = np.zeros(0, dtype=np.int64)
+            return {"doc": empty, "day": empty, "count": empty, "weight": np.zeros(0), "section": empty, "offset": empty}
+        # (doc, day) packed into one int64 key: doc in the high 32 bits
+        keys, inverse = np.unique((doc << 32) | (day + _DAY_BIAS), return_inverse=True)
+        inverse = inverse.ravel()
+        key_doc = keys >> 32
+        key_day = (keys & 0xFFFFFFFF) - _DAY_BIAS
+        n = len(keys)
+        count = np.bincount(inverse, minlength=n)
+        weight = np.bincount(inverse, weights=self.tag_weights(), minlength=n)
+        best_section = np.full(n, len(SECTION_NAMES), dtype=np.int64)
+        np.minimum.at(best_section, inverse, section.astype(np.int64))
+        first_offset = np.full(n, np.iinfo(np.int64).max, dtype=np.int64)
+        np.minimum.at(first_offset, inverse, offset)
+        order = np.lexsort((key_day, -weight, key_doc))
+        return {
+            "doc": key_doc[order],
+            "day": key_day[order],
+            "count": count[order],
+            "weight": weight[order],
+            "section": best_section[order],
+            "offset": first_offset[order],
+        }
+
+    def focus_days(self, n_docs=None):
+        """Focus epoch day per article (-1 when an article has no tag)."""
+        agg = self.aggregate()
+        if n_docs is None:
+            n_docs = int(agg["doc"].max()) + 1 if len(agg["doc"]) else 0
+        focus = np.full(n_docs, -1, dtype=np.int64)
+        # Rows are sorted per doc by weight, so the first row of each doc wins
+        first = np.ones(len(agg["doc"]), dtype=bool)
+        first[1:] = agg["doc"][1:] != agg["doc"][:-1]
+        focus[agg["doc"][first]] = agg["day"][first]
+        return focus
+
+    def time_tags(self, doc=0):
+        """TimeTag objects of one article, best first."""
+        agg = self.aggregate()
+        rows = np.flatnonzero(agg["doc"] == doc)
+        return [
+            TimeTag(
+                from_epoch_day(agg["day"][i]),
+                int(agg["count"][i]),
+                SECTION_NAMES[agg["section"][i]],
+                int(agg["offset"][i]),
+                float(agg["weight"][i]),
+            )
+            for i in rows
+        ]
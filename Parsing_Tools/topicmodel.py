@@ -0,0 +1,182 @@
+'''
+Corpus-level topic model trained incrementally and shared by every article.
+Articles are vectorized with a stateless HashingVectorizer, so new batches can be
+added with partial_fit (online LDA or mini-batch NMF) without refitting a vocabulary.
+A reverse map from hash buckets to the words seen in them turns topic components back
+into words. Per-article topic extraction is then a single transform against the
+saved model instead of fitting NMF and LDA on the article's own words.
+'''
+import glob
+import os
+from collections import Counter
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.decomposition import LatentDirichletAllocation, MiniBatchNMF
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.utils import murmurhash3_32
+
+TOPIC_MODEL_PATH = os.getenv("TOPIC_MODEL_PATH", os.path.join("data", "models", "topics.joblib"))
+
+
+class OnlineTopicModel:
+
+    def __init__(self, method="lda", n_topics=20, n_features=2 ** 18, total_samples=1e6, random_state=10):
+        if method not in ("lda", "nmf"):
+            raise ValueError(f"Unknown topic model method: {method}")
+        self.method = method
+        self.n_topics = n_topics
+        self.n_features = n_features
+        # LDA works on raw counts, NMF on l2-normalised rows
+        self.vectorizer = HashingVectorizer(
+            n_features=n_features,
+            stop_words="english",
+            alternate_sign=False,
+            norm=None if method == "lda" else "l2",
+        )
+        if method == "lda":
+            self.model = LatentDirichletAllocation(
+                n_components=n_topics,
+                learning_method="online",
+                total_samples=total_samples,
+                random_state=random_state,
+            )
+        else:
+            self.model = MiniBatchNMF(n_components=n_topics, random_state=random_state)
+        # hash bucket -> Counter of the words hashed into it
+        self.vocabulary = {}
+        self.n_documents = 0
+
+    # ---------------------
+    # TRAINING
+    # ---------------------
+    def _bucket(self, word):
+        # Same bucket HashingVectorizer uses for `word`
+        return abs(murmurhash3_32(word, seed=0)) % self.n_features
+
+    def _update_vocabulary(self, texts):
+        analyze = self.vectorizer.build_analyzer()
+        counts = Counter(w for text in texts for w in analyze(text))
+        for word, count in counts.items():
+            self.vocabulary.setdefault(self._bucket(word), Counter())[word] += count
+
+    def partial_fit(self, texts):
+        """Update the model with one batch of articles."""
+        texts = [t for t in texts if t and t.strip()]
+        if not texts:
+            return self
+        X = self.vectorizer.transform(texts)
+        self.model.partial_fit(X)
+        self._update_vocabulary(texts)
+        self.n_documents += len(texts)
+        return self
+
+    @property
+    def fitted(self):
+        return hasattr(self.model, "components_")
+
+    # ---------------------
+    # INFERENCE
+    # ---------------------
+    def transform(self, texts):
+        """Document-topic weights, shape (len(texts), n_topics)."""
+        return self.model.transform(self.vectorizer.transform(texts))
+
+    def _word(self, bucket):
+        words = self.vocabulary.get(int(bucket))
+        return words.most_common(1)[0][0] if words else None
+
+    def topic_words(self, topic, num_words=10):
+        """Top words of one topic."""
+        words = []
+        for bucket in np.argsort(self.model.components_[topic])[::-1]:
+            word = self._word(bucket)
+            if word is not None:
+                words.append(word)
+            if len(words) == num_words:
+                break
+        return words
+
+    def topics(self, num_words=10):
+        return [self.topic_words(t, num_words) for t in range(self.n_topics)]
+
+    def article_topics(self, texts, num_topics=3, num_words=3):
+        """For every article, the top words of its `num_topics` strongest topics."""
+        weights = self.transform(texts)
+        cache = {}
+        results = []
+        for text, row in zip(texts, weights):
+            words = []
+            if not text or not text.strip():
+                results.append(words)
+                continue
+            total = row.sum()
+            for rank, topic in enumerate(np.argsort(row)[::-1][:num_topics]):
+                # Secondary topics must carry more than a uniform share of the article
+                if total <= 0 or (rank and row[topic] / total <= 1.0 / self.n_topics):
+                    break
+                if topic not in cache:
+                    cache[topic] = self.topic_words(topic, num_words)
+                words.extend(w for w in cache[topic] if w not in words)
+            results.append(words)
+        return results
+
+    # ---------------------
+    # PERSISTENCE
+    # ---------------------
+    def save(self, path=TOPIC_MODEL_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        joblib.dump(self, path)
+        return path
+
+    @staticmethod
+    def load(path=TOPIC_MODEL_PATH):
+        return joblib.load(path)
+
+
+_topic_model = None
+
+
+def get_topic_model(path=TOPIC_MODEL_PATH):
+    """Shared model loaded from disk once per process; None when no model has been trained."""
+    global _topic_model
+    if _topic_model is None and os.path.exists(path):
+        _topic_model = OnlineTopicModel.load(path)
+    return _topic_model
+
+
+def train(texts, method="lda", n_topics=20, batch_size=512, path=TOPIC_MODEL_PATH, model=None):
+    """
+    Train (or continue training `model`) over an iterable of articles in mini-batches
+    and save it to `path`.
+    """
+    model = model or OnlineTopicModel(method=method, n_topics=n_topics)
+    batch = []
+    for text in texts:
+        batch.append(text)
+        if len(batch) == batch_size:
+            model.partial_fit(batch)
+            batch = []
+    if batch:
+        model.partial_fit(batch)
+    model.save(path)
+    return model
+
+
+def main():
+    # Train over the scraped corpus, continuing from the saved model if there is one
+    def articles():
+        for filename in glob.iglob(r'/opt/bitnami/spark/data/Scrapper/2024/**/*.csv', recursive=True):
+            df = pd.read_csv(filename, index_col=None, header=0, dtype="string")
+            yield from df["Detail"].dropna()
+
+    model = OnlineTopicModel.load() if os.path.exists(TOPIC_MODEL_PATH) else None
+    model = train(articles(), model=model)
+    print(f"Topic model trained on {model.n_documents} articles, saved to {TOPIC_MODEL_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+'''
+Location trend benchmark on the real spaCy pipeline (en_core_web_sm).
+Times the previous implementation (every sentence parsed a second time, then every
+sentence substring-scanned once per location) against AspectService.location_trend,
+which works on a single parse, with and without the gazetteer matcher. The gazetteer
+run is timed with a cold and a warm candidate cache.
+
+Run from the repository root:
+
+    python benchmarks/location_trend.py --sentences 50 500 2000
+'''
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.aspect_service import AspectService, nlp
+from services.location_service import LocationService
+
+SAMPLE = (
+    "Heavy rain flooded several neighbourhoods of Karachi on Monday. "
+    "Officials in Lahore said relief teams were sent to the affected areas. "
+    "The Prime Minister met provincial leaders in Islamabad to review the damage. "
+    "Traders in Peshawar reported that markets stayed closed for a second day. "
+    "Forecasters expect more rain over Quetta and the coastal belt this week. "
+)
+
+
+def location_trend_reparse(text):
+    """The previous location_trend: one parse for sentences, one more per sentence for entities."""
+    sentences = [sent.text.strip() for sent in nlp(text).sents if sent.text.strip()]
+    locations = set()
+    for s in sentences:
+        for ent in nlp(s).ents:
+            if ent.label_ == "GPE":
+                locations.add(ent.text)
+    return [[1 if loc.lower() in s.lower() else 0 for s in sentences] for loc in locations]
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sentences", type=int, nargs="+", default=[50, 500, 2000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"pipeline: {nlp.meta.get('name')} {nlp.meta.get('version')} {nlp.pipe_names}")
+    locations = LocationService()
+    service = AspectService(locations)
+
+    for n in args.sentences:
+        text = SAMPLE * (n // 5)
+        reparse = timed(lambda: location_trend_reparse(text), args.repeat)
+        single = timed(lambda: service.location_trend(text), args.repeat)
+
+        locations._first_word_candidates.cache_clear()
+        cold = timed(lambda: service.location_trend(text, use_gazetteer=True), 1)
+        warm = timed(lambda: service.location_trend(text, use_gazetteer=True), args.repeat)
+
+        print(
+            f"{n:>6} sentences: reparse {reparse:8.1f}ms  single parse {single:8.1f}ms "
+            f"({reparse / single:.1f}x)  gazetteer cold {cold:8.1f}ms  warm {warm:8.1f}ms"
+        )
+    print(f"candidate cache: {locations._first_word_candidates.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
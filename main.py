@@ -12,6 +12,9 @@
 # health function 
 
 
+import os
+from datetime import datetime
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
 # Routers
@@ -19,12 +22,73 @@ from routes.parse_route import router as parse_router
 from routes.aspect_route import router as aspect_router
 from routes.processing_route import router as processing_router
 from routes.location_route import router as location_router
+from routes.topic_route import router as topic_router
+from routes.trending_route import router as trending_router
+from routes.health_route import router as health_router, health
+
+# Engine instances owned by the routers (warmed up before reporting ready)
+from routes.parse_route import service as parse_service
+from routes.aspect_route import service as aspect_service
+from routes.processing_route import svc as processing_service
+from routes.processing_route import dedup as dedup_service
+from routes.processing_route import vectors as vector_index
+from routes.location_route import service as location_service
+from routes.aspect_route import index as index_service
+from routes.trending_route import service as trending_service
+from routes.topic_route import service as topic_service
+from Parsing_Tools.temporal import get_tagger
+from Parsing_Tools.timetag import TagStore
+
+# Warm-up configuration
+WARMUP_ENABLED = os.getenv("TOOLS_WARMUP", "1") not in ("0", "false", "False")
+WARMUP_ROUNDS = int(os.getenv("TOOLS_WARMUP_ROUNDS", "1"))
+
+health.register("spacy", lambda texts: (
+    processing_service.sentences_bulk(texts),
+    processing_service.extract_entities_from_text_bulk(texts),
+    parse_service.get_topics_bulk(texts),
+))
+health.register("vader", parse_service.get_sentiment_bulk)
+health.register("textblob", processing_service.sentiment_bulk)
+health.register("gazetteer", location_service.extract_bulk)
+health.register("aspect", lambda texts: (
+    aspect_service.sentiment_trend(texts),
+    aspect_service.location_trend(texts),
+))
+# dateparser behind the temporal tagger and TagStore ranking, the focus time path of Get_Time
+health.register("temporal", lambda texts: (
+    [TagStore().add(get_tagger().tag(t, datetime.now()), "details", len(t)).time_tags() for t in texts],
+    parse_service.get_time_normalized_bulk(texts),
+))
+health.register("trending", trending_service.warm_up)
+health.register("topic_model", topic_service.warm_up)
+
+# The aspect gazetteer trends reuse the location router's gazetteer
+aspect_service.locations = location_service
+
+# Articles added to the index also feed the trending counters
+index_service.subscribe(trending_service.observe_docs)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # onstartup: warm engines in the background so /health/live answers
+    # immediately while /health/ready stays 503 until every engine is warm
+    if WARMUP_ENABLED:
+        health.warm_up_async(rounds=WARMUP_ROUNDS)
+    else:
+        health.mark_ready()
+    yield
+    # onshutdown: keep the near-duplicate and vector index changes made since the last periodic save
+    dedup_service.save()
+    vector_index.save()
 
 
 app = FastAPI(
     title="Tools Service",
     version="1.0",
-    description="Parser Tools + Aspect Analysis Tools"
+    description="Parser Tools + Aspect Analysis Tools",
+    lifespan=lifespan
 )
 
 # Register Routers
@@ -32,6 +96,9 @@ app.include_router(parse_router)
 app.include_router(aspect_router)
 app.include_router(processing_router)
 app.include_router(location_router)
+app.include_router(topic_router)
+app.include_router(trending_router)
+app.include_router(health_router)
 
 
 @app.get("/")
@@ -1,6 +1,7 @@
 # models/aspect_models.py
-from pydantic import BaseModel
-from typing import List, Dict, Any
+from datetime import date
+from pydantic import BaseModel, Field
+from typing import List, Dict, Any, Literal, Optional, Union
 
 
 # Text input models
@@ -13,23 +14,51 @@ class TextList(BaseModel):
     texts: List[str]
 
 
+# ---------------------------
+# Sentiment trend (bulk)
+# ---------------------------
+class SentimentTrendBulkRequest(TextList):
+    # "aggregate": one series over all documents plus per-document offsets
+    # "documents": one series per document
+    mode: Literal["aggregate", "documents"] = "aggregate"
+
+
 # ---------------------------
 # Keyword density
 # ---------------------------
 class KeywordDensityRequest(BaseModel):
     keywords: List[str]
     text: str
+    # Only count matches delimited by non-word characters
+    whole_word: bool = False
 
 class KeywordDensityBulkRequest(BaseModel):
     keywords: List[str]
     texts: List[str]
+    whole_word: bool = False
+
+
+# ---------------------------
+# Plot options (query parameters)
+# ---------------------------
+class PlotOptions(BaseModel):
+    # Downsample every series to at most this many points
+    max_points: Optional[int] = Field(None, ge=3)
+    downsample: Literal["lttb", "minmax"] = "lttb"
+    # Send evenly spaced x axes as {"start", "step", "count"}
+    compact_x: bool = False
 
 
 # ---------------------------
 # Responses
 # ---------------------------
+class RangeAxis(BaseModel):
+    start: int
+    step: int
+    count: int
+
 class TrendPoint(BaseModel):
-    x: List[Any]
+    x: Union[List[Any], RangeAxis]
     y: List[Any]
     type: str
     mode: str | None = None
@@ -37,10 +66,12 @@ class TrendPoint(BaseModel):
 
 class TrendResponse(BaseModel):
     plotData: List[TrendPoint]
+    # Start index of each document in an aggregated bulk series
+    offsets: Optional[List[int]] = None
 # ----------- Common -----------
 class DateRange(BaseModel):
-    startDate: str  # YYYY-MM-DD
-    endDate: str
+    startDate: date  # YYYY-MM-DD
+    endDate: date
 
 
 # ----------- Sentiment Trend -----------
@@ -56,7 +87,8 @@ class TopicTrendRequest(BaseModel):
 
 
 # ----------- Keyword Density -----------
-class KeywordDensityRequest(BaseModel):
+# (named apart from the text-based KeywordDensityRequest above, which it used to shadow)
+class KeywordDensityRangeRequest(BaseModel):
     keywords: List[str]
     date: DateRange
 
@@ -67,6 +99,24 @@ class LocationTrendRequest(BaseModel):
     date: DateRange
 
 
+# ----------- Index ingest -----------
+class IndexArticle(BaseModel):
+    # Stable article id; re-sending an id replaces the indexed article
+    id: str
+    text: str
+    date: date  # YYYY-MM-DD
+
+
+class IndexArticlesRequest(BaseModel):
+    articles: List[IndexArticle]
+
+
+class IndexArticlesResponse(BaseModel):
+    added: int
+    updated: int
+    articles: int
+
+
 # ----------- Response Wrapper -----------
 class PlotPoint(BaseModel):
     x: List[Any]
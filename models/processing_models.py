@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Any
+from pydantic import BaseModel, Field
+from typing import List, Any, Optional, Union
 
 # ------------------------
 # Request Models
@@ -36,6 +36,7 @@ class BulkReplaceRequest(BaseModel):
 class KeywordDensityPayload(BaseModel):
     texts: List[str]
     keywords: List[str]
+    whole_word: bool = False
 
 
 class RelationshipsPayload(BaseModel):
@@ -55,3 +56,45 @@ class FormatForLLMPayload(BaseModel):
     seed_articles: List[dict[str, Any]]  # expects dicts with keys: title, date, link, content
     neighboring: List[dict[str, Any]]
     #user_query: optional[str] = ""
+
+
+# Vector index
+class VectorArticle(BaseModel):
+    # Stable numeric article id; re-sending an id replaces its vector
+    id: int
+    text: str
+
+
+class VectorIndexAddRequest(BaseModel):
+    articles: List[VectorArticle]
+
+
+class VectorIndexRemoveRequest(BaseModel):
+    ids: List[int]
+
+
+class VectorSearchRequest(BaseModel):
+    text: str
+    k: int = Field(10, ge=1, le=1000)
+
+
+class VectorSearchBulkRequest(BaseModel):
+    texts: List[str]
+    k: int = Field(10, ge=1, le=1000)
+
+
+# Near-duplicate detection
+class DedupBulkRequest(BaseModel):
+    texts: List[str]
+    threshold: Optional[float] = Field(None, gt=0, le=1)
+
+
+class DedupArticle(BaseModel):
+    id: Union[int, str]
+    text: str
+
+
+class DedupCheckRequest(BaseModel):
+    articles: List[DedupArticle]
+    # Add the articles that are not duplicates to the index
+    add: bool = True
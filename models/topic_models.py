@@ -0,0 +1,29 @@
+# models/topic_models.py
+from pydantic import BaseModel
+from typing import List, Literal, Optional, Dict, Any
+
+
+class TopicFitRequest(BaseModel):
+    articles: List[str]
+    method: Literal["lda", "nmf"] = "lda"
+    num_topics: int = 5
+    num_words: int = 10
+    max_df: float = 0.95
+    min_df: float = 0.05
+
+
+class TopicTransformRequest(BaseModel):
+    texts: List[str]
+
+
+class TopicModelStatus(BaseModel):
+    model_id: str
+    status: str
+    params: Dict[str, Any]
+    articles: Optional[int] = None
+    error: Optional[str] = None
+
+
+class TopicTransformResponse(BaseModel):
+    weights: List[List[float]]
+    topic: List[int]
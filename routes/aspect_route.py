@@ -1,27 +1,46 @@
 # routes/aspect_route.py
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException
 from models.aspect_models import (
-    TextItem, TextList,
+    TextItem, TextList, SentimentTrendBulkRequest,
     KeywordDensityRequest, KeywordDensityBulkRequest,
-    TrendResponse
+    TrendResponse, PlotOptions,
+    SentimentRequest, TopicTrendRequest, KeywordDensityRangeRequest, LocationTrendRequest,
+    IndexArticlesRequest, IndexArticlesResponse, PlotResponse
 )
 from services.aspect_service import AspectService
+from services.index_service import IndexService
 
 router = APIRouter(prefix="/aspect", tags=["Aspect Tools"])
 service = AspectService()
+index = IndexService()
+
+# =====================================================
+# ARTICLE INDEX (date range queries)
+# =====================================================
+
+@router.post("/index/articles", response_model=IndexArticlesResponse)
+def index_articles(payload: IndexArticlesRequest):
+    return index.add_articles([a.model_dump() for a in payload.articles])
 
 # =====================================================
 # SENTIMENT TREND
 # =====================================================
 
 @router.post("/sentiment-trend", response_model=TrendResponse)
-def sentiment_trend_single(payload: TextItem):
-    return service.sentiment_trend(payload.text)
+def sentiment_trend_single(payload: TextItem, options: PlotOptions = Depends()):
+    return service.sentiment_trend(payload.text, **options.model_dump())
 
 @router.post("/sentiment-trend/bulk", response_model=TrendResponse)
-def sentiment_trend_bulk(payload: TextList):
-    return service.sentiment_trend(payload.texts)
+def sentiment_trend_bulk(payload: SentimentTrendBulkRequest, options: PlotOptions = Depends()):
+    try:
+        return service.sentiment_trend_bulk(payload.texts, payload.mode, **options.model_dump())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/sentiment-trend/range", response_model=PlotResponse)
+def sentiment_trend_range(payload: SentimentRequest):
+    return index.sentiment_trend(payload.keywords, payload.date.startDate, payload.date.endDate)
 
 # =====================================================
 # TOPIC TREND
@@ -35,26 +54,38 @@ def topic_trend_single(payload: TextItem):
 def topic_trend_bulk(payload: TextList):
     return service.topic_trend(payload.texts)
 
+@router.post("/topic-trend/range", response_model=PlotResponse)
+def topic_trend_range(payload: TopicTrendRequest):
+    return index.topic_trend(payload.topics, payload.date.startDate, payload.date.endDate)
+
 # =====================================================
 # KEYWORD DENSITY
 # =====================================================
 
 @router.post("/keyword-density", response_model=TrendResponse)
-def keyword_density_single(payload: KeywordDensityRequest):
-    return service.keyword_density(payload.text, payload.keywords)
+def keyword_density_single(payload: KeywordDensityRequest, options: PlotOptions = Depends()):
+    return service.keyword_density(payload.text, payload.keywords, payload.whole_word, **options.model_dump())
 
 @router.post("/keyword-density/bulk", response_model=TrendResponse)
-def keyword_density_bulk(payload: KeywordDensityBulkRequest):
-    return service.keyword_density(payload.texts, payload.keywords)
+def keyword_density_bulk(payload: KeywordDensityBulkRequest, options: PlotOptions = Depends()):
+    return service.keyword_density(payload.texts, payload.keywords, payload.whole_word, **options.model_dump())
+
+@router.post("/keyword-density/range", response_model=PlotResponse)
+def keyword_density_range(payload: KeywordDensityRangeRequest):
+    return index.keyword_density(payload.keywords, payload.date.startDate, payload.date.endDate)
 
 # =====================================================
 # LOCATION TREND
 # =====================================================
 
 @router.post("/location-trend", response_model=TrendResponse)
-def location_trend_single(payload: TextItem):
-    return service.location_trend(payload.text)
+def location_trend_single(payload: TextItem, use_gazetteer: bool = False, options: PlotOptions = Depends()):
+    return service.location_trend(payload.text, use_gazetteer, **options.model_dump())
 
 @router.post("/location-trend/bulk", response_model=TrendResponse)
-def location_trend_bulk(payload: TextList):
-    return service.location_trend(payload.texts)
+def location_trend_bulk(payload: TextList, use_gazetteer: bool = False, options: PlotOptions = Depends()):
+    return service.location_trend(payload.texts, use_gazetteer, **options.model_dump())
+
+@router.post("/location-trend/range", response_model=PlotResponse)
+def location_trend_range(payload: LocationTrendRequest):
+    return index.location_trend(payload.locations, payload.date.startDate, payload.date.endDate)
@@ -0,0 +1,28 @@
+# routes/health_route.py
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from services.health_service import HealthService
+
+router = APIRouter(prefix="/health", tags=["Health"])
+health = HealthService()
+
+
+# -----------------------
+# Liveness (cheap, never touches the NLP engines)
+# -----------------------
+@router.get("/live")
+def live():
+    return health.liveness()
+
+
+# -----------------------
+# Readiness (503 until warm-up has finished, and while degraded unless
+# TOOLS_READY_ON_ERROR is set)
+# -----------------------
+@router.get("/ready")
+def ready():
+    status = health.readiness()
+    if not health.is_ready():
+        return JSONResponse(status_code=503, content=status)
+    return status
@@ -1,6 +1,7 @@
 from fastapi import APIRouter
 from pydantic import BaseModel
 from services.parse_service import ParserService
+from utils.language import language_counts
 
 router = APIRouter(prefix="/parser", tags=["Parser Tools"])
 service = ParserService()
@@ -35,18 +36,18 @@ def extract_location(payload: TextItem):
 
 @router.post("/location/bulk")
 def extract_location_bulk(payload: TextList):
-    return {"location": service.get_location_bulk(payload.texts)}
+    return {"location": service.get_location_bulk(payload.texts), "languages": language_counts(payload.texts)}
 
 # ------------------------
 # TIME
 # ------------------------
 @router.post("/time")
 def extract_time(payload: TextItem):
-    return {"time": service.get_time(payload.text)}
+    return {"time": service.get_time(payload.text), "normalized": service.get_time_normalized(payload.text)}
 
 @router.post("/time/bulk")
 def extract_time_bulk(payload: TextList):
-    return {"time": service.get_time_bulk(payload.texts)}
+    return {"time": service.get_time_bulk(payload.texts), "normalized": service.get_time_normalized_bulk(payload.texts)}
 
 # ------------------------
 # TOPICS
@@ -57,7 +58,7 @@ def extract_topics(payload: TextItem):
 
 @router.post("/topics/bulk")
 def extract_topics_bulk(payload: TextList):
-    return {"topics": service.get_topics_bulk(payload.texts)}
+    return {"topics": service.get_topics_bulk(payload.texts), "languages": language_counts(payload.texts)}
 
 # ------------------------
 # SENTIMENT
@@ -68,4 +69,4 @@ def extract_sentiment(payload: TextItem):
 
 @router.post("/sentiment/bulk")
 def extract_sentiment_bulk(payload: TextList):
-    return {"sentiment": service.get_sentiment_bulk(payload.texts)}
+    return {"sentiment": service.get_sentiment_bulk(payload.texts), "languages": language_counts(payload.texts)}
@@ -10,12 +10,19 @@ from models.processing_models import (
 
 from models.processing_models import (
     SingleText, BulkText, KeywordDensityPayload,
-    RelationshipsPayload, IOUPayload, FormatForLLMPayload
+    RelationshipsPayload, IOUPayload, FormatForLLMPayload,
+    VectorIndexAddRequest, VectorIndexRemoveRequest, VectorSearchRequest, VectorSearchBulkRequest,
+    DedupBulkRequest, DedupCheckRequest
 )
 from services.processing_service import ProcessingService
+from services.vector_index_service import VectorIndexService
+from services.dedup_service import DedupService
+from utils.language import language_counts
 
 router = APIRouter(prefix="/processing", tags=["Processing Tools"])
 svc = ProcessingService()
+vectors = VectorIndexService()
+dedup = DedupService()
 
 
 # ----------------------------------------------------
@@ -89,7 +96,7 @@ def entities(payload: SingleText):
 
 @router.post("/entities/bulk")
 def entities_bulk(payload: BulkText):
-    return {"entities": svc.extract_entities_from_text_bulk(payload.texts)}
+    return {"entities": svc.extract_entities_from_text_bulk(payload.texts), "languages": language_counts(payload.texts)}
 
 @router.post("/entities/from-relationships")
 def entities_from_relationships(payload: RelationshipsPayload):
@@ -104,14 +111,14 @@ def topic_trend(payload: SingleText):
 
 @router.post("/topic-trend/bulk")
 def topic_trend_bulk(payload: BulkText):
-    return {"topics": svc.topic_trend_bulk(payload.texts)}
+    return {"topics": svc.topic_trend_bulk(payload.texts), "languages": language_counts(payload.texts)}
 
 # -----------------------
 # Keyword density
 # -----------------------
 @router.post("/keyword-density")
 def keyword_density(payload: KeywordDensityPayload):
-    return {"density": svc.keyword_density(payload.texts, payload.keywords)}
+    return {"density": svc.keyword_density(payload.texts, payload.keywords, payload.whole_word)}
 
 # -----------------------
 # Sentiment
@@ -122,16 +129,18 @@ def sentiment(payload: SingleText):
 
 @router.post("/sentiment/bulk")
 def sentiment_bulk(payload: BulkText):
-    return {"sentiment": svc.sentiment_bulk(payload.texts)}
+    return {"sentiment": svc.sentiment_bulk(payload.texts), "languages": language_counts(payload.texts)}
 
 # -----------------------
 # Time extraction
 # -----------------------
 @router.post("/time")
 def time_extract(payload: SingleText):
-    years = svc.extract_years(payload.text)
-    dates = svc.extract_dates_like(payload.text)
-    return {"years": years, "dates": dates}
+    return svc.time_extract(payload.text)
+
+@router.post("/time/bulk")
+def time_extract_bulk(payload: BulkText):
+    return {"time": svc.time_extract_bulk(payload.texts)}
 
 # -----------------------
 # Format for LLM
@@ -149,6 +158,51 @@ def iou(payload: IOUPayload):
     score = svc.compute_iou(payload.a, payload.b)
     return {"iou": score}
 
+# -----------------------
+# Vector index (nearest neighbours)
+# -----------------------
+@router.post("/index/add")
+def vector_index_add(payload: VectorIndexAddRequest):
+    added = vectors.add([a.model_dump() for a in payload.articles])
+    return {"added": added, "total": vectors.stats()["articles"]}
+
+@router.post("/index/remove")
+def vector_index_remove(payload: VectorIndexRemoveRequest):
+    return {"removed": vectors.remove(payload.ids), "total": vectors.stats()["articles"]}
+
+@router.post("/index/compact")
+def vector_index_compact():
+    return vectors.compact()
+
+@router.get("/index/stats")
+def vector_index_stats():
+    return vectors.stats()
+
+@router.post("/index/search")
+def vector_index_search(payload: VectorSearchRequest):
+    ids, scores = vectors.search([payload.text], payload.k)
+    return {"ids": ids[0], "scores": scores[0]}
+
+@router.post("/index/search/bulk")
+def vector_index_search_bulk(payload: VectorSearchBulkRequest):
+    ids, scores = vectors.search(payload.texts, payload.k)
+    return {"ids": ids, "scores": scores}
+
+# -----------------------
+# Near-duplicates
+# -----------------------
+@router.post("/dedup/bulk")
+def dedup_bulk(payload: DedupBulkRequest):
+    return dedup.dedup_bulk(payload.texts, payload.threshold)
+
+@router.post("/dedup/check")
+def dedup_check(payload: DedupCheckRequest):
+    return {"results": dedup.check([a.model_dump() for a in payload.articles], payload.add)}
+
+@router.get("/dedup/stats")
+def dedup_stats():
+    return dedup.stats()
+
 # -----------------------
 # Graph Building
 # -----------------------
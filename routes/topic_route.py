@@ -0,0 +1,55 @@
+# routes/topic_route.py
+
+from fastapi import APIRouter, HTTPException
+from models.topic_models import TopicFitRequest, TopicTransformRequest, TopicModelStatus, TopicTransformResponse
+from services.topic_service import TopicService, READY
+
+router = APIRouter(prefix="/topic", tags=["Topic Models"])
+service = TopicService()
+
+
+def _ready(model_id: str):
+    try:
+        status = service.status(model_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown topic model {model_id}")
+    if status["status"] != READY:
+        raise HTTPException(status_code=409, detail=f"Topic model {model_id} is {status['status']}")
+
+
+# -----------------------
+# Fit (returns immediately, trains in the background)
+# -----------------------
+@router.post("/fit", response_model=TopicModelStatus, status_code=202)
+def fit(payload: TopicFitRequest):
+    return service.fit(
+        payload.articles,
+        payload.method,
+        payload.num_topics,
+        payload.num_words,
+        payload.max_df,
+        payload.min_df
+    )
+
+
+@router.get("/{model_id}", response_model=TopicModelStatus)
+def status(model_id: str):
+    try:
+        return service.status(model_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown topic model {model_id}")
+
+
+# -----------------------
+# Queries against a fitted model
+# -----------------------
+@router.get("/{model_id}/topics")
+def topics(model_id: str, num_words: int = None):
+    _ready(model_id)
+    return {"topics": service.topics(model_id, num_words)}
+
+
+@router.post("/{model_id}/transform", response_model=TopicTransformResponse)
+def transform(model_id: str, payload: TopicTransformRequest):
+    _ready(model_id)
+    return service.transform(model_id, payload.texts)
@@ -0,0 +1,28 @@
+# routes/trending_route.py
+
+from fastapi import APIRouter, HTTPException
+from models.aspect_models import TextList
+from services.trending_service import TrendingService, WINDOWS, CATEGORIES
+
+router = APIRouter(prefix="/trending", tags=["Trending"])
+service = TrendingService()
+
+
+# -----------------------
+# Feed articles (also fed by /aspect/index/articles)
+# -----------------------
+@router.post("/observe")
+def observe(payload: TextList):
+    return {"observed": service.observe(payload.texts)}
+
+
+# -----------------------
+# Top-k per window
+# -----------------------
+@router.get("/{category}")
+def trending(category: str, window: str = "hour", k: int = 10):
+    if category not in CATEGORIES:
+        raise HTTPException(status_code=404, detail=f"Unknown category {category}, expected one of {list(CATEGORIES)}")
+    if window not in WINDOWS:
+        raise HTTPException(status_code=400, detail=f"Unknown window {window}, expected one of {list(WINDOWS)}")
+    return service.top(category, window, k)
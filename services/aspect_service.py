@@ -1,10 +1,15 @@
 # services/aspect_service.py
 
+import os
 import spacy
 from nltk.sentiment import SentimentIntensityAnalyzer
 from nltk import download as nltk_download
 from typing import List, Dict, Any
 import re
+from Parsing_Tools.sentiment import get_batch_scorer
+from utils.downsample import downsample_plot
+from utils.keyword_matcher import get_matcher
+from utils.language import is_supported, route_bulk
 
 # --------------- Load spaCy ---------------
 try:
@@ -19,8 +24,24 @@ nltk_download("vader_lexicon")
 vader = SentimentIntensityAnalyzer()
 
 
+# --------------- Bulk parsing ---------------
+# Worker processes used by nlp.pipe for bulk requests, and the batch size from
+# which forking them pays off. nlp.pipe starts (and loads the model in) a fresh pool
+# on every call, and each API worker would start its own, so this is opt-in: set it
+# to the cores one API worker may use.
+BULK_WORKERS = int(os.getenv("ASPECT_BULK_WORKERS", "1"))
+BULK_PARALLEL_MIN_DOCS = int(os.getenv("ASPECT_BULK_PARALLEL_MIN_DOCS", "64"))
+# max_points bounds the points of one series, not the number of series: mode="documents"
+# of sentiment_trend_bulk returns one series per document, up to this many documents
+MAX_DOCUMENT_SERIES = int(os.getenv("ASPECT_MAX_DOCUMENT_SERIES", "100"))
+
+
 class AspectService:
 
+    def __init__(self, locations=None):
+        # LocationService used for gazetteer-based location trends
+        self.locations = locations
+
     # ====================================================
     # Utility
     # ====================================================
@@ -30,21 +51,38 @@ class AspectService:
             return text_or_list
         return " ".join(text_or_list)
 
+    def _plot(self, result, max_points=None, downsample="lttb", compact_x=False):
+        # Bound payload size: at most max_points per series, implicit x ranges
+        # optionally sent as {"start", "step", "count"}
+        return downsample_plot(result, max_points, downsample, compact_x)
+
     def _sentences(self, text: str):
         doc = nlp(text)
         return [sent.text.strip() for sent in doc.sents if sent.text.strip()]
 
+    def _sentences_bulk(self, texts: List[str]):
+        """Sentences of every document, parsed per document (in parallel for large batches)."""
+        n_process = BULK_WORKERS if len(texts) >= BULK_PARALLEL_MIN_DOCS else 1
+        # Only sentence boundaries are needed here
+        disable = [name for name in ("ner", "lemmatizer") if name in nlp.pipe_names]
+        docs = nlp.pipe(texts, batch_size=32, n_process=n_process, disable=disable)
+        return [
+            [sent.text.strip() for sent in doc.sents if sent.text.strip()]
+            for doc in docs
+        ]
+
     # ====================================================
     # SENTIMENT TREND
     # ====================================================
 
-    def sentiment_trend(self, text_or_texts):
+    def sentiment_trend(self, text_or_texts, max_points=None, downsample="lttb", compact_x=False):
         text = self._concat(text_or_texts)
-        sentences = self._sentences(text)
+        # Non-English text is not parsed: an empty trend
+        sentences = self._sentences(text) if is_supported(text) else []
 
-        sentiments = [vader.polarity_scores(s)["compound"] for s in sentences]
+        sentiments = [s["compound"] for s in get_batch_scorer().vader_scores(sentences)]
 
-        return {
+        return self._plot({
             "plotData": [
                 {
                     "x": list(range(len(sentiments))),
@@ -54,7 +92,56 @@ class AspectService:
                     "name": "Sentiment Trend",
                 }
             ]
-        }
+        }, max_points, downsample, compact_x)
+
+    def sentiment_trend_bulk(self, texts: List[str], mode: str = "aggregate", max_points=None, downsample="lttb", compact_x=False):
+        """
+        Sentence sentiment for every document without concatenating them.
+        mode="documents" returns one series per document (ValueError for more than
+        MAX_DOCUMENT_SERIES documents); mode="aggregate" returns a single series plus the
+        index where each document starts in it.
+        """
+        if mode == "documents" and len(texts) > MAX_DOCUMENT_SERIES:
+            raise ValueError(
+                f"mode=documents returns one series per document, at most {MAX_DOCUMENT_SERIES}; "
+                f"got {len(texts)} documents, use mode=aggregate"
+            )
+        # Non-English documents contribute no sentences
+        per_doc = route_bulk(texts, self._sentences_bulk, list)
+        flat = [s for sentences in per_doc for s in sentences]
+        scores = [s["compound"] for s in get_batch_scorer().vader_scores(flat)]
+
+        offsets = []
+        start = 0
+        for sentences in per_doc:
+            offsets.append(start)
+            start += len(sentences)
+
+        if mode == "documents":
+            plot_data = []
+            for i, (offset, sentences) in enumerate(zip(offsets, per_doc)):
+                y = scores[offset:offset + len(sentences)]
+                plot_data.append({
+                    "x": list(range(len(y))),
+                    "y": y,
+                    "type": "scatter",
+                    "mode": "lines+markers",
+                    "name": f"Document {i}",
+                })
+            return self._plot({"plotData": plot_data}, max_points, downsample, compact_x)
+
+        return self._plot({
+            "plotData": [
+                {
+                    "x": list(range(len(scores))),
+                    "y": scores,
+                    "type": "scatter",
+                    "mode": "lines+markers",
+                    "name": "Sentiment Trend",
+                }
+            ],
+            "offsets": offsets,
+        }, max_points, downsample, compact_x)
 
     # ====================================================
     # TOPIC TREND (noun chunks)
@@ -62,9 +149,10 @@ class AspectService:
 
     def topic_trend(self, text_or_texts):
         text = self._concat(text_or_texts)
-        doc = nlp(text)
-
-        topics = list(set(chunk.text.lower() for chunk in doc.noun_chunks))
+        if is_supported(text):
+            topics = list(set(chunk.text.lower() for chunk in nlp(text).noun_chunks))
+        else:
+            topics = []
 
         return {
             "plotData": [
@@ -83,14 +171,18 @@ class AspectService:
     # KEYWORD DENSITY
     # ====================================================
 
-    def keyword_density(self, text_or_texts, keywords: List[str]):
+    def keyword_density(self, text_or_texts, keywords: List[str], whole_word: bool = False, max_points=None, downsample="lttb", compact_x=False):
         text = self._concat(text_or_texts)
         sentences = self._sentences(text)
 
+        # One pass per sentence counts every keyword
+        matcher = get_matcher(keywords, whole_word)
+        counts = matcher.count_bulk([sentence.lower() for sentence in sentences])
+
         plot_data = []
 
-        for kw in keywords:
-            densities = [sentence.lower().count(kw.lower()) for sentence in sentences]
+        for k, kw in enumerate(keywords):
+            densities = [row[k] for row in counts]
 
             plot_data.append({
                 "x": list(range(len(densities))),
@@ -100,38 +192,62 @@ class AspectService:
                 "name": kw,
             })
 
-        return {"plotData": plot_data}
+        return self._plot({"plotData": plot_data}, max_points, downsample, compact_x)
 
     # ====================================================
     # LOCATION TREND
     # ====================================================
 
-    def location_trend(self, text_or_texts):
+    def _gazetteer(self):
+        # LocationService is heavy to build; main.py hands over the shared instance
+        if self.locations is None:
+            from services.location_service import LocationService
+            self.locations = LocationService()
+        return self.locations
+
+    def location_trend(self, text_or_texts, use_gazetteer: bool = False, max_points=None, downsample="lttb", compact_x=False):
+        """
+        Per-sentence location mentions from a single parse: every GPE entity (or
+        gazetteer match) is assigned to the sentence that contains it.
+        """
         text = self._concat(text_or_texts)
-        sentences = self._sentences(text)
-
-        plot_data = []
-        location_set = set()
-
-        # Pre-detect all unique locations
-        for s in sentences:
-            doc = nlp(s)
-            for ent in doc.ents:
-                if ent.label_ == "GPE":
-                    location_set.add(ent.text)
-
-        for loc in location_set:
-            density = [
-                1 if loc.lower() in s.lower() else 0
-                for s in sentences
-            ]
+        if not is_supported(text):
+            return self._plot({"plotData": []}, max_points, downsample, compact_x)
+        doc = nlp(text)
 
-            plot_data.append({
-                "x": list(range(len(sentences))),
+        # Sentence index by start token, skipping whitespace-only sentences
+        sentence_of = {}
+        for sent in doc.sents:
+            if sent.text.strip():
+                sentence_of[sent.start] = len(sentence_of)
+        n = len(sentence_of)
+
+        if use_gazetteer:
+            mentions = [(doc[i].sent.start, name) for i, name in self._gazetteer().match_doc(doc)]
+        else:
+            mentions = [(ent.sent.start, ent.text) for ent in doc.ents if ent.label_ == "GPE"]
+
+        # Case-insensitive grouping, named after the first surface form seen
+        series = {}
+        names = {}
+        for start, name in mentions:
+            if start not in sentence_of:
+                continue
+            key = name.lower()
+            if key not in series:
+                series[key] = [0] * n
+                names[key] = name
+            series[key][sentence_of[start]] = 1
+
+        plot_data = [
+            {
+                "x": list(range(n)),
                 "y": density,
                 "type": "scatter",
                 "mode": "lines+markers",
-                "name": loc,
-            })
+                "name": names[key],
+            }
+            for key, density in series.items()
+        ]
 
-        return {"plotData": plot_data}
+        return self._plot({"plotData": plot_data}, max_points, downsample, compact_x)
@@ -0,0 +1,104 @@
+# services/dedup_service.py
+'''
+Near-duplicate detection for article batches (the same wire story from many outlets).
+dedup_bulk() groups one batch by MinHash/LSH (utils/minhash.py). check() is the
+incremental mode: new articles are looked up in a persistent LSH index of earlier
+articles before anything else runs on them, and the ones that are not duplicates
+are added to it.
+'''
+import os
+import threading
+from typing import List, Dict, Any
+
+from utils.minhash import MinHasher, LSHIndex, duplicate_groups, NUM_PERM
+
+DEDUP_INDEX_PATH = os.getenv("DEDUP_INDEX_PATH", os.path.join("data", "index", "dedup.npz"))
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.8"))
+# The index is written to disk after this many new articles (and by save())
+DEDUP_SAVE_EVERY = int(os.getenv("DEDUP_SAVE_EVERY", "1000"))
+
+
+class DedupService:
+
+    def __init__(self, path: str = DEDUP_INDEX_PATH, threshold: float = DEDUP_THRESHOLD, save_every: int = DEDUP_SAVE_EVERY):
+        self.path = path
+        self.threshold = threshold
+        self.save_every = save_every
+        self._unsaved = 0
+        self.hasher = MinHasher(NUM_PERM)
+        self._lock = threading.Lock()
+        self._index = None
+
+    @property
+    def index(self):
+        # Loaded from disk on first use
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    if self.path and os.path.exists(self.path):
+                        # The configured threshold wins over the one the index was saved with
+                        index = LSHIndex.load(self.path, self.threshold)
+                        if index.num_perm == NUM_PERM:
+                            self._index = index
+                        else:
+                            print(f"Warning: dedup index in {self.path} was built with {index.num_perm} "
+                                  f"permutations, not {NUM_PERM}; starting an empty index")
+                    if self._index is None:
+                        self._index = LSHIndex(NUM_PERM, self.threshold)
+        return self._index
+
+    def dedup_bulk(self, texts: List[str], threshold: float = None) -> Dict[str, Any]:
+        """
+        Duplicate groups of a batch (lists of positions, first occurrence first) and,
+        per text, the position of the first text of its group (None when it is unique).
+        """
+        threshold = threshold if threshold is not None else self.threshold
+        groups = duplicate_groups(self.hasher.signatures(texts), threshold)
+        duplicate_of = [None] * len(texts)
+        for group in groups:
+            for i in group[1:]:
+                duplicate_of[i] = group[0]
+        return {"groups": groups, "duplicate_of": duplicate_of}
+
+    def check(self, articles: List[Dict[str, Any]], add: bool = True):
+        """
+        [{"id", "duplicate_of", "similarity"}] for [{"id", "text"}] articles: the id (as it
+        was sent, int or str) of the indexed article each one duplicates, None when it is
+        new. Re-sending an indexed id is not reported as a duplicate of itself. With
+        `add`, new articles join the index.
+        """
+        index = self.index
+        signatures = self.hasher.signatures([a.get("text") or "" for a in articles])
+        results = []
+        with self._lock:
+            for article, signature in zip(articles, signatures):
+                key = article["id"]
+                match = None if key in index else index.query(signature)
+                if match is None and add and index.insert(key, signature):
+                    self._unsaved += 1
+                results.append({
+                    "id": article["id"],
+                    "duplicate_of": match[0] if match else None,
+                    "similarity": round(match[1], 4) if match else None,
+                })
+            if self._unsaved >= self.save_every:
+                self._save()
+        return results
+
+    def _save(self):
+        if self.path and self._unsaved:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.index.save(self.path + ".tmp")
+            os.replace(self.path + ".tmp", self.path)
+        self._unsaved = 0
+
+    def save(self):
+        """Write the index to disk if articles were added since the last save."""
+        with self._lock:
+            self._save()
+
+    def stats(self):
+        index = self.index
+        return {"articles": len(index), "threshold": index.threshold, "bands": index.bands, "rows": index.rows}
@@ -0,0 +1,257 @@
+# services/embedding_service.py
+'''
+Offline article embeddings.
+Two engines share one interface (name, dim, encode(texts) -> L2-normalized float32):
+- HashingEngine: hashed word/bigram counts, sublinear TF-IDF, projected to `dim`
+  dimensions. Until it is fitted the projection is a fixed seeded random projection
+  (cosine preserving); fit(corpus) learns IDF weights and a truncated SVD instead.
+- SentenceEncoderEngine: a sentence-transformers model stored on local disk.
+The hashing engine's IDF + SVD is trained offline over the scraped article CSVs
+(`python services/embedding_service.py`) and saved to EMBEDDING_SVD_PATH, where
+load_engine() picks it up.
+EmbeddingService encodes in batches and caches vectors by (engine, article id,
+content hash), so re-embedding unchanged articles is a dictionary lookup.
+'''
+import glob
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+from sklearn.random_projection import SparseRandomProjection
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
+EMBEDDING_ENGINE = os.getenv("EMBEDDING_ENGINE", "hashing")
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "384"))
+EMBEDDING_MODEL_PATH = os.getenv("EMBEDDING_MODEL_PATH", os.path.join("data", "models", "sentence-encoder"))
+EMBEDDING_SVD_PATH = os.getenv("EMBEDDING_SVD_PATH", os.path.join("data", "models", "embedding_svd.joblib"))
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "50000"))
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "256"))
+
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _normalize_rows(matrix):
+    # Row-wise L2 normalization of a sparse matrix (keeps it sparse)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1))).ravel()
+    norms[norms == 0] = 1.0
+    return matrix.multiply(1.0 / norms[:, None]).tocsr()
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha1((text or "").encode("utf8")).hexdigest()
+
+
+class HashingEngine:
+
+    def __init__(self, dim: int = EMBEDDING_DIM, n_features: int = 2 ** 18, random_state: int = 10):
+        self.dim = dim
+        self.vectorizer = HashingVectorizer(
+            n_features=n_features, ngram_range=(1, 2), alternate_sign=False, norm=None, stop_words="english"
+        )
+        self.tfidf = None
+        self.svd = None
+        # Fixed projection used until a corpus has been fitted. Every hashed feature gets
+        # ~8 non-zero components; with the default density of 1/sqrt(n_features) about
+        # half of the features would project to nothing and short texts to a zero vector
+        self.projection = SparseRandomProjection(
+            n_components=dim, density=min(1.0, 8 / dim), dense_output=True, random_state=random_state
+        )
+        self.projection.fit(np.zeros((1, n_features)))
+        self.version = "rp"
+
+    @property
+    def name(self):
+        return f"hashing-{self.dim}-{self.version}"
+
+    @property
+    def fitted(self):
+        return self.svd is not None
+
+    def _counts(self, texts):
+        counts = self.vectorizer.transform(texts)
+        counts.data = 1.0 + np.log(counts.data)  # sublinear tf
+        return counts
+
+    def fit(self, texts: List[str]):
+        """Learn IDF weights and a truncated SVD over a corpus of articles."""
+        counts = self._counts(texts)
+        self.tfidf = TfidfTransformer(sublinear_tf=False).fit(counts)
+        weighted = self.tfidf.transform(counts)
+        n_components = min(self.dim, max(1, min(weighted.shape) - 1))
+        self.svd = TruncatedSVD(n_components=n_components, random_state=10).fit(weighted)
+        self.version = "svd-" + hashlib.sha1(self.svd.components_[:, :64].tobytes()).hexdigest()[:8]
+        return self
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        counts = self._counts(texts)
+        if self.svd is None:
+            vectors = self.projection.transform(_normalize_rows(counts))
+        else:
+            vectors = self.svd.transform(self.tfidf.transform(counts))
+            if vectors.shape[1] < self.dim:
+                vectors = np.hstack([vectors, np.zeros((vectors.shape[0], self.dim - vectors.shape[1]))])
+        return _normalize(vectors)
+
+    def save(self, path: str = EMBEDDING_SVD_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        joblib.dump(self, path)
+        return path
+
+    @staticmethod
+    def load(path: str = EMBEDDING_SVD_PATH):
+        return joblib.load(path)
+
+
+class SentenceEncoderEngine:
+
+    def __init__(self, path: str = EMBEDDING_MODEL_PATH):
+        if SentenceTransformer is None:
+            raise ImportError("The sentence encoder engine needs sentence-transformers (pip install sentence-transformers)")
+        if not os.path.isdir(path):
+            raise FileNotFoundError(f"No sentence encoder model at {path}")
+        self.model = SentenceTransformer(path, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.name = f"sentence-{os.path.basename(os.path.normpath(path))}-{self.dim}"
+        # Changes when the model files on disk are replaced
+        files = sorted((f, os.path.getsize(os.path.join(path, f))) for f in os.listdir(path) if os.path.isfile(os.path.join(path, f)))
+        self.version = hashlib.sha1(repr(files).encode("utf8")).hexdigest()[:8]
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        vectors = self.model.encode(list(texts), batch_size=EMBEDDING_BATCH_SIZE, convert_to_numpy=True, normalize_embeddings=True)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+def load_engine(name: str = EMBEDDING_ENGINE):
+    """The configured engine; the hashing baseline when the sentence encoder is not available."""
+    if name == "sentence":
+        try:
+            return SentenceEncoderEngine()
+        except (ImportError, FileNotFoundError) as e:
+            print(f"Warning: {e}, using the hashing embedding engine")
+    if os.path.exists(EMBEDDING_SVD_PATH):
+        return HashingEngine.load(EMBEDDING_SVD_PATH)
+    return HashingEngine()
+
+
+class EmbeddingService:
+
+    def __init__(self, engine=None, cache_size: int = EMBEDDING_CACHE_SIZE, batch_size: int = EMBEDDING_BATCH_SIZE):
+        self.engine = engine or load_engine()
+        self.cache_size = cache_size
+        self.batch_size = batch_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    @property
+    def dim(self):
+        return self.engine.dim
+
+    @property
+    def version(self):
+        """Version of the engine's vector space (the fitted SVD, the model files): vectors of two versions do not mix."""
+        return getattr(self.engine, "version", None)
+
+    # ====================================================
+    # Encoding
+    # ====================================================
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """(len(texts), dim) float32 matrix of L2-normalized embeddings, encoded in batches."""
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        texts = [t if isinstance(t, str) else "" for t in texts]
+        return np.vstack([self.engine.encode(texts[i:i + self.batch_size]) for i in range(0, len(texts), self.batch_size)])
+
+    def embed(self, texts: List[str], ids: List[Any] = None) -> np.ndarray:
+        """encode() with the cache: a (id, content) pair seen before is not encoded again."""
+        texts = [t if isinstance(t, str) else "" for t in texts]
+        ids = ids if ids is not None else [None] * len(texts)
+        keys = [(self.engine.name, str(i), content_hash(t)) for i, t in zip(ids, texts)]
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        missing = []
+        with self._lock:
+            for row, key in enumerate(keys):
+                vector = self._cache.get(key)
+                if vector is None:
+                    missing.append(row)
+                else:
+                    self._cache.move_to_end(key)
+                    out[row] = vector
+            self.stats["hits"] += len(texts) - len(missing)
+            self.stats["misses"] += len(missing)
+        if missing:
+            vectors = self.encode([texts[row] for row in missing])
+            out[missing] = vectors
+            with self._lock:
+                for row, vector in zip(missing, vectors):
+                    self._cache[keys[row]] = vector
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return out
+
+    def embed_articles(self, articles: List[Dict[str, Any]], id_field: str = "_id", text_fields=("title", "content")):
+        """(ids, matrix) for article dicts; the text is the concatenation of `text_fields`."""
+        ids = [article.get(id_field) for article in articles]
+        texts = ["\n".join(str(article.get(f) or "") for f in text_fields) for article in articles]
+        return ids, self.embed(texts, ids)
+
+    # ====================================================
+    # Baseline fitting
+    # ====================================================
+
+    def fit(self, texts: List[str], path: str = EMBEDDING_SVD_PATH):
+        """Fit the hashing engine's IDF + SVD on a corpus and save it; cached vectors of the old projection are dropped."""
+        if not isinstance(self.engine, HashingEngine):
+            raise ValueError("Only the hashing engine can be fitted")
+        self.engine.fit(texts)
+        self.engine.save(path)
+        with self._lock:
+            self._cache.clear()
+        return {"engine": self.engine.name, "dim": self.dim, "articles": len(texts)}
+
+
+_embedding_service = None
+
+
+def get_embedding_service():
+    global _embedding_service
+    if _embedding_service is None:
+        _embedding_service = EmbeddingService()
+    return _embedding_service
+
+
+def main():
+    # Fit the hashing baseline over the scraped corpus (header + details, as embed_articles joins title + content)
+    texts = []
+    for filename in glob.iglob(r'/opt/bitnami/spark/data/Scrapper/2024/**/*.csv', recursive=True):
+        df = pd.read_csv(filename, index_col=None, header=0, dtype="string")
+        texts.extend((df["Header"].fillna("") + "\n" + df["Detail"].fillna("")).tolist())
+
+    if not texts:
+        print("No articles found, the embedding engine was not fitted")
+        return
+    result = EmbeddingService(HashingEngine()).fit(texts)
+    print(f"Embedding engine {result['engine']} fitted on {result['articles']} articles, saved to {EMBEDDING_SVD_PATH}")
+
+
+if __name__ == "__main__":
+    main()
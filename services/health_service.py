@@ -0,0 +1,112 @@
+# services/health_service.py
+
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Any
+
+
+# Representative inputs used to warm every engine once before the worker
+# reports ready. They exercise sentence splitting, entities, gazetteer
+# lookups, lexicon sentiment and dates in the same way real news text does.
+WARMUP_TEXTS = [
+    "Heavy rain lashed Lahore on 5 March 2024, and the Punjab government declared an emergency.",
+    "Protesters gathered in Karachi yesterday; police said the situation was not very good but under control.",
+    "The Quetta district administration announced on March 12, 2024 that schools will reopen next week!",
+]
+
+# Whether a worker whose warm-up failed for some engine still reports ready (200,
+# status "degraded") instead of staying out of rotation (503)
+HEALTH_READY_ON_ERROR = os.getenv("TOOLS_READY_ON_ERROR", "0") not in ("0", "false", "False")
+
+
+class HealthService:
+    """Liveness / readiness state plus the warm-up routine run at startup."""
+
+    def __init__(self, ready_on_error: bool = HEALTH_READY_ON_ERROR):
+        self.ready_on_error = ready_on_error
+        self._engines: Dict[str, Callable[[List[str]], Any]] = {}
+        self._timings: Dict[str, float] = {}
+        self._errors: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._started_at = time.time()
+        self._warmup_started = None
+        self._warmup_finished = None
+
+    # ---------------------
+    # REGISTRATION
+    # ---------------------
+    def register(self, name: str, fn: Callable[[List[str]], Any]):
+        """Register an engine; `fn` receives the warm-up texts as a list."""
+        self._engines[name] = fn
+
+    # ---------------------
+    # WARM-UP
+    # ---------------------
+    def warm_up(self, rounds: int = 1, texts: List[str] = None):
+        """Run the warm-up texts through every registered engine, then mark ready."""
+        texts = texts or WARMUP_TEXTS
+        self._warmup_started = time.time()
+        for name, fn in self._engines.items():
+            start = time.perf_counter()
+            error = None
+            try:
+                for _ in range(max(1, rounds)):
+                    fn(texts)
+            except Exception as e:
+                # The remaining engines are still warmed; the worker reports
+                # "degraded" on /health/ready (see ready_on_error)
+                error = f"{type(e).__name__}: {e}"[:200]
+            with self._lock:
+                if error is not None:
+                    self._errors[name] = error
+                self._timings[name] = round(time.perf_counter() - start, 4)
+        self._warmup_finished = time.time()
+        self._ready.set()
+
+    def warm_up_async(self, rounds: int = 1):
+        """Start warm-up in a daemon thread so liveness answers immediately."""
+        thread = threading.Thread(target=self.warm_up, kwargs={"rounds": rounds}, daemon=True)
+        thread.start()
+        return thread
+
+    def mark_ready(self):
+        """Skip warm-up (e.g. disabled by configuration) and report ready."""
+        self._ready.set()
+
+    # ---------------------
+    # PROBES
+    # ---------------------
+    def is_ready(self) -> bool:
+        """Warm-up finished, and either every engine warmed or ready_on_error is set."""
+        if not self._ready.is_set():
+            return False
+        with self._lock:
+            failed = bool(self._errors)
+        return self.ready_on_error or not failed
+
+    def liveness(self) -> Dict[str, Any]:
+        return {"status": "alive", "uptime": round(time.time() - self._started_at, 3)}
+
+    def readiness(self) -> Dict[str, Any]:
+        with self._lock:
+            timings = dict(self._timings)
+            errors = dict(self._errors)
+        pending = [name for name in self._engines if name not in timings]
+        duration = None
+        if self._warmup_started and self._warmup_finished:
+            duration = round(self._warmup_finished - self._warmup_started, 4)
+        if not self._ready.is_set():
+            status = "warming_up"
+        elif errors:
+            status = "degraded"
+        else:
+            status = "ready"
+        return {
+            "status": status,
+            "engines": timings,
+            "pending": pending,
+            "errors": errors,
+            "warmup_seconds": duration,
+        }
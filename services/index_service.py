@@ -0,0 +1,258 @@
+# services/index_service.py
+'''
+Persistent inverted index over processed articles (SQLite).
+Each article is parsed once at ingest: its terms, noun-chunk topics (normalized by
+phrase_key, so "the prime minister" is found as "prime minister") and GPE locations
+become postings (kind, key) -> (article, tf) and its VADER compound score is stored
+next to the article date. Date-range trend queries are then answered from the index
+with a single grouped SQL query instead of reparsing the raw articles.
+'''
+import os
+import sqlite3
+import threading
+from collections import Counter
+from datetime import date, datetime
+from typing import List, Dict, Any, Optional
+
+from Parsing_Tools.sentiment import get_batch_scorer
+from services.aspect_service import nlp
+
+INDEX_PATH = os.getenv("ASPECT_INDEX_PATH", os.path.join("data", "index", "articles.db"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id        INTEGER PRIMARY KEY,
+    doc_id    TEXT UNIQUE NOT NULL,
+    date      TEXT NOT NULL,
+    sentiment REAL NOT NULL,
+    n_terms   INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS articles_date ON articles (date);
+CREATE TABLE IF NOT EXISTS postings (
+    kind    TEXT NOT NULL,
+    key     TEXT NOT NULL,
+    article INTEGER NOT NULL REFERENCES articles (id) ON DELETE CASCADE,
+    tf      INTEGER NOT NULL,
+    PRIMARY KEY (kind, key, article)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_article ON postings (article);
+"""
+
+
+def iso_date(value) -> str:
+    """
+    YYYY-MM-DD for a date, a datetime or an ISO 8601 string. Dates are stored and
+    compared as text, so anything else ("2024-1-5", "05/01/2024") is rejected
+    instead of silently falling outside (or inside) a range.
+    """
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return datetime.fromisoformat(value).date().isoformat()
+
+
+def phrase_key(tokens):
+    """
+    Lookup key of a noun phrase: stop words (determiners, possessives, "of") and
+    punctuation dropped, lowercased, and the last word, the head of an English noun
+    chunk, lemmatized. "The Prime Ministers'" and "prime minister" share one key.
+    None when nothing is left.
+    """
+    words = [t for t in tokens if not (t.is_stop or t.is_punct or t.is_space)]
+    if not words:
+        return None
+    head = words[-1]
+    return " ".join([t.lower_ for t in words[:-1]] + [(head.lemma_ or head.text).lower()])
+
+
+TERM = "term"
+TOPIC = "topic"
+LOCATION = "location"
+
+
+class IndexService:
+
+    def __init__(self, path: str = INDEX_PATH):
+        self.path = path
+        self._conn = None
+        # Reentrant: _query() holds it while _db() opens the connection
+        self._lock = threading.RLock()
+        # Called with the parsed docs of every ingested batch
+        self._listeners = []
+
+    # ====================================================
+    # Storage
+    # ====================================================
+
+    def _db(self):
+        # Opened on first use so importing the router never touches the disk
+        if self._conn is None:
+            with self._lock:
+                if self._conn is None:
+                    directory = os.path.dirname(self.path)
+                    if directory:
+                        os.makedirs(directory, exist_ok=True)
+                    conn = sqlite3.connect(self.path, check_same_thread=False)
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.execute("PRAGMA foreign_keys=ON")
+                    conn.executescript(SCHEMA)
+                    self._conn = conn
+        return self._conn
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._db().execute(sql, params).fetchall()
+
+    # ====================================================
+    # INGEST
+    # ====================================================
+
+    def subscribe(self, listener):
+        """Register `listener(docs, dates)` to receive the spaCy docs and ISO dates of every ingested batch."""
+        self._listeners.append(listener)
+
+    def _postings(self, doc):
+        terms = Counter(
+            t.lower_ for t in doc
+            if (t.is_alpha or t.like_num) and not t.is_stop
+        )
+        try:
+            topics = Counter(key for key in map(phrase_key, doc.noun_chunks) if key)
+        except ValueError:
+            # Pipelines without a dependency parser have no noun chunks
+            topics = Counter()
+        locations = Counter(ent.text.lower() for ent in doc.ents if ent.label_ == "GPE")
+        return terms, topics, locations
+
+    def add_articles(self, articles: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Index articles given as {"id", "text", "date"} (a date or an ISO date string).
+        Articles whose id is already indexed are replaced, so re-sending an edited
+        article keeps the index exact.
+        """
+        if not articles:
+            return {"added": 0, "updated": 0, "articles": self.count()}
+
+        dates = [iso_date(a["date"]) for a in articles]
+        texts = [a["text"] for a in articles]
+        sentiments = [s["compound"] for s in get_batch_scorer().vader_scores(texts)]
+        docs = list(nlp.pipe(texts, batch_size=32))
+
+        added = updated = 0
+        db = self._db()
+        with self._lock, db:
+            for article, day, doc, sentiment in zip(articles, dates, docs, sentiments):
+                terms, topics, locations = self._postings(doc)
+                row = db.execute("SELECT id FROM articles WHERE doc_id = ?", (article["id"],)).fetchone()
+                if row:
+                    db.execute("DELETE FROM postings WHERE article = ?", (row[0],))
+                    db.execute(
+                        "UPDATE articles SET date = ?, sentiment = ?, n_terms = ? WHERE id = ?",
+                        (day, sentiment, sum(terms.values()), row[0]),
+                    )
+                    article_id = row[0]
+                    updated += 1
+                else:
+                    article_id = db.execute(
+                        "INSERT INTO articles (doc_id, date, sentiment, n_terms) VALUES (?, ?, ?, ?)",
+                        (article["id"], day, sentiment, sum(terms.values())),
+                    ).lastrowid
+                    added += 1
+                db.executemany(
+                    "INSERT INTO postings (kind, key, article, tf) VALUES (?, ?, ?, ?)",
+                    [
+                        (kind, key, article_id, tf)
+                        for kind, counter in ((TERM, terms), (TOPIC, topics), (LOCATION, locations))
+                        for key, tf in counter.items()
+                    ],
+                )
+            total = db.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+        for listener in self._listeners:
+            listener(docs, dates)
+
+        return {"added": added, "updated": updated, "articles": total}
+
+    def remove_articles(self, ids: List[str]) -> int:
+        db = self._db()
+        with self._lock, db:
+            removed = 0
+            for doc_id in ids:
+                removed += db.execute("DELETE FROM articles WHERE doc_id = ?", (doc_id,)).rowcount
+        return removed
+
+    def count(self) -> int:
+        return self._query("SELECT COUNT(*) FROM articles")[0][0]
+
+    # ====================================================
+    # LOOKUPS
+    # ====================================================
+
+    def _topic_key(self, phrase: str):
+        # Normalized like the noun chunks it was indexed from
+        return phrase_key(nlp(phrase.strip())) or phrase.strip().lower()
+
+    def _key(self, keyword: str):
+        # Single words are looked up as terms, phrases as noun-chunk topics
+        key = keyword.strip().lower()
+        if " " in key:
+            return TOPIC, self._topic_key(keyword)
+        return TERM, key
+
+    def _series(self, kind, key, start_date, end_date, value_sql):
+        rows = self._query(
+            f"""
+            SELECT a.date, {value_sql}
+            FROM postings p JOIN articles a ON a.id = p.article
+            WHERE p.kind = ? AND p.key = ? AND a.date BETWEEN ? AND ?
+            GROUP BY a.date ORDER BY a.date
+            """,
+            (kind, key, iso_date(start_date), iso_date(end_date)),
+        )
+        return [r[0] for r in rows], [r[1] for r in rows]
+
+    def _plot(self, names, lookups, start_date, end_date, value_sql, mode="lines+markers"):
+        plot_data = []
+        for name, (kind, key) in zip(names, lookups):
+            x, y = self._series(kind, key, start_date, end_date, value_sql)
+            plot_data.append({
+                "x": x,
+                "y": y,
+                "type": "scatter",
+                "mode": mode,
+                "name": name,
+            })
+        return {"plotData": plot_data}
+
+    # ====================================================
+    # DATE RANGE TRENDS
+    # ====================================================
+
+    def sentiment_trend(self, keywords: List[str], start_date: date, end_date: date):
+        """Mean article sentiment per day over the articles mentioning each keyword."""
+        return self._plot(
+            keywords, [self._key(k) for k in keywords], start_date, end_date,
+            "AVG(a.sentiment)",
+        )
+
+    def topic_trend(self, topics: List[str], start_date: date, end_date: date):
+        """Number of articles per day containing each noun-chunk topic."""
+        return self._plot(
+            topics, [(TOPIC, self._topic_key(t)) for t in topics], start_date, end_date,
+            "COUNT(*)",
+        )
+
+    def keyword_density(self, keywords: List[str], start_date: date, end_date: date):
+        """Occurrences per day of each keyword, relative to the indexed terms of those articles."""
+        return self._plot(
+            keywords, [self._key(k) for k in keywords], start_date, end_date,
+            "CAST(SUM(p.tf) AS REAL) / MAX(1, SUM(a.n_terms))",
+        )
+
+    def location_trend(self, locations: List[str], start_date: date, end_date: date):
+        """Number of mentions per day of each location."""
+        return self._plot(
+            locations, [(LOCATION, l.strip().lower()) for l in locations], start_date, end_date,
+            "SUM(p.tf)",
+        )
@@ -3,12 +3,18 @@ import csv
 import json
 import sys
 import spacy
+from functools import lru_cache
 from fuzzywuzzy import fuzz
 from nltk import download as nltk_download
+from utils.admin_map import PROVINCE_CITIES
+from utils.language import is_supported
 
 # Increase CSV field size limit to handle large GeoJSON data
 csv.field_size_limit(sys.maxsize)
 
+# Proper nouns whose gazetteer candidates are kept in memory
+LOCATION_CANDIDATE_CACHE = int(os.getenv("LOCATION_CANDIDATE_CACHE", "20000"))
+
 # Load spaCy model
 try:
     nlp = spacy.load("en_core_web_sm")
@@ -27,48 +33,13 @@ class LocationService:
         self.tehsil_coords_file = os.path.join("utils", "tehsil.csv")
         
         self.Data_of_region, self.index = self.load_cities(self.data_file)
+        # proper noun -> gazetteer entries matching it as first word, least recently used dropped first
+        self._first_word_candidates = lru_cache(maxsize=LOCATION_CANDIDATE_CACHE)(self._first_word_candidates)
         self.province_coords = self.load_coordinates(self.province_coords_file, "province")
         self.district_coords = self.load_coordinates(self.district_coords_file, "district")
         self.tehsil_coords = self.load_coordinates(self.tehsil_coords_file, "tehsil")
         
-        self.map = {
-            "Punjab": [
-                "Lahore", "Rawalpindi", "Faisalabad", "Multan", "Gujranwala",
-                "Sialkot", "Sargodha", "Bahawalpur", "Rahim Yar Khan",
-                "Sheikhupura", "Kasur", "Okara", "Sahiwal", "Jhang",
-                "Toba Tek Singh", "Mianwali", "Attock", "Chakwal",
-                "Gujrat", "Mandi Bahauddin", "Muzaffargarh", "Dera Ghazi Khan",
-                "Pakpattan", "Vehari", "Khanewal", "Hafizabad",
-                "Nankana Sahib", "Layyah", "Burewala", "Sadiqabad",
-                "Khanpur", "Kot Momin", "Arifwala", "Wazirabad",
-                "Sambrial", "Kharian", "Jhelum"
-            ],
-            "Sindh": [
-                "Karachi", "Hyderabad", "Sukkur", "Larkana", "Mirpur Khas",
-                "Nawabshah", "Thatta", "Badin", "Dadu", "Jamshoro",
-                "Jacobabad", "Ghotki", "Khairpur", "Shikarpur", "Sanghar",
-                "Kashmore", "Umerkot", "Tando Allahyar", "Tando Muhammad Khan",
-                "Kotri", "Mirpur Mathelo", "Ranipur", "Qambar",
-                "Shahdadkot", "Tando Adam", "Manzoor Colony (Karachi)",
-                "Sultanabad (Karachi)", "Kehkeshan (Karachi)"
-            ],
-            "KPK": [
-                "Peshawar", "Mardan", "Swat", "Mingora", "Abbottabad",
-                "Mansehra", "Haripur", "Swabi", "Nowshera", "Charsadda",
-                "Kohat", "Dera Ismail Khan", "Bannu", "Battagram",
-                "Buner", "Lower Dir", "Upper Dir", "Chitral",
-                "Batkhela", "Karak", "Hangu", "Shangla",
-                "Pattan", "Banda", "Razar", "Beka",
-                "Gandaf", "Arkot", "Bandi Shungli"
-            ],
-            "Balochistan": [
-                "Quetta", "Gwadar", "Turbat", "Khuzdar", "Hub",
-                "Chaman", "Pishin", "Sibi", "Zhob",
-                "Loralai", "Kalat", "Panjgur", "Ormara",
-                "Dera Murad Jamali", "Usta Muhammad", "Kharan",
-                "Awaran", "Lasbela"
-            ]
-        }
+        self.map = PROVINCE_CITIES
 
     def load_cities(self, file):
         data = []
@@ -134,21 +105,11 @@ class LocationService:
         
         return coords_dict
 
-    def extract_location(self, text: str):
-        if not text or not isinstance(text, str):
-            return {"location": None, "candidates": {}}
-
-        doc = nlp(text)
-        cities = {}
-
-        for token in doc:
-            if token.pos_ != "PROPN":
-                continue
-
-            key = token.text.lower()[0]
-            if key not in self.index:
-                continue
-
+    def _first_word_candidates(self, word):
+        """Gazetteer entries (split into words) whose first word fuzzy-matches `word`."""
+        candidates = []
+        key = word[0]
+        if key in self.index:
             start_i = self.index[key]
             end_i = start_i + 400
             if end_i > len(self.Data_of_region):
@@ -156,9 +117,23 @@ class LocationService:
 
             for loc in self.Data_of_region[start_i:end_i]:
                 parts = loc.split()
-                if fuzz.ratio(token.text.lower(), parts[0]) < 95:
-                    continue
+                if fuzz.ratio(word, parts[0]) >= 95:
+                    candidates.append(parts)
+
+        return candidates
 
+    def match_doc(self, doc):
+        """
+        Gazetteer matches in an already parsed doc as (token index, matched location),
+        one entry per location matched at a proper noun.
+        """
+        matches = []
+
+        for token in doc:
+            if token.pos_ != "PROPN":
+                continue
+
+            for parts in self._first_word_candidates(token.text.lower()):
                 match_len = 1
                 good = True
 
@@ -175,8 +150,20 @@ class LocationService:
                 if not good:
                     continue
 
-                matched = " ".join(parts)
-                cities[matched] = cities.get(matched, 0) + 1
+                matches.append((token.i, " ".join(parts)))
+
+        return matches
+
+    def extract_location(self, text: str):
+        # Non-English text never matches the gazetteer, skip the spaCy pass
+        if not text or not isinstance(text, str) or not is_supported(text):
+            return {"location": None, "candidates": {}}
+
+        doc = nlp(text)
+        cities = {}
+
+        for _, matched in self.match_doc(doc):
+            cities[matched] = cities.get(matched, 0) + 1
 
         if not cities:
             return {"location": None, "candidates": {}}
@@ -3,6 +3,9 @@ import spacy
 from spacy.cli import download
 from nltk.sentiment import SentimentIntensityAnalyzer
 from nltk import download as nltk_download
+from Parsing_Tools.sentiment import get_batch_scorer
+from Parsing_Tools.temporal import extract_temporal, extract_temporal_bulk
+from utils.language import is_supported, route_bulk
 
 # ---------------------
 # Load spaCy safely
@@ -38,7 +41,7 @@ class ParserService:
     # LOCATION (simple pattern-based extractor)
     # ---------------------------------------------------------
     def get_location(self, text: str):
-        if not isinstance(text, str):
+        if not isinstance(text, str) or not is_supported(text):
             return None
         
         doc = nlp(text)
@@ -56,17 +59,24 @@ class ParserService:
     def get_time(self, text: str):
         if not isinstance(text, str):
             return None
-        matches = re.findall(r"\b(20\d{2}|19\d{2})\b", text)
+        matches = [t["text"] for t in extract_temporal(text) if t["type"] == "year"]
         return matches if matches else None
 
     def get_time_bulk(self, texts: list[str]):
         return [self.get_time(t) for t in texts]
 
+    def get_time_normalized(self, text: str):
+        """Temporal expressions with ISO values and character spans."""
+        return extract_temporal(text)
+
+    def get_time_normalized_bulk(self, texts: list[str]):
+        return extract_temporal_bulk(texts)
+
     # ---------------------------------------------------------
     # TOPICS (noun-chunk based)
     # ---------------------------------------------------------
     def get_topics(self, text: str):
-        if not isinstance(text, str):
+        if not isinstance(text, str) or not is_supported(text):
             return []
         doc = nlp(text)
         return list(set(chunk.text.lower() for chunk in doc.noun_chunks))
@@ -78,9 +88,14 @@ class ParserService:
     # SENTIMENT
     # ---------------------------------------------------------
     def get_sentiment(self, text: str):
-        if not isinstance(text, str):
+        if not isinstance(text, str) or not is_supported(text):
             return {"compound": 0}
         return vader.polarity_scores(text)
 
     def get_sentiment_bulk(self, texts: list[str]):
-        return [self.get_sentiment(t) for t in texts]
+        # Score the whole batch at once with the shared VADER lexicon
+        # Non-English texts get the same neutral score as missing ones
+        def score(batch):
+            scores = iter(get_batch_scorer().vader_scores([t for t in batch if isinstance(t, str)]))
+            return [next(scores) if isinstance(t, str) else {"compound": 0} for t in batch]
+        return route_bulk(texts, score, lambda: {"compound": 0})
@@ -40,6 +40,10 @@ class ProcessingService:
 import re
 from typing import List, Dict, Any
 from collections import Counter
+from utils.keyword_matcher import get_matcher
+from utils.language import is_supported, route_bulk
+from services.embedding_service import get_embedding_service
+from Parsing_Tools.temporal import extract_temporal
 
 # Try safe import / download patterns for spaCy & NLTK/TextBlob
 try:
@@ -59,6 +63,11 @@ try:
 except Exception:
     TextBlob = None
 
+try:
+    from Parsing_Tools.sentiment import get_batch_scorer
+except Exception:
+    get_batch_scorer = None
+
 # Safe spaCy loader
 def _load_spacy_model(name="en_core_web_sm"):
     global spacy
@@ -134,7 +143,7 @@ class ProcessingService:
         """Return list of (text, label) dicts for selected entity types."""
         if not isinstance(text, str):
             return []
-        if not nlp:
+        if not nlp or not is_supported(text):
             return []
         doc = nlp(text)
         out = []
@@ -167,7 +176,7 @@ class ProcessingService:
     # TOPICS - noun-chunk based (lightweight)
     # ---------------------
     def topic_trend(self, text: str) -> List[str]:
-        if not isinstance(text, str):
+        if not isinstance(text, str) or not is_supported(text):
             return []
         if not nlp:
             # fallback: return most common words excluding stopwords-ish short tokens
@@ -184,16 +193,17 @@ class ProcessingService:
     # ---------------------
     # KEYWORD DENSITY (simple)
     # ---------------------
-    def keyword_density(self, texts: List[str], keywords: List[str]) -> List[Dict[str, Dict[str, float]]]:
+    def keyword_density(self, texts: List[str], keywords: List[str], whole_word: bool = False) -> List[Dict[str, Dict[str, float]]]:
         results = []
         kws = [k.lower() for k in keywords]
+        # Single Aho-Corasick pass per text for the whole keyword list
+        matcher = get_matcher(kws, whole_word)
         for text in texts:
             text_lower = (text or "").lower()
             words = re.findall(r"\w+", text_lower)
             total = max(1, len(words))
             density_map = {}
-            for kw in kws:
-                count = text_lower.count(kw)
+            for kw, count in zip(kws, matcher.count(text_lower)):
                 density_map[kw] = {"count": count, "density": count / total}
             results.append(density_map)
         return results
@@ -203,7 +213,7 @@ class ProcessingService:
     # ---------------------
     def sentiment(self, text: str) -> Dict[str, float]:
         """Return sentiment dict that includes vader (compound) and textblob (polarity) and average."""
-        if not isinstance(text, str):
+        if not isinstance(text, str) or not is_supported(text):
             return {"vader": 0.0, "textblob": 0.0, "average": 0.0}
         vader_score = 0.0
         tb_score = 0.0
@@ -228,39 +238,44 @@ class ProcessingService:
         return {"vader": vader_score, "textblob": tb_score, "average": avg}
 
     def sentiment_bulk(self, texts: List[str]) -> List[Dict[str, float]]:
-        return [self.sentiment(t) for t in texts]
+        """Batch version of sentiment(): both lexicons are scored over the whole batch at once."""
+        if get_batch_scorer is None or not all(isinstance(t, str) for t in texts):
+            return [self.sentiment(t) for t in texts]
+        return route_bulk(texts, self._sentiment_batch, lambda: {"vader": 0.0, "textblob": 0.0, "average": 0.0})
+
+    def _sentiment_batch(self, texts: List[str]) -> List[Dict[str, float]]:
+        scores = get_batch_scorer().score(texts)
+        return [
+            {"vader": s["vader"], "textblob": s["textblob"], "average": (s["vader"] + s["textblob"]) / 2.0}
+            for s in scores
+        ]
 
     # ---------------------
     # TIME EXTRACTION (lightweight)
     # ---------------------
     def extract_years(self, text: str) -> List[str]:
-        """Extract 4-digit years like 1980, 2024 using regex (mirrors NewsNet simple year extraction)."""
-        if not isinstance(text, str):
-            return []
-        matches = re.findall(r"\b(19\d{2}|20\d{2})\b", text)
-        return matches
+        """Extract 4-digit years like 1980, 2024 (mirrors NewsNet simple year extraction)."""
+        return [t["text"] for t in extract_temporal(text) if t["type"] == "year"]
 
     def extract_dates_like(self, text: str) -> List[str]:
         """
-        Lightweight date extraction patterns (DD Month YYYY, Month DD, YYYY, ISO).
+        Lightweight date extraction patterns (DD Month YYYY, Month DD, YYYY, ISO), see
+        Parsing_Tools/temporal.py for how the single scan differs from the old patterns.
         This is intentionally simple — for robust extraction use datefinder / dateparser.
         """
-        if not isinstance(text, str):
-            return []
-        results = set()
-        # ISO-like dates
-        iso_matches = re.findall(r"\b(20\d{2}-\d{2}-\d{2})\b", text)
-        for m in iso_matches:
-            results.add(m)
-        # Month name patterns e.g. 'March 5, 2024' or '5 March 2024'
-        month_pat = r'\b(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|Jun(?:e)?|Jul(?:y)?|Aug(?:ust)?|Sep(?:tember)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)\b'
-        more = re.findall(rf'(\d{{1,2}}\s+{month_pat}\s+\d{{4}})', text, flags=re.IGNORECASE)
-        for m in more:
-            results.add(m[0] if isinstance(m, tuple) else m)
-        more2 = re.findall(rf'({month_pat}\s+\d{{1,2}},?\s+\d{{4}})', text, flags=re.IGNORECASE)
-        for m in more2:
-            results.add(m[0] if isinstance(m, tuple) else m)
-        return sorted(list(results))
+        return sorted({t["text"] for t in extract_temporal(text) if t["type"] == "date"})
+
+    def time_extract(self, text: str) -> Dict[str, Any]:
+        """Years, dates and the normalized temporal expressions (with spans) from one scan."""
+        found = extract_temporal(text)
+        return {
+            "years": [t["text"] for t in found if t["type"] == "year"],
+            "dates": sorted({t["text"] for t in found if t["type"] == "date"}),
+            "normalized": found,
+        }
+
+    def time_extract_bulk(self, texts: List[str]) -> List[Dict[str, Any]]:
+        return [self.time_extract(t) for t in texts]
 
     # ---------------------
     # FORMAT FOR LLM (format articles -> big prompt)
@@ -332,28 +347,18 @@ class ProcessingService:
             return 0.0
         return intersection / union
     
-    def create_embeddings(articles):
-        """Create embeddings for articles using a simple approach"""
-    # For now, using random embeddings - replace with actual embedding model
-        embeddings = []
-        article_ids = []
-    
-        for article in articles:
-        # In production, use a proper embedding model like Sentence-BERT
-        # For now, creating random embeddings
-            embedding = np.random.randn(384).astype('float32')
-            embeddings.append(embedding)
-            article_ids.append(int(article['_id']))
-    
-        embeddings = np.array(embeddings).astype('float32')
-    
-         # Create FAISS index
+    def create_embeddings(self, articles):
+        """FAISS index (ids = article '_id') over the embeddings of title + content."""
+        article_ids, embeddings = get_embedding_service().embed_articles(articles)
+        article_ids = [int(i) for i in article_ids]
+
+        # Create FAISS index
         index = faiss.IndexFlatL2(embeddings.shape[1])
-    
+
         # Wrap in IDMap first (before adding vectors)
         id_map = faiss.IndexIDMap(index)
-    
+
         # Now add embeddings with their IDs
-        id_map.add_with_ids(embeddings, np.array(article_ids))
-    
-        return id_map, article_ids
\ No newline at end of file
+        id_map.add_with_ids(embeddings, np.array(article_ids, dtype=np.int64))
+
+        return id_map, article_ids
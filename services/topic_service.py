@@ -0,0 +1,205 @@
+# services/topic_service.py
+'''
+Registry of fitted topic models.
+A fit request only enqueues the work: the model id is returned immediately and the
+TF-IDF vectorizer + LDA/NMF are fitted by a background worker, then persisted with
+joblib. The id is derived from the articles and the fit parameters (num_words only
+picks how many words /topics shows, it is not part of the id), so repeating a fit
+request reuses the existing model. Fitted models stay in an LRU cache and are
+reloaded from disk after eviction. Only the TOPIC_MODEL_KEEP most recently used
+model files are kept on disk.
+'''
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any
+
+import joblib
+import numpy as np
+from sklearn.decomposition import NMF, LatentDirichletAllocation
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+TOPIC_MODEL_DIR = os.getenv("TOPIC_MODEL_DIR", os.path.join("data", "models", "topics"))
+TOPIC_FIT_WORKERS = int(os.getenv("TOPIC_FIT_WORKERS", "1"))
+TOPIC_CACHE_SIZE = int(os.getenv("TOPIC_CACHE_SIZE", "4"))
+TOPIC_MODEL_KEEP = int(os.getenv("TOPIC_MODEL_KEEP", "100"))
+
+# Model ids are the first 16 hex digits of a sha1, nothing else names a model file
+MODEL_ID_RE = re.compile(r"[0-9a-f]{16}")
+
+PENDING = "pending"
+RUNNING = "running"
+READY = "ready"
+FAILED = "failed"
+
+
+class TopicService:
+
+    def __init__(self, model_dir: str = TOPIC_MODEL_DIR, workers: int = TOPIC_FIT_WORKERS, cache_size: int = TOPIC_CACHE_SIZE,
+                 keep: int = TOPIC_MODEL_KEEP):
+        self.model_dir = model_dir
+        self.cache_size = cache_size
+        self.keep = keep
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="topic-fit")
+        self._status: Dict[str, Dict[str, Any]] = {}
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    # ====================================================
+    # Utility
+    # ====================================================
+
+    def _path(self, model_id: str):
+        """Model file of `model_id`; KeyError when it is not a model id (never a path outside model_dir)."""
+        if not isinstance(model_id, str) or not MODEL_ID_RE.fullmatch(model_id):
+            raise KeyError(model_id)
+        return os.path.join(self.model_dir, f"{model_id}.joblib")
+
+    def _model_id(self, articles, params):
+        fit_params = {name: value for name, value in params.items() if name != "num_words"}
+        digest = hashlib.sha1(json.dumps(fit_params, sort_keys=True).encode("utf8"))
+        for article in articles:
+            digest.update(article.encode("utf8"))
+            digest.update(b"\0")
+        return digest.hexdigest()[:16]
+
+    def _remember(self, model_id, fitted):
+        with self._lock:
+            self._cache[model_id] = fitted
+            self._cache.move_to_end(model_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _get(self, model_id: str):
+        """Fitted model from the LRU cache, loaded from disk on a miss. KeyError if unknown or not fitted yet."""
+        with self._lock:
+            if model_id in self._cache:
+                self._cache.move_to_end(model_id)
+                return self._cache[model_id]
+        path = self._path(model_id)
+        if not os.path.exists(path):
+            raise KeyError(model_id)
+        fitted = joblib.load(path)
+        # The file's mtime is its last use for the retention policy
+        os.utime(path)
+        self._remember(model_id, fitted)
+        return fitted
+
+    def _cleanup(self):
+        """Delete the least recently used model files beyond `keep`; cached and in-flight models are not counted."""
+        with self._lock:
+            protected = set(self._cache) | {
+                model_id for model_id, status in self._status.items() if status["status"] in (PENDING, RUNNING)
+            }
+        files = []
+        for name in os.listdir(self.model_dir):
+            model_id, ext = os.path.splitext(name)
+            if ext == ".joblib" and MODEL_ID_RE.fullmatch(model_id) and model_id not in protected:
+                path = os.path.join(self.model_dir, name)
+                files.append((os.path.getmtime(path), model_id, path))
+        files.sort(reverse=True)
+        for _, model_id, path in files[self.keep:]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            with self._lock:
+                if self._status.get(model_id, {}).get("status") == READY:
+                    del self._status[model_id]
+
+    # ====================================================
+    # FIT (background)
+    # ====================================================
+
+    def _train(self, articles, params):
+        vectorizer = TfidfVectorizer(max_df=params["max_df"], min_df=params["min_df"], stop_words="english")
+        X = vectorizer.fit_transform(articles)
+        if params["method"] == "lda":
+            model = LatentDirichletAllocation(n_components=params["num_topics"], max_iter=10, random_state=10)
+        else:
+            model = NMF(n_components=params["num_topics"], max_iter=1000, random_state=10)
+        model.fit(X)
+        return {
+            "params": params,
+            "vectorizer": vectorizer,
+            "model": model,
+            "feature_names": vectorizer.get_feature_names_out(),
+        }
+
+    def _fit(self, model_id, articles, params):
+        self._status[model_id].update(status=RUNNING, started=time.time())
+        try:
+            fitted = self._train(articles, params)
+            os.makedirs(self.model_dir, exist_ok=True)
+            joblib.dump(fitted, self._path(model_id))
+            self._remember(model_id, fitted)
+            self._status[model_id].update(status=READY, finished=time.time())
+        except Exception as e:
+            self._status[model_id].update(status=FAILED, error=f"{type(e).__name__}: {e}", finished=time.time())
+            return
+        try:
+            self._cleanup()
+        except OSError as e:
+            print(f"Warning: topic model cleanup in {self.model_dir} failed: {e}")
+
+    def fit(self, articles: List[str], method: str = "lda", num_topics: int = 5, num_words: int = 10,
+            max_df: float = 0.95, min_df: float = 0.05) -> Dict[str, Any]:
+        """Queue a fit and return its model id; an identical earlier fit is reused."""
+        params = {
+            "method": method,
+            "num_topics": num_topics,
+            "num_words": num_words,
+            "max_df": max_df,
+            "min_df": min_df,
+        }
+        model_id = self._model_id(articles, params)
+        with self._lock:
+            current = self._status.get(model_id)
+            if current is None or current["status"] == FAILED:
+                if os.path.exists(self._path(model_id)):
+                    self._status[model_id] = {"model_id": model_id, "status": READY, "params": params}
+                else:
+                    self._status[model_id] = {"model_id": model_id, "status": PENDING, "params": params, "articles": len(articles)}
+                    self._executor.submit(self._fit, model_id, list(articles), params)
+        return self.status(model_id)
+
+    def warm_up(self, texts: List[str]):
+        """Fit and apply both methods on `texts` in memory; nothing is registered or saved."""
+        for method in ("lda", "nmf"):
+            params = {"method": method, "num_topics": 2, "num_words": 3, "max_df": 1.0, "min_df": 1}
+            fitted = self._train(texts, params)
+            fitted["model"].transform(fitted["vectorizer"].transform(texts))
+
+    def status(self, model_id: str) -> Dict[str, Any]:
+        if model_id not in self._status:
+            if not os.path.exists(self._path(model_id)):
+                raise KeyError(model_id)
+            self._status[model_id] = {"model_id": model_id, "status": READY, "params": self._get(model_id)["params"]}
+        return dict(self._status[model_id])
+
+    # ====================================================
+    # QUERIES (fitted models only)
+    # ====================================================
+
+    def topics(self, model_id: str, num_words: int = None) -> List[List[str]]:
+        fitted = self._get(model_id)
+        num_words = num_words or fitted["params"]["num_words"]
+        feature_names = fitted["feature_names"]
+        return [
+            [str(feature_names[i]) for i in topic.argsort()[:-num_words - 1:-1]]
+            for topic in fitted["model"].components_
+        ]
+
+    def transform(self, model_id: str, texts: List[str]) -> Dict[str, Any]:
+        """Topic weights for every text plus the index of its dominant topic."""
+        fitted = self._get(model_id)
+        weights = fitted["model"].transform(fitted["vectorizer"].transform(texts))
+        return {
+            "weights": weights.round(6).tolist(),
+            "topic": np.argmax(weights, axis=1).tolist() if len(texts) else [],
+        }
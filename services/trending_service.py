@@ -0,0 +1,131 @@
+# services/trending_service.py
+'''
+"What's trending now": streaming heavy hitters of noun-chunk topics, named entities
+and locations over sliding time windows. Counters live in bounded-memory sketches
+(utils.sketches), so nothing is stored or recounted per article. Articles fed by the
+IndexService are counted at their own date (article_ts), texts posted to /trending/observe
+at the time they arrive.
+'''
+import os
+import threading
+import time
+from datetime import date, datetime, timezone
+from typing import List, Dict, Any
+
+from services.aspect_service import nlp
+from utils.sketches import SlidingTopK
+
+TRENDING_BUCKET_SECONDS = int(os.getenv("TRENDING_BUCKET_SECONDS", "300"))
+TRENDING_CAPACITY = int(os.getenv("TRENDING_CAPACITY", "1000"))
+
+# window name -> length in seconds
+WINDOWS = {
+    "hour": 3600,
+    "day": 86400,
+    "week": 7 * 86400,
+}
+# window name -> bucket length in seconds: each window keeps a few dozen buckets at
+# most, so a longer window does not hold (and re-merge on expiry) thousands of sketches
+BUCKET_SECONDS = {
+    "hour": TRENDING_BUCKET_SECONDS,
+    "day": 3600,
+    "week": 6 * 3600,
+}
+CATEGORIES = ("topic", "entity", "location")
+
+
+def article_ts(day, now: float = None) -> float:
+    """
+    Timestamp an article dated `day` (a date or an ISO date string) is counted at: the
+    end of that day (UTC), or `now` for today's articles, so an article is never
+    counted in the future and only the windows reaching back to its date see it.
+    """
+    if not isinstance(day, date):
+        day = date.fromisoformat(day)
+    end = datetime(day.year, day.month, day.day, 23, 59, 59, tzinfo=timezone.utc).timestamp()
+    return min(end, time.time() if now is None else now)
+
+
+class TrendingService:
+
+    def __init__(self, bucket_seconds: Dict[str, int] = None, capacity: int = TRENDING_CAPACITY):
+        bucket_seconds = dict(BUCKET_SECONDS, **(bucket_seconds or {}))
+        self._lock = threading.Lock()
+        self._counters = {
+            category: {
+                window: SlidingTopK(bucket_seconds[window], max(1, seconds // bucket_seconds[window]), capacity)
+                for window, seconds in WINDOWS.items()
+            }
+            for category in CATEGORIES
+        }
+
+    # ====================================================
+    # FEED
+    # ====================================================
+
+    def _keys(self, doc):
+        try:
+            topics = {chunk.text.lower() for chunk in doc.noun_chunks}
+        except ValueError:
+            # Pipelines without a dependency parser have no noun chunks
+            topics = set()
+        entities = {ent.text for ent in doc.ents if ent.label_ != "GPE"}
+        locations = {ent.text for ent in doc.ents if ent.label_ == "GPE"}
+        # Each key counts once per article
+        return {"topic": topics, "entity": entities, "location": locations}
+
+    def observe_docs(self, docs, dates=None, ts: float = None) -> int:
+        """
+        Feed already parsed spaCy docs; returns the number of articles counted. With
+        `dates` (one per doc, as IndexService listeners get them) each article is counted
+        at article_ts of its date, otherwise all at `ts` (the current time by default).
+        """
+        if dates is None:
+            stamps = None
+        else:
+            now = time.time() if ts is None else ts
+            stamps = [article_ts(day, now) for day in dates]
+        n = 0
+        with self._lock:
+            for i, doc in enumerate(docs):
+                doc_ts = ts if stamps is None else stamps[i]
+                for category, keys in self._keys(doc).items():
+                    for counter in self._counters[category].values():
+                        counter.add(keys, doc_ts)
+                n += 1
+        return n
+
+    def observe(self, texts: List[str], ts: float = None) -> int:
+        return self.observe_docs(nlp.pipe(texts, batch_size=32), ts=ts)
+
+    def warm_up(self, texts: List[str]):
+        """Key extraction and every top-k read for `texts`, without counting them."""
+        keys = [self._keys(doc) for doc in nlp.pipe(texts, batch_size=32)]
+        for category in CATEGORIES:
+            for window in WINDOWS:
+                self.top(category, window)
+        return keys
+
+    # ====================================================
+    # QUERIES
+    # ====================================================
+
+    def top(self, category: str, window: str = "hour", k: int = 10, now: float = None) -> Dict[str, Any]:
+        """
+        Top-k keys of one category in the window ending at `now` (the current time by
+        default). KeyError for unknown category/window.
+        """
+        counter = self._counters[category][window]
+        with self._lock:
+            # Buckets only expire when the clock is passed in, also with no new articles
+            items = counter.top(k, time.time() if now is None else now)
+            total = counter.total
+        return {
+            "category": category,
+            "window": window,
+            "total": total,
+            "items": [
+                {"key": key, "count": count, "error": error}
+                for key, count, error in items
+            ],
+        }
@@ -0,0 +1,531 @@
+# services/vector_index_service.py
+'''
+Persistent approximate nearest-neighbour index over article embeddings.
+Vectors live in two FAISS segments:
+- main: an HNSW, IVF or flat index with optional float16 (SQfp16) or PQ compression,
+  rebuilt only by compaction;
+- delta: an exact flat index that takes every add.
+Removing or re-adding an article leaves a tombstone on its old entry. Searches query
+both segments, drop tombstoned entries and merge by score.
+Compaction folds the delta into main and drops tombstoned vectors once the delta or
+the tombstones grow too large. It runs on a background thread: the new main index is
+built outside the search lock from the original vectors (kept next to main, so
+compressed codes are never re-quantized) and swapped in when ready. Trained indexes
+(IVF, PQ) reuse their training until the index has grown VECTOR_INDEX_RETRAIN_GROWTH
+times past the vectors it was trained on.
+Changes are saved every VECTOR_INDEX_SAVE_EVERY articles, on compaction and on
+shutdown (save()). Every save is a new generation under VECTOR_INDEX_DIR: its files carry the generation
+in their name and meta.json, written last, names the files of the current one. The
+previous generation's files are kept, so read-only workers that load main with mmap
+always read a consistent set and pick up a new generation on their next search.
+Vectors are L2-normalized, so inner product scores are cosine similarities.
+'''
+import json
+import os
+import re
+import threading
+from typing import List
+
+import faiss
+import numpy as np
+
+from services.embedding_service import get_embedding_service
+
+VECTOR_INDEX_DIR = os.getenv("VECTOR_INDEX_DIR", os.path.join("data", "index", "vectors"))
+VECTOR_INDEX_KIND = os.getenv("VECTOR_INDEX_KIND", "hnsw")
+VECTOR_INDEX_COMPRESSION = os.getenv("VECTOR_INDEX_COMPRESSION", "none")
+VECTOR_INDEX_READ_ONLY = os.getenv("VECTOR_INDEX_READ_ONLY", "0") in ("1", "true", "True")
+VECTOR_INDEX_DELTA_SIZE = int(os.getenv("VECTOR_INDEX_DELTA_SIZE", "10000"))
+VECTOR_INDEX_COMPACT_RATIO = float(os.getenv("VECTOR_INDEX_COMPACT_RATIO", "0.2"))
+VECTOR_INDEX_RETRAIN_GROWTH = float(os.getenv("VECTOR_INDEX_RETRAIN_GROWTH", "4"))
+VECTOR_INDEX_HNSW_M = int(os.getenv("VECTOR_INDEX_HNSW_M", "32"))
+VECTOR_INDEX_EF_SEARCH = int(os.getenv("VECTOR_INDEX_EF_SEARCH", "64"))
+VECTOR_INDEX_NLIST = int(os.getenv("VECTOR_INDEX_NLIST", "1024"))
+VECTOR_INDEX_NPROBE = int(os.getenv("VECTOR_INDEX_NPROBE", "16"))
+VECTOR_INDEX_PQ_M = int(os.getenv("VECTOR_INDEX_PQ_M", "48"))
+# A new generation is written after this many added or removed articles (and by
+# compaction and save())
+VECTOR_INDEX_SAVE_EVERY = int(os.getenv("VECTOR_INDEX_SAVE_EVERY", "1000"))
+
+KINDS = ("hnsw", "ivf", "flat")
+COMPRESSIONS = ("none", "fp16", "pq")
+# PQ codebooks (256 centroids per sub-quantizer) need this many training vectors;
+# below it the vectors simply stay in the exact delta segment
+PQ_MIN_TRAIN = 10000
+# IVF wants ~39 training vectors per list
+IVF_POINTS_PER_LIST = 39
+
+MAIN = 0
+DELTA = 1
+
+# Files of one generation: <name>-<generation>.<ext>
+_GENERATION_FILE_RE = re.compile(r"^(main|main_ids|main_vectors|delta|state)-\d+\.(faiss|npy|npz)$")
+
+
+def _pq_m(dim, wanted):
+    # Number of PQ sub-quantizers: the largest divisor of dim not above `wanted`
+    for m in range(min(wanted, dim), 0, -1):
+        if dim % m == 0:
+            return m
+    return 1
+
+
+class VectorIndexService:
+
+    def __init__(self, path: str = VECTOR_INDEX_DIR, kind: str = VECTOR_INDEX_KIND, compression: str = VECTOR_INDEX_COMPRESSION,
+                 read_only: bool = VECTOR_INDEX_READ_ONLY, embeddings=None, save_every: int = VECTOR_INDEX_SAVE_EVERY):
+        if kind not in KINDS:
+            raise ValueError(f"Unknown vector index kind: {kind}")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown vector index compression: {compression}")
+        self.path = path
+        self.kind = kind
+        self.compression = compression
+        self.read_only = read_only
+        self._embeddings = embeddings
+        self.save_every = save_every
+        # Articles added or removed since the last saved generation
+        self._unsaved = 0
+        # Guards the segments; held for searches and updates, never while building
+        self._lock = threading.RLock()
+        # One compaction at a time
+        self._compact_lock = threading.Lock()
+        self._compactor = None
+        self.generation = -1
+        self.main_generation = -1
+        # Generation on disk that was built with another embedding engine
+        self._rejected_generation = None
+        self._files = {}
+        self._reset(None)
+        self.refresh()
+
+    @property
+    def embeddings(self):
+        if self._embeddings is None:
+            self._embeddings = get_embedding_service()
+        return self._embeddings
+
+    def _reset(self, dim):
+        self.dim = dim
+        self.main = None
+        self.main_ids = np.zeros(0, dtype=np.int64)
+        # Original float32 vectors of main, row for row (writer only)
+        self.main_vectors = np.zeros((0, dim or 0), dtype=np.float32)
+        # Number of vectors the main index was trained on
+        self.trained_on = 0
+        self.delta = faiss.IndexFlatIP(dim) if dim else None
+        self.delta_ids = []
+        self.removed = {MAIN: set(), DELTA: set()}
+        # article id -> (segment, label) of its live entry
+        self.live = {}
+        self._main_dirty = False
+
+    # ====================================================
+    # Index construction
+    # ====================================================
+
+    def _factory_key(self, n):
+        if self.compression == "pq":
+            storage = f"PQ{_pq_m(self.dim, VECTOR_INDEX_PQ_M)}"
+        elif self.compression == "fp16":
+            storage = "SQfp16"
+        else:
+            storage = "Flat"
+        if self.kind == "hnsw":
+            if self.compression == "pq":
+                return f"HNSW{VECTOR_INDEX_HNSW_M}_{storage}"
+            return f"HNSW{VECTOR_INDEX_HNSW_M},{storage}"
+        if self.kind == "ivf":
+            nlist = max(1, min(VECTOR_INDEX_NLIST, n // IVF_POINTS_PER_LIST))
+            return f"IVF{nlist},{storage}"
+        return storage
+
+    def _min_build(self):
+        if self.compression == "pq":
+            return PQ_MIN_TRAIN
+        return IVF_POINTS_PER_LIST if self.kind == "ivf" else 1
+
+    def _needs_training(self):
+        return self.kind == "ivf" or self.compression == "pq"
+
+    def _build(self, vectors):
+        index = faiss.index_factory(self.dim, self._factory_key(len(vectors)), faiss.METRIC_INNER_PRODUCT)
+        if not index.is_trained:
+            index.train(vectors)
+        index.add(vectors)
+        return index
+
+    def _tune(self, index):
+        params = faiss.ParameterSpace()
+        if self.kind == "hnsw":
+            params.set_index_parameter(index, "efSearch", VECTOR_INDEX_EF_SEARCH)
+        elif self.kind == "ivf":
+            params.set_index_parameter(index, "nprobe", VECTOR_INDEX_NPROBE)
+
+    def _delta_vectors(self, labels):
+        # The delta is a flat index, its reconstructions are the original vectors
+        if not len(labels):
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return self.delta.reconstruct_batch(np.asarray(labels, dtype=np.int64))
+
+    # ====================================================
+    # Updates
+    # ====================================================
+
+    def _writable(self):
+        if self.read_only:
+            raise PermissionError("Vector index is opened read-only")
+
+    def add_vectors(self, ids: List[int], vectors):
+        """Add (or replace) articles by id with precomputed normalized vectors."""
+        self._writable()
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with self._lock:
+            if self.dim is None:
+                self._reset(vectors.shape[1])
+            if vectors.shape[1] != self.dim:
+                raise ValueError(f"Vector dimension {vectors.shape[1]} does not match the index dimension {self.dim}")
+            # The last occurrence of an id in one call wins
+            last = {int(i): row for row, i in enumerate(ids)}
+            rows = sorted(last.values())
+            for row in rows:
+                self._tombstone(int(ids[row]))
+            start = self.delta.ntotal
+            self.delta.add(vectors[rows])
+            for offset, row in enumerate(rows):
+                article_id = int(ids[row])
+                self.delta_ids.append(article_id)
+                self.live[article_id] = (DELTA, start + offset)
+            self._changed(len(rows))
+            self._maybe_compact()
+            return len(rows)
+
+    def add(self, articles: List[dict]):
+        """Embed and add [{"id", "text"}] articles; returns the number added."""
+        ids = [int(a["id"]) for a in articles]
+        vectors = self.embeddings.embed([a.get("text") or "" for a in articles], ids)
+        return self.add_vectors(ids, vectors)
+
+    def _tombstone(self, article_id):
+        entry = self.live.pop(article_id, None)
+        if entry is not None:
+            self.removed[entry[0]].add(entry[1])
+        return entry is not None
+
+    def remove(self, ids: List[int]):
+        self._writable()
+        with self._lock:
+            removed = sum(self._tombstone(int(i)) for i in ids)
+            if removed:
+                self._changed(removed)
+                self._maybe_compact()
+            return removed
+
+    def _changed(self, n):
+        self._unsaved += n
+        if self._unsaved >= self.save_every:
+            self._save()
+
+    def _maybe_compact(self):
+        # Start a background compaction when the delta or the tombstones have grown too large
+        dead = len(self.removed[MAIN]) + len(self.removed[DELTA])
+        total = len(self.main_ids) + len(self.delta_ids)
+        due = len(self.delta_ids) >= VECTOR_INDEX_DELTA_SIZE or (total and dead / total > VECTOR_INDEX_COMPACT_RATIO)
+        if not due or self._compact_lock.locked():
+            return False
+        self._compactor = threading.Thread(target=self._compact_in_background, daemon=True)
+        self._compactor.start()
+        return True
+
+    def _compact_in_background(self):
+        try:
+            self.compact()
+        except Exception as e:
+            print(f"Warning: vector index compaction failed: {e}")
+
+    def wait_for_compaction(self, timeout: float = None):
+        if self._compactor is not None:
+            self._compactor.join(timeout)
+
+    def compact(self):
+        """Fold the delta segment into main and drop tombstoned vectors; returns the index stats."""
+        self._writable()
+        with self._compact_lock:
+            self._compact()
+        return self.stats()
+
+    def _compact(self):
+        # Snapshot what goes into the new main index
+        with self._lock:
+            if self.dim is None:
+                return False
+            cut = len(self.delta_ids)
+            main_labels = [l for l in range(len(self.main_ids)) if l not in self.removed[MAIN]]
+            delta_labels = [l for l in range(cut) if l not in self.removed[DELTA]]
+            entries = [(int(self.main_ids[l]), (MAIN, l)) for l in main_labels]
+            entries += [(self.delta_ids[l], (DELTA, l)) for l in delta_labels]
+            main_vectors = np.asarray(self.main_vectors[main_labels], dtype=np.float32)
+            delta_vectors = self._delta_vectors(delta_labels)
+            main, trained_on = self.main, self.trained_on
+            append_only = main is not None and not self.removed[MAIN]
+
+        # Build without holding the search lock
+        vectors = np.vstack([main_vectors, delta_vectors])
+        if len(entries) < self._min_build():
+            # Too few vectors to train: everything stays exact in the delta
+            built = None
+        elif main is None or (self._needs_training() and len(entries) >= VECTOR_INDEX_RETRAIN_GROWTH * trained_on):
+            built, trained_on = self._build(vectors), len(entries)
+        else:
+            # Reuse the trained quantizers / graph settings of the current main
+            built = faiss.clone_index(main)
+            if append_only:
+                built.add(delta_vectors)
+            else:
+                built.reset()
+                built.add(vectors)
+
+        # Swap in; entries replaced or removed while building become tombstones
+        with self._lock:
+            live, removed = {}, {MAIN: set(), DELTA: set()}
+            if built is not None:
+                main_entries = entries
+                kept, kept_vectors = [], np.zeros((0, self.dim), dtype=np.float32)
+            else:
+                main_entries = []
+                current = [row for row, (article_id, entry) in enumerate(entries) if self.live.get(article_id) == entry]
+                kept, kept_vectors = [entries[row][0] for row in current], vectors[current]
+            for label, (article_id, entry) in enumerate(main_entries):
+                if self.live.get(article_id) == entry:
+                    live[article_id] = (MAIN, label)
+                else:
+                    removed[MAIN].add(label)
+            # Articles added to the delta after the snapshot stay in the delta
+            tail = [l for l in range(cut, len(self.delta_ids)) if self.live.get(self.delta_ids[l]) == (DELTA, l)]
+            delta = faiss.IndexFlatIP(self.dim)
+            delta.add(np.vstack([kept_vectors, self._delta_vectors(tail)]))
+            delta_ids = kept + [self.delta_ids[l] for l in tail]
+            for label, article_id in enumerate(delta_ids):
+                live[article_id] = (DELTA, label)
+
+            self.main = built
+            self.main_ids = np.array([article_id for article_id, _ in main_entries], dtype=np.int64)
+            self.main_vectors = vectors if built is not None else np.zeros((0, self.dim), dtype=np.float32)
+            self.trained_on = trained_on if built is not None else 0
+            self.delta, self.delta_ids = delta, delta_ids
+            self.live, self.removed = live, removed
+            self._main_dirty = True
+            self._save()
+            return True
+
+    # ====================================================
+    # Search
+    # ====================================================
+
+    def search_vectors(self, queries, k: int = 10):
+        """Top-k (ids, scores) per query vector, best first."""
+        if self.read_only:
+            self.refresh()
+        queries = np.ascontiguousarray(np.atleast_2d(queries), dtype=np.float32)
+        with self._lock:
+            if self.dim is None or not self.live:
+                return [[] for _ in queries], [[] for _ in queries]
+            candidates = [[] for _ in queries]
+            for segment, index, ids in ((MAIN, self.main, self.main_ids), (DELTA, self.delta, self.delta_ids)):
+                if index is None or index.ntotal == 0:
+                    continue
+                removed = self.removed[segment]
+                # Over-fetch so tombstoned hits can be dropped and still leave k results
+                fetch = min(index.ntotal, k + len(removed))
+                if segment == MAIN:
+                    self._tune(index)
+                scores, labels = index.search(queries, fetch)
+                if index.metric_type == faiss.METRIC_L2:
+                    # Some index types (HNSW + PQ) only search by L2; on unit vectors
+                    # the squared distance maps back to cosine as 1 - d / 2
+                    scores = 1.0 - scores / 2.0
+                for q in range(len(queries)):
+                    for score, label in zip(scores[q], labels[q]):
+                        if label >= 0 and label not in removed:
+                            candidates[q].append((float(score), int(ids[label])))
+            out_ids, out_scores = [], []
+            for found in candidates:
+                found.sort(key=lambda c: -c[0])
+                out_ids.append([i for _, i in found[:k]])
+                out_scores.append([s for s, _ in found[:k]])
+            return out_ids, out_scores
+
+    def search(self, texts: List[str], k: int = 10):
+        """Top-k neighbour ids and scores for every query text."""
+        return self.search_vectors(self.embeddings.encode(texts), k)
+
+    def stats(self):
+        return {
+            "kind": self.kind,
+            "compression": self.compression,
+            "dim": self.dim,
+            "articles": len(self.live),
+            "main": len(self.main_ids),
+            "delta": len(self.delta_ids),
+            "tombstones": len(self.removed[MAIN]) + len(self.removed[DELTA]),
+            "generation": self.generation,
+            "compacting": self._compact_lock.locked(),
+        }
+
+    # ====================================================
+    # Persistence
+    # ====================================================
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _write(self, name, write, mode="wb"):
+        # Written under a temporary name and renamed, so a listed file is always complete
+        tmp = self._file(name + ".tmp")
+        if mode is None:
+            write(tmp)
+        else:
+            with open(tmp, mode) as f:
+                write(f)
+        os.replace(tmp, self._file(name))
+        return name
+
+    def save(self):
+        """Write a new generation if articles were added or removed since the last one."""
+        with self._lock:
+            if self._unsaved:
+                self._save()
+
+    def _save(self):
+        if self.read_only or self.dim is None:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        self.generation += 1
+        files = dict(self._files)
+        # main only changes on compaction; the delta and tombstones are small
+        if self._main_dirty or self.main_generation < 0:
+            self.main_generation = self.generation
+            g = self.main_generation
+            for name in ("main", "main_ids", "main_vectors"):
+                files.pop(name, None)
+            if self.main is not None:
+                files["main"] = self._write(f"main-{g}.faiss", lambda p: faiss.write_index(self.main, p), mode=None)
+                files["main_ids"] = self._write(f"main_ids-{g}.npy", lambda f: np.save(f, self.main_ids))
+                files["main_vectors"] = self._write(f"main_vectors-{g}.npy", lambda f: np.save(f, self.main_vectors))
+            self._main_dirty = False
+        g = self.generation
+        files["delta"] = self._write(f"delta-{g}.faiss", lambda p: faiss.write_index(self.delta, p), mode=None)
+        files["state"] = self._write(f"state-{g}.npz", lambda f: np.savez(
+            f,
+            delta_ids=np.array(self.delta_ids, dtype=np.int64),
+            removed_main=np.array(sorted(self.removed[MAIN]), dtype=np.int64),
+            removed_delta=np.array(sorted(self.removed[DELTA]), dtype=np.int64),
+        ))
+        meta = {
+            "generation": self.generation,
+            "main_generation": self.main_generation,
+            "files": files,
+            "trained_on": self.trained_on,
+            "dim": self.dim,
+            "kind": self.kind,
+            "compression": self.compression,
+            "engine": self.embeddings.engine.name,
+            "engine_version": self.embeddings.version,
+        }
+        # meta.json is written last: it switches readers to the new generation at once
+        self._write("meta.json", lambda f: json.dump(meta, f), mode="w")
+        self._prune(files)
+        self._unsaved = 0
+
+    def _prune(self, files):
+        # Keep the current and the previous generation, a reader may still be loading it
+        keep = set(files.values()) | set(self._files.values())
+        for name in os.listdir(self.path):
+            if _GENERATION_FILE_RE.match(name) and name not in keep:
+                try:
+                    os.remove(self._file(name))
+                except FileNotFoundError:
+                    pass
+        self._files = files
+
+    def _read_meta(self):
+        meta_path = self._file("meta.json")
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path) as f:
+            return json.load(f)
+
+    def _compatible(self, meta):
+        # Vectors of another engine, or of another fit of the same engine, live in a
+        # different space: searching them with this engine's queries returns garbage
+        engine = self.embeddings
+        return (meta.get("engine"), meta.get("engine_version")) == (engine.engine.name, engine.version)
+
+    def _reject(self, meta):
+        self._rejected_generation = meta["generation"]
+        found = f"{meta.get('engine')} ({meta.get('engine_version')})"
+        expected = f"{self.embeddings.engine.name} ({self.embeddings.version})"
+        if self.read_only:
+            print(f"Warning: vector index in {self.path} was built with {found}, not {expected}; not loading it")
+            return
+        # The writer starts an empty index that replaces it: articles have to be added again
+        print(f"Warning: vector index in {self.path} was built with {found}, not {expected}; starting an empty index")
+        with self._lock:
+            self._reset(None)
+            self.generation = max(self.generation, meta["generation"])
+            self.main_generation = -1
+
+    def _load(self, meta):
+        # Everything of one generation, read from the files meta.json names
+        files = meta["files"]
+        state = {"main": None, "main_ids": np.zeros(0, dtype=np.int64), "main_vectors": None}
+        if "main" in files:
+            flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY if self.read_only else 0
+            state["main"] = faiss.read_index(self._file(files["main"]), flags)
+            state["main_ids"] = np.load(self._file(files["main_ids"]))
+            if not self.read_only:
+                state["main_vectors"] = np.load(self._file(files["main_vectors"]))
+        state["delta"] = faiss.read_index(self._file(files["delta"]))
+        with np.load(self._file(files["state"])) as saved:
+            state["delta_ids"] = saved["delta_ids"].tolist()
+            state["removed"] = {MAIN: set(saved["removed_main"].tolist()), DELTA: set(saved["removed_delta"].tolist())}
+        return state
+
+    def refresh(self, attempts: int = 3):
+        """
+        Load the saved index when a newer generation is on disk. The writer loads once
+        at start; read-only workers call this before every search. A generation built
+        with another embedding engine or engine version is not loaded: read-only workers
+        keep what they have, the writer starts an empty index in its place.
+        """
+        for _ in range(attempts):
+            meta = self._read_meta()
+            if meta is None or meta["generation"] in (self.generation, self._rejected_generation):
+                return False
+            if not self._compatible(meta):
+                self._reject(meta)
+                return False
+            try:
+                state = self._load(meta)
+            except (OSError, RuntimeError):
+                # The writer moved on by two generations while this one was read (FAISS
+                # reports a missing file as RuntimeError): retry with the new meta.json
+                continue
+            with self._lock:
+                self.kind, self.compression = meta["kind"], meta["compression"]
+                self._reset(meta["dim"])
+                self.main, self.main_ids, self.delta = state["main"], state["main_ids"], state["delta"]
+                if state["main_vectors"] is not None:
+                    self.main_vectors = state["main_vectors"]
+                self.delta_ids, self.removed = state["delta_ids"], state["removed"]
+                self.trained_on = meta.get("trained_on", 0)
+                for segment, ids in ((MAIN, self.main_ids.tolist()), (DELTA, self.delta_ids)):
+                    removed = self.removed[segment]
+                    for label, article_id in enumerate(ids):
+                        if label not in removed:
+                            self.live[article_id] = (segment, label)
+                self.generation, self.main_generation = meta["generation"], meta["main_generation"]
+                self._files = meta["files"]
+            return True
+        # Still behind: keep serving the generation already loaded
+        return False
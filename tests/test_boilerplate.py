@@ -0,0 +1,75 @@
+# tests/test_boilerplate.py
+'''
+BoilerplateModel: lines and sentences repeated across enough articles of one source
+are stripped from its articles (and only its), covers() tells which sources have a
+table, and the saved table strips the same way.
+'''
+import pandas as pd
+import pytest
+
+from Parsing_Tools.boilerplate import BoilerplateModel, source_of
+
+SHARE = "Share this story on Facebook and Twitter."
+FOOTER = "Copyright 2024 Daily News. All rights reserved."
+
+
+def _article(i, link="https://www.dailynews.example/story/{i}"):
+    summary = f"Summary of story {i} about the rain in city {chr(65 + i % 26)}."
+    details = "\n".join([
+        f"Story number {i} reports flooding in district {chr(65 + i % 26)}{chr(66 + i % 25)}.",
+        # A repeated sentence inside an otherwise unique line
+        f"Officials visited camp {chr(67 + i % 20)} on the day. {SHARE}",
+        FOOTER.replace("2024", str(2000 + i)),
+    ])
+    return {"Header": f"Headline {i}", "Summary": summary, "Detail": details, "Link": link.format(i=i)}
+
+
+@pytest.fixture
+def model():
+    model = BoilerplateModel(min_count=5, min_share=0.5)
+    return model.fit((a["Link"], a["Summary"], a["Detail"]) for a in map(_article, range(20)))
+
+
+def test_source_of():
+    assert source_of("https://www.DailyNews.example/a?b=1") == "dailynews.example"
+    assert source_of("dailynews.example/a") == "unknown"
+    assert source_of(None) == "unknown"
+
+
+def test_covers(model):
+    assert model.covers("http://dailynews.example/other")
+    assert not model.covers("https://othernews.example/story/1")
+    assert not model.covers(None)
+    # Seen in too few articles of its source
+    few = BoilerplateModel(min_count=5).fit([("https://small.example/1", "x", FOOTER)] * 4)
+    assert not few.covers("https://small.example/2")
+
+
+@pytest.mark.parametrize("as_series", [False, True])
+def test_strip_article(model, as_series):
+    article = _article(99)
+    row = pd.Series(article) if as_series else dict(article)
+    stripped, removed = model.strip_article(row)
+
+    # The row passed in is not modified
+    assert row["Detail"] == article["Detail"]
+    assert stripped["Header"] == article["Header"] and stripped["Link"] == article["Link"]
+    assert stripped["Summary"] == article["Summary"]
+    # The footer line (a new year, numbers do not count) and the share sentence are gone
+    first, second, _ = article["Detail"].split("\n")
+    assert stripped["Detail"].split("\n") == [first, second[:-len(SHARE) - 1]]
+    assert removed == len(article["Detail"]) - len(stripped["Detail"]) > 0
+
+
+def test_other_sources_are_not_stripped(model):
+    article = _article(3, link="https://othernews.example/{i}")
+    stripped, removed = model.strip_article(article)
+    assert removed == 0 and stripped == article
+
+
+def test_saved_table_strips_the_same(model, tmp_path):
+    loaded = BoilerplateModel.load(model.save(str(tmp_path / "boilerplate.npz")))
+    assert loaded.docs == model.docs
+    article = _article(42)
+    assert loaded.strip_article(article) == model.strip_article(article)
+    assert loaded.covers(article["Link"])
@@ -0,0 +1,54 @@
+# tests/test_dedup_service.py
+'''
+DedupService: batch groups with the configured or the requested threshold, and the
+incremental check against the persistent index, which reports duplicates by the id
+the earlier article was sent with.
+'''
+import pytest
+
+from services.dedup_service import DedupService
+from utils.minhash import LSHIndex
+from tests.test_minhash import STORY, COPY, OTHER, EDITED
+
+
+@pytest.fixture
+def service(tmp_path):
+    return DedupService(str(tmp_path / "dedup.npz"), threshold=0.8, save_every=2)
+
+
+def test_dedup_bulk(service):
+    result = service.dedup_bulk([STORY, OTHER, COPY, EDITED])
+    assert result == {"groups": [[0, 2]], "duplicate_of": [None, None, 0, None]}
+    # An explicit threshold is used as given
+    assert service.dedup_bulk([STORY, EDITED], threshold=0.3)["groups"] == [[0, 1]]
+    assert service.dedup_bulk([STORY, STORY], threshold=1.0)["groups"] == [[0, 1]]
+
+
+def test_check_keeps_id_types(service):
+    results = service.check([{"id": 1, "text": STORY}, {"id": "b", "text": OTHER}])
+    assert [r["duplicate_of"] for r in results] == [None, None]
+
+    results = service.check([{"id": "c", "text": COPY}, {"id": 4, "text": OTHER}, {"id": 1, "text": STORY}])
+    assert [(r["id"], r["duplicate_of"]) for r in results] == [("c", 1), (4, "b"), (1, None)]
+    assert results[0]["similarity"] >= 0.8
+    assert service.stats()["articles"] == 2
+
+
+def test_check_without_add(service):
+    service.check([{"id": 1, "text": STORY}], add=False)
+    assert service.stats()["articles"] == 0
+    assert service.check([{"id": 2, "text": COPY}])[0]["duplicate_of"] is None
+
+
+def test_saved_index_reports_original_ids(service, tmp_path):
+    service.check([{"id": 1, "text": STORY}, {"id": "b", "text": OTHER}])
+    # save_every=2: written without an explicit save
+    reloaded = DedupService(service.path, threshold=0.8)
+    results = reloaded.check([{"id": 9, "text": COPY}, {"id": 10, "text": OTHER}], add=False)
+    assert [r["duplicate_of"] for r in results] == [1, "b"]
+
+
+def test_num_perm_mismatch_starts_empty(service, capsys):
+    LSHIndex(64, 0.8).save(service.path)
+    assert len(service.index) == 0
+    assert capsys.readouterr().out.startswith("Warning: dedup index in ")
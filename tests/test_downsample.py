@@ -0,0 +1,86 @@
+# tests/test_downsample.py
+'''
+plotData downsampling: a series never has more than max_points points, its first and
+last points are kept, peaks survive, and an evenly spaced x axis can be sent as a
+RangeAxis that the response model accepts.
+'''
+import numpy as np
+import pytest
+
+import services.aspect_service as A
+from models.aspect_models import TrendResponse
+from utils.downsample import downsample_plot, downsample_point, encode_range, lttb_indices, minmax_indices
+
+
+def _series(n, seed=0):
+    rng = np.random.RandomState(seed)
+    y = (np.sin(np.arange(n) / 15) + rng.normal(0, 0.1, n)).tolist()
+    return list(range(n)), y
+
+
+def _point(n, seed=0):
+    x, y = _series(n, seed)
+    return {"x": x, "y": y, "type": "scatter", "mode": "lines+markers", "name": "s"}
+
+
+@pytest.mark.parametrize("n", [1, 2, 10, 101, 1000])
+@pytest.mark.parametrize("max_points", [3, 4, 7, 50, 2000])
+def test_point_budget_and_endpoints(n, max_points):
+    x, y = _series(n)
+    for idx in (lttb_indices(x, y, max_points), minmax_indices(y, max_points)):
+        assert len(idx) <= max_points
+        assert idx[0] == 0 and idx[-1] == n - 1
+        assert list(idx) == sorted(set(idx))
+    if n > max_points:
+        # LTTB spends the whole budget
+        assert len(lttb_indices(x, y, max_points)) == max_points
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+def test_peaks_are_kept(method):
+    x, y = _series(1000)
+    y[400], y[700] = 10.0, -10.0
+    point = downsample_point({"x": x, "y": y}, 40, method)
+    assert 10.0 in point["y"] and -10.0 in point["y"]
+    assert point["x"][0] == 0 and point["x"][-1] == 999
+
+
+def test_encode_range():
+    assert encode_range([3, 5, 7, 9]) == {"start": 3, "step": 2, "count": 4}
+    assert encode_range([4]) == {"start": 4, "step": 1, "count": 1}
+    assert encode_range([0, 1, 3]) is None
+    assert encode_range(["2024-01-01", "2024-01-02"]) is None
+    assert encode_range([]) is None
+
+
+def test_compact_x_range_axis():
+    result = downsample_plot({"plotData": [_point(500), _point(20)]}, compact_x=True)
+    assert [p["x"] for p in result["plotData"]] == [
+        {"start": 0, "step": 1, "count": 500},
+        {"start": 0, "step": 1, "count": 20},
+    ]
+    response = TrendResponse(**result)
+    assert response.plotData[0].x.count == 500 and len(response.plotData[0].y) == 500
+
+    # After downsampling the kept x values are not evenly spaced: sent as a list
+    result = downsample_plot({"plotData": [_point(500)]}, max_points=50, compact_x=True)
+    (point,) = result["plotData"]
+    assert isinstance(point["x"], list) and len(point["x"]) == len(point["y"]) == 50
+    TrendResponse(**result)
+
+
+def test_no_options_is_a_no_op():
+    result = {"plotData": [_point(100)]}
+    assert downsample_plot(result) is result and len(result["plotData"][0]["y"]) == 100
+
+
+def test_documents_mode_is_capped(monkeypatch):
+    monkeypatch.setattr(A, "MAX_DOCUMENT_SERIES", 3)
+    service = A.AspectService()
+    texts = ["Good news today. Bad news tomorrow."] * 3
+    result = service.sentiment_trend_bulk(texts, mode="documents", max_points=3)
+    assert len(result["plotData"]) == 3 and all(len(p["y"]) <= 3 for p in result["plotData"])
+    with pytest.raises(ValueError):
+        service.sentiment_trend_bulk(texts * 2, mode="documents")
+    # The aggregate series has no such limit
+    assert len(service.sentiment_trend_bulk(texts * 2)["plotData"]) == 1
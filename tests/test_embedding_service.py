@@ -0,0 +1,60 @@
+# tests/test_embedding_service.py
+'''
+The hashing engine's IDF + SVD baseline: fitted through EmbeddingService.fit, saved
+to disk and loaded back, it has to give the same vectors as the engine it was fitted on.
+'''
+import numpy as np
+import pytest
+
+import services.embedding_service as E
+
+TOPICS = [
+    "flood water rain river rescue relief camp monsoon",
+    "cricket match wicket batsman bowler stadium innings",
+    "election vote ballot candidate polling commission result",
+    "inflation price fuel wheat flour market trader",
+]
+
+
+def _corpus(n=120, seed=3):
+    rng = np.random.RandomState(seed)
+    texts = []
+    for i in range(n):
+        words = TOPICS[i % len(TOPICS)].split()
+        texts.append(" ".join(rng.choice(words, size=12)))
+    return texts
+
+
+@pytest.fixture
+def svd_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "models" / "embedding_svd.joblib")
+    monkeypatch.setattr(E, "EMBEDDING_SVD_PATH", path)
+    return path
+
+
+def test_fit_save_load_round_trip(svd_path):
+    texts = _corpus()
+    service = E.EmbeddingService(E.HashingEngine(dim=16))
+    unfitted = service.version
+    cached = service.embed(texts[:2], [1, 2])
+
+    result = service.fit(texts, svd_path)
+    assert result == {"engine": service.engine.name, "dim": 16, "articles": len(texts)}
+    assert service.engine.fitted and service.version != unfitted
+    # Vectors of the random projection are not served from the cache any more
+    assert not np.allclose(service.embed(texts[:2], [1, 2]), cached)
+
+    loaded = E.load_engine("hashing")
+    assert loaded.fitted and loaded.name == service.engine.name
+    np.testing.assert_allclose(loaded.encode(texts), service.engine.encode(texts), atol=1e-6)
+
+
+def test_fitted_vectors_group_by_topic(svd_path):
+    texts = _corpus()
+    engine = E.HashingEngine(dim=16).fit(texts)
+    vectors = engine.encode(texts)
+    assert vectors.shape == (len(texts), 16)
+    np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), 1.0, atol=1e-5)
+    similarity = vectors @ vectors.T
+    same = np.equal.outer(np.arange(len(texts)) % 4, np.arange(len(texts)) % 4)
+    assert similarity[same].mean() > similarity[~same].mean() + 0.5
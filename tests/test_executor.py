@@ -0,0 +1,86 @@
+# tests/test_executor.py
+'''
+The executor batch API goes through parser.locate_article like the batch driver and
+only batches sentiment and topics, so run_local over scraper batches has to give the
+rows parse_article gives for every article, in order, without the unlocated ones.
+'''
+import os
+
+import pandas as pd
+import pytest
+
+import Parsing_Tools.parser as P
+from Parsing_Tools.executor import RESULT_COLUMNS, parse_frame, run_local
+from Parsing_Tools.results_store import flatten
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+CITIES = ["Karachi", "Lahore", "Peshawar", "Quetta"]
+
+
+class _Lemmatizer:
+    # Stand-in when the WordNet corpus cannot be loaded (no network)
+    def lemmatize(self, word):
+        return word
+
+
+def _locate(self, read_more, header):
+    # Without a tagger no proper noun is found: take the first known city of the text
+    city = next((c for c in CITIES if c in read_more), "null")
+    return P.LocationResult(city, {city: 1} if city != "null" else {})
+
+
+@pytest.fixture(autouse=True)
+def parser_data(tmp_path, monkeypatch):
+    path = tmp_path / "cities.csv"
+    names = set(CITIES)
+    for letter in "abcdefghijklmnopqrstuvwxyz":
+        names.update({f"{letter.upper()}aaplace", f"{letter.upper()}zzplace"})
+    path.write_text("Locations\n" + "\n".join(sorted(names)) + "\n")
+    monkeypatch.setattr(P, "CITIES_FILE", str(path))
+    try:
+        P.WordNetLemmatizer().lemmatize("warm")
+    except LookupError:
+        monkeypatch.setattr(P, "_lemmatizer", _Lemmatizer())
+    if not ("tagger" in P.nlp.pipe_names or "morphologizer" in P.nlp.pipe_names):
+        monkeypatch.setattr(P.parser, "locate", _locate)
+    yield
+    P.lemmatize.cache_clear()
+    P._clean_lexeme.cache_clear()
+
+
+@pytest.fixture
+def batches():
+    return [
+        pd.read_csv(os.path.join(FIXTURES, name), index_col=None, header=0, dtype="string")
+        for name in ("scraper_batch_1.csv", "scraper_batch_2.csv")
+    ]
+
+
+def _serial(batches):
+    p = P.parser()
+    rows = []
+    for frame in batches:
+        for _, row in frame.fillna("No data").iterrows():
+            result = p.parse_article(row)
+            if result is not None:
+                rows.append(flatten(result.to_dict()))
+    return pd.DataFrame(rows, columns=RESULT_COLUMNS)
+
+
+def test_run_local_matches_parse_article(batches):
+    expected = _serial(batches)
+    assert len(expected) == 4
+    result = run_local(batches, workers=2)
+    assert list(result.columns) == RESULT_COLUMNS
+    pd.testing.assert_frame_equal(result, expected)
+    assert [city.lower() for city in result["focusLocation"]] == ["lahore", "peshawar", "quetta", "karachi"]
+    assert list(result["creationDate"]) == ["2024-03-05", "2024-03-11", "2024-03-13", "2024-03-15"]
+
+
+def test_batch_without_located_articles():
+    frame = pd.DataFrame([{
+        "Header": "Prices rose", "Summary": "Markets.", "Detail": "Prices rose.\nFooter\nEnd",
+        "Link": "l", "Category": "Business", "Creation date": "2024-03-06",
+    }])
+    result = parse_frame(frame)
+    assert result.empty and list(result.columns) == RESULT_COLUMNS
@@ -0,0 +1,131 @@
+# tests/test_focus_time_regression.py
+'''
+Get_Time tags each section once with the temporal tagger (Parsing_Tools/temporal.py)
+instead of running dateparser.search.search_dates on every line and on every full
+section. fixtures/focus_time_corpus.json holds 200 synthetic news articles mixing
+explicit, relative and distractor dates, each with the focusTime that search_dates
+gave it. The tagger has to find the dates that lead to the same focusTime for all of them.
+
+The ranking the fixture was recorded with is replayed here: every span is read again
+with datefinder, spans are counted per distinct datefinder value, and the most frequent
+value (then the earliest) wins with the date dateparser gave its first span.
+Get_Time itself now ranks with TagStore's section and position weights, which is a
+deliberate change: test_get_time_focus_time checks its output on every article, and
+CHANGED lists the 42 articles where it differs from the recorded focusTime and why.
+'''
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+from Parsing_Tools.parser import parser
+from Parsing_Tools.temporal import get_tagger
+
+CORPUS = os.path.join(os.path.dirname(__file__), "fixtures", "focus_time_corpus.json")
+
+# Why Get_Time's focusTime differs from the recorded one
+# The date is mentioned in the header or summary, worth 3x / 2x a mention in the details
+SECTION = "section"
+# Equal (or close) weight in the details: the date mentioned earlier wins, where the
+# recorded ranking took the most frequent, then the earliest, date
+POSITION = "position"
+# The date comes (also) from a relative span ("yesterday", "next week", a weekday) that
+# datefinder could not read, so the recorded ranking did not count it
+RELATIVE = "relative"
+
+# Article index -> (Get_Time focusTime, reason)
+CHANGED = {
+    0: ("2024-08-03", POSITION),
+    3: ("2024-10-22", SECTION),
+    7: ("2024-09-02", SECTION),
+    11: ("2024-08-15", RELATIVE),
+    21: ("2024-02-02", SECTION),
+    24: ("2024-10-01", SECTION),
+    28: ("2024-07-15", SECTION),
+    33: ("2024-08-28", SECTION),
+    34: ("2024-02-23", POSITION),
+    44: ("2024-01-01", POSITION),
+    48: ("2024-10-17", POSITION),
+    61: ("2024-04-08", RELATIVE),
+    63: ("2023-03-05", POSITION),
+    64: ("2024-06-11", SECTION),
+    72: ("2024-08-01", POSITION),
+    74: ("2024-04-11", POSITION),
+    76: ("2023-12-24", POSITION),
+    80: ("2024-09-11", SECTION),
+    96: ("2024-06-01", SECTION),
+    98: ("2024-09-01", SECTION),
+    108: ("2024-10-06", SECTION),
+    110: ("2024-06-04", SECTION),
+    116: ("2024-04-02", POSITION),
+    118: ("2024-02-13", RELATIVE),
+    129: ("2024-08-09", SECTION),
+    130: ("2024-07-01", SECTION),
+    133: ("2024-11-01", SECTION),
+    137: ("2023-11-28", SECTION),
+    138: ("2024-05-09", SECTION),
+    139: ("2024-04-01", SECTION),
+    141: ("2024-01-24", SECTION),
+    162: ("2024-08-01", SECTION),
+    163: ("2024-04-01", SECTION),
+    164: ("2024-11-01", RELATIVE),
+    167: ("2024-07-19", SECTION),
+    168: ("2024-06-18", SECTION),
+    169: ("2024-01-24", SECTION),
+    170: ("2024-01-01", SECTION),
+    174: ("2024-08-17", SECTION),
+    182: ("2024-10-25", RELATIVE),
+    184: ("2024-09-10", SECTION),
+    190: ("2024-07-24", SECTION),
+}
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    with open(CORPUS, encoding="utf8") as f:
+        return json.load(f)
+
+
+def _sections(article):
+    # Same footer cut as Get_Time: the second to last line of the details is dropped
+    lines = article["details"].split("\n")
+    del lines[-2]
+    return [article["header"], article["summary"], "\n".join(lines)]
+
+
+def _count_ranked_focus(article, datefinder):
+    base = datetime.strptime(article["creationDate"], "%Y-%m-%d")
+    # datefinder value -> (dateparser value of its first span, count)
+    counts = {}
+    for section in _sections(article):
+        for span, value, _ in get_tagger().tag(section, base):
+            key = next(datefinder.find_dates(span), None)
+            if key is not None:
+                first, count = counts.get(key, (value, 0))
+                counts[key] = (first, count + 1)
+    if not counts:
+        return article["creationDate"]
+    best = min(counts, key=lambda key: (-counts[key][1], key))
+    return counts[best][0].date().strftime("%Y-%m-%d")
+
+
+def test_tagger_keeps_search_dates_focus_time(corpus):
+    datefinder = pytest.importorskip("datefinder")
+    assert len(corpus) == 200
+    changed = [
+        (i, article["focusTime"], focus)
+        for i, article in enumerate(corpus)
+        for focus in [_count_ranked_focus(article, datefinder)]
+        if focus != article["focusTime"]
+    ]
+    assert changed == []
+
+
+def test_get_time_focus_time(corpus):
+    Parser = parser()
+    for i, article in enumerate(corpus):
+        data = [None, article["header"], article["summary"], article["details"], "", "", article["creationDate"]]
+        focus = Parser.Get_Time(data, dict())["focusTime"]
+        expected = CHANGED[i][0] if i in CHANGED else article["focusTime"]
+        assert focus == expected, (i, article["focusTime"])
@@ -0,0 +1,35 @@
+# tests/test_health_service.py
+'''
+Readiness after warm-up: every engine is warmed even when one fails, and a failed
+engine leaves the worker "degraded" and not ready unless ready_on_error is set.
+'''
+import pytest
+
+from services.health_service import HealthService
+
+
+def _fail(texts):
+    raise RuntimeError("model missing")
+
+
+@pytest.mark.parametrize("ready_on_error", [False, True])
+def test_failed_engine_is_degraded(ready_on_error):
+    health = HealthService(ready_on_error=ready_on_error)
+    warmed = []
+    health.register("broken", _fail)
+    health.register("ok", warmed.append)
+    assert not health.is_ready() and health.readiness()["status"] == "warming_up"
+
+    health.warm_up(texts=["text"])
+    status = health.readiness()
+    assert warmed == [["text"]]
+    assert status["status"] == "degraded" and status["pending"] == []
+    assert status["errors"] == {"broken": "RuntimeError: model missing"}
+    assert health.is_ready() is ready_on_error
+
+
+def test_ready_after_warm_up():
+    health = HealthService()
+    health.register("ok", len)
+    health.warm_up()
+    assert health.is_ready() and health.readiness()["status"] == "ready"
@@ -0,0 +1,80 @@
+# tests/test_index_service.py
+'''
+The SQLite article index: dates are stored as ISO text and compared in SQL, so only
+real dates may get in, and date-range trends are answered from the postings.
+Noun-chunk topics and phrase queries share one key, so determiners don't hide a match.
+'''
+from datetime import date, datetime
+
+import pytest
+from pydantic import ValidationError
+
+from models.aspect_models import IndexArticlesRequest, DateRange
+from services.aspect_service import nlp
+from services.index_service import IndexService, iso_date, phrase_key
+
+ARTICLES = [
+    {"id": "a1", "text": "Floods hit the city after heavy rain.", "date": "2024-01-05"},
+    {"id": "a2", "text": "More floods and rain were reported.", "date": "2024-01-20"},
+    {"id": "a3", "text": "The rain stopped.", "date": "2024-02-02"},
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    return IndexService(str(tmp_path / "articles.db"))
+
+
+def test_query_before_first_ingest(index):
+    assert index.count() == 0
+    assert index.keyword_density(["floods"], "2024-01-01", "2024-12-31")["plotData"][0]["x"] == []
+
+
+@pytest.mark.parametrize("value", ["2024-1-5", "05/01/2024", "2024-01-05T10:30:00", "yesterday"])
+def test_request_rejects_non_iso_dates(value):
+    with pytest.raises(ValidationError):
+        IndexArticlesRequest(articles=[{"id": "x", "text": "text", "date": value}])
+    with pytest.raises(ValidationError):
+        DateRange(startDate=value, endDate="2024-12-31")
+
+
+def test_iso_date():
+    assert iso_date(date(2024, 1, 5)) == "2024-01-05"
+    assert iso_date(datetime(2024, 1, 5, 23, 59)) == "2024-01-05"
+    assert iso_date("2024-01-05T23:59:00") == "2024-01-05"
+    with pytest.raises(ValueError):
+        iso_date("05/01/2024")
+
+
+def test_date_range(index):
+    request = IndexArticlesRequest(articles=ARTICLES)
+    assert index.add_articles([a.model_dump() for a in request.articles]) == {"added": 3, "updated": 0, "articles": 3}
+    january = DateRange(startDate="2024-01-01", endDate="2024-01-31")
+    series = index.location_trend([], january.startDate, january.endDate)
+    assert series == {"plotData": []}
+    (rain,) = index.keyword_density(["rain"], january.startDate, january.endDate)["plotData"]
+    assert rain["x"] == ["2024-01-05", "2024-01-20"]
+    (rain,) = index.keyword_density(["rain"], date(2024, 1, 20), datetime(2024, 2, 2, 12))["plotData"]
+    assert rain["x"] == ["2024-01-20", "2024-02-02"]
+
+
+@pytest.mark.parametrize("phrase", ["the prime minister", "The Prime Minister's", "prime minister", "a prime minister"])
+def test_phrase_key_drops_determiners(phrase):
+    assert phrase_key(nlp(phrase)) == "prime minister"
+
+
+def test_phrase_key_of_chunk_matches_query_key(index):
+    doc = nlp("The Prime Minister visited the flood-hit areas of Sindh.")
+    assert phrase_key(doc[0:3]) == index._key("Prime Minister")[1] == "prime minister"
+    assert index._key("  the prime minister ") == ("topic", "prime minister")
+    assert index._key("Floods") == ("term", "floods")
+    # Nothing but stop words: the phrase is looked up as typed
+    assert phrase_key(nlp("of the")) is None
+    assert index._key("of the") == ("topic", "of the")
+
+
+def test_phrase_key_lemmatizes_head():
+    doc = nlp("prime ministers")
+    if not doc[-1].lemma_:
+        pytest.skip("pipeline has no lemmatizer")
+    assert phrase_key(doc) == "prime minister"
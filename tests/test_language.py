@@ -0,0 +1,44 @@
+# tests/test_language.py
+'''
+Language routing: English and undetermined text go down the English NLP paths,
+anything else only on positive evidence of another language.
+'''
+import pytest
+
+from utils.language import detect_language, is_supported, route_bulk
+
+
+@pytest.mark.parametrize("text, language", [
+    ("The government said on Monday that the floods were over.", "en"),
+    ("Karachi Lahore Quetta Peshawar Multan Sukkur", "en"),
+    ("Flood, rain", "en"),
+    ("12345 678", "und"),
+    ("Hukumat ne kaha hai ke sab log ghar mein rahain aur bahar na jayein", "ur-Latn"),
+    ("Main ghar ja raha hoon lekin woh nahi aaya", "ur-Latn"),
+    ("El gobierno está preparando más medidas para la región", "other"),
+    ("O governo não disse se são medidas também para o país", "other"),
+    ("Hükümet için bu çok önemli bir karar olarak görülüyor", "other"),
+    ("La città è piena di gente che aspetta anche oggi", "other"),
+    ("حکومت نے کہا ہے کہ سیلاب ختم ہو گیا ہے", "ur"),
+    ("دولت گفت که سیل پایان یافته است", "fa"),
+    ("قالت الحكومة إن الفيضانات انتهت", "ar"),
+])
+def test_detect_language(text, language):
+    assert detect_language(text) == language
+
+
+def test_english_main_is_not_roman_urdu():
+    assert detect_language("The main road to the main market was closed by the main police station") == "en"
+
+
+def test_route_bulk_only_processes_supported_texts():
+    texts = ["The floods are over now in the city.", "El gobierno está preparando más medidas", "", None]
+    seen = []
+
+    def process(batch):
+        seen.extend(batch)
+        return [len(t or "") for t in batch]
+
+    assert route_bulk(texts, process, lambda: -1) == [len(texts[0]), -1, 0, 0]
+    assert seen == [texts[0], "", None]
+    assert not is_supported(texts[1])
@@ -0,0 +1,84 @@
+# tests/test_minhash.py
+'''
+MinHash/LSH near-duplicate detection: the band layout follows the threshold, reworded
+copies of one story are grouped while different stories are not, and a saved index
+answers the same queries after loading (with the saved or an overriding threshold).
+'''
+import pytest
+
+from utils.minhash import MinHasher, LSHIndex, duplicate_groups, lsh_params, similarity, NUM_PERM
+
+STORY = (
+    "Heavy rain flooded several neighbourhoods of Karachi on Monday as the city recorded "
+    "its highest rainfall in a decade, officials said, adding that relief teams had been "
+    "sent to the worst affected areas and schools would remain closed until Wednesday."
+)
+# The same wire story as another outlet ran it: a word changed and a tagline added
+COPY = STORY.replace("Monday", "Tuesday") + " Reporting by staff correspondent."
+OTHER = (
+    "The national cricket team won the third match of the series in Lahore after the "
+    "captain scored a century, and the selectors named an unchanged squad for the final."
+)
+EDITED = " ".join(STORY.split()[:20]) + " and the weather office warned of more storms in Sindh and Balochistan this week."
+
+
+@pytest.fixture(scope="module")
+def hasher():
+    return MinHasher()
+
+
+@pytest.mark.parametrize("threshold", [0.3, 0.5, 0.8, 0.9])
+def test_lsh_params(threshold):
+    bands, rows = lsh_params(NUM_PERM, threshold)
+    assert bands * rows == NUM_PERM
+    assert (1 / bands) ** (1 / rows) <= threshold
+
+
+def test_lsh_params_highest_midpoint_below_threshold():
+    # 128 = 16 bands of 8 rows: midpoint 0.707; 8 bands of 16 rows would be 0.878
+    assert lsh_params(128, 0.8) == (16, 8)
+    assert lsh_params(128, 0.9) == (8, 16)
+    # Nothing at or below: the lowest midpoint
+    assert lsh_params(4, 0.01) == (4, 1)
+
+
+def test_duplicate_groups(hasher):
+    texts = [STORY, OTHER, COPY, "", EDITED, COPY]
+    signatures = hasher.signatures(texts)
+    assert similarity(signatures[0], signatures[2]) >= 0.8
+    assert similarity(signatures[0], signatures[4]) < 0.8
+    assert duplicate_groups(signatures, 0.8) == [[0, 2, 5]]
+    # Empty texts never match, not even each other
+    assert duplicate_groups(hasher.signatures(["", "", STORY]), 0.8) == []
+
+
+def test_index_query(hasher):
+    index = LSHIndex(NUM_PERM, 0.8)
+    assert index.insert("story", hasher.signature(STORY))
+    assert not index.insert("story", hasher.signature(OTHER))
+    assert not index.insert("empty", hasher.signature(""))
+    index.insert(7, hasher.signature(OTHER))
+    key, score = index.query(hasher.signature(COPY))
+    assert key == "story" and score >= 0.8
+    assert index.query(hasher.signature(EDITED)) is None
+    assert index.query(hasher.signature("")) is None
+
+
+def test_save_load(hasher, tmp_path):
+    index = LSHIndex(NUM_PERM, 0.8)
+    index.insert("story", hasher.signature(STORY))
+    index.insert(7, hasher.signature(OTHER))
+    path = index.save(str(tmp_path / "dedup.npz"))
+
+    loaded = LSHIndex.load(path)
+    assert (loaded.threshold, loaded.bands, loaded.rows) == (0.8, index.bands, index.rows)
+    assert len(loaded) == 2 and "story" in loaded and 7 in loaded and "7" not in loaded
+    assert loaded.query(hasher.signature(COPY)) == index.query(hasher.signature(COPY))
+    assert loaded.query(hasher.signature(EDITED)) is None
+
+    # The override threshold and its band layout replace the saved ones
+    loose = LSHIndex.load(path, threshold=0.3)
+    assert (loose.threshold, (loose.bands, loose.rows)) == (0.3, lsh_params(NUM_PERM, 0.3))
+    score = similarity(hasher.signature(STORY), hasher.signature(EDITED))
+    assert 0.3 <= score < 0.8
+    assert loose.query(hasher.signature(EDITED)) == ("story", score)
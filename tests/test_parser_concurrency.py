@@ -0,0 +1,98 @@
+# tests/test_parser_concurrency.py
+'''
+locate() only reads the shared ReferenceData, so running it on many threads (also
+while they race the first, lazy load of the reference data) must give exactly the
+serial results.
+'''
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import Parsing_Tools.parser as P
+
+CITIES = ["Abbottabad", "Faisalabad", "Hyderabad", "Islamabad", "Karachi", "Lahore", "Multan", "Peshawar",
+          "Quetta", "Sukkur", "Dera Ghazi Khan", "Mandi Bahauddin"]
+SENTENCES = [
+    "Heavy rain lashed Lahore on Monday.",
+    "Officials in Karachi said the roads were closed.",
+    "The weather in Quetta stayed dry.",
+    "Prices rose again.",
+    "Schools reopened in Peshawar.",
+    "Multan saw floods.",
+    "A convoy reached Dera Ghazi Khan late at night.",
+]
+
+
+class _Lemmatizer:
+    # Stand-in when the WordNet corpus cannot be loaded (no network)
+    def lemmatize(self, word):
+        return word
+
+
+@pytest.fixture
+def cities_file(tmp_path, monkeypatch):
+    # Every first letter needs a range in the gazetteer index: pad it with a name
+    # at both ends of each letter, around the real locations
+    names = set(CITIES)
+    for letter in "abcdefghijklmnopqrstuvwxyz":
+        names.update({f"{letter.upper()}aaplace", f"{letter.upper()}zzplace"})
+    path = tmp_path / "cities.csv"
+    path.write_text("Locations\n" + "\n".join(sorted(names)) + "\n")
+    monkeypatch.setattr(P, "CITIES_FILE", str(path))
+    return path
+
+
+@pytest.fixture(autouse=True)
+def lemmatizer(monkeypatch):
+    try:
+        P.WordNetLemmatizer().lemmatize("warm")
+    except LookupError:
+        monkeypatch.setattr(P, "_lemmatizer", _Lemmatizer())
+        P.lemmatize.cache_clear()
+        P._clean_lexeme.cache_clear()
+    yield
+    P.lemmatize.cache_clear()
+    P._clean_lexeme.cache_clear()
+
+
+def _articles(n=300, seed=1):
+    rng = random.Random(seed)
+    return [
+        (" ".join(rng.choice(SENTENCES) for _ in range(rng.randint(3, 15))), rng.choice(SENTENCES))
+        for _ in range(n)
+    ]
+
+
+def _results(results):
+    return [(r.city, r.cities) for r in results]
+
+
+def test_locate_threads_match_serial(cities_file):
+    articles = _articles()
+    p = P.parser()
+    serial = _results(p.locate(text, header) for text, header in articles)
+    with ThreadPoolExecutor(16) as pool:
+        threaded = _results(pool.map(lambda a: p.locate(*a), articles))
+    assert threaded == serial
+    if "tagger" in P.nlp.pipe_names or "morphologizer" in P.nlp.pipe_names:
+        # With a real tagger the proper nouns are found, the comparison is not vacuous
+        assert any(city != "null" for city, _ in serial)
+
+
+def test_threads_racing_first_reference_load(cities_file, monkeypatch):
+    articles = _articles(seed=2)
+    serial = _results(P.parser().locate(text, header) for text, header in articles)
+
+    loads = []
+    load = P.ReferenceData.load.__func__
+    monkeypatch.setattr(P.ReferenceData, "load", classmethod(lambda cls, file: loads.append(file) or load(cls, file)))
+    fresh = P.parser()
+    start = threading.Barrier(16)
+    with ThreadPoolExecutor(16) as pool:
+        # The first 16 calls start together, all of them hitting the unloaded reference
+        first = list(pool.map(lambda a: (start.wait(), fresh.locate(*a))[1], articles[:16]))
+        rest = list(pool.map(lambda a: fresh.locate(*a), articles[16:]))
+    assert _results(first + rest) == serial
+    assert len(loads) == 1
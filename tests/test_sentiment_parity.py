@@ -0,0 +1,77 @@
+# tests/test_sentiment_parity.py
+'''
+BatchSentimentScorer reimplements the VADER and pattern rule passes on a shared
+tokenization, so it has to give the numbers of SentimentIntensityAnalyzer.polarity_scores
+and TextBlob(text).sentiment for every rule those passes apply.
+'''
+import random
+
+import pytest
+from textblob import TextBlob
+
+from Parsing_Tools.sentiment import BatchSentimentScorer, get_vader, get_sentiment, get_sentiment_bulk
+
+CASES = [
+    # negation
+    "The movie was not good at all.",
+    "It isn't bad, and I wouldn't say it was terrible.",
+    "Never so happy in my life.",
+    "This was never this good before, without doubt.",
+    # "but"
+    "The food was great but the service was awful.",
+    "It was good but the ending was TERRIBLE!!!",
+    # capitals and boosters
+    "The team is VERY GOOD and the coach is extremely happy.",
+    "GREAT match, HORRIBLE referee.",
+    "The results were somewhat disappointing, kind of sad really.",
+    # idioms and "least"
+    "That concert was the bomb, yeah right.",
+    "He got the cut the mustard award, a badass result.",
+    "It was the least good option we had.",
+    "At least the weather was nice.",
+    # emoji, emoticons and punctuation emphasis
+    "Great!!! :D <3",
+    "He is NOT happy ;-(",
+    "What a day :) :( (!)",
+    "Really??? Is that all?!?!",
+    "I love it \U0001F600 \U0001F44D",
+    # paragraphs, empty and neutral text
+    "Flood waters rose overnight.\n\nResidents were rescued safely!\n\n) Officials praised the teams.",
+    "",
+    "The meeting is scheduled for Tuesday.",
+]
+
+WORDS = [
+    "good", "bad", "not", "very", "never", "but", "GREAT", "terrible", "happy", "sad", "least",
+    "kind", "of", "the", "bomb", "!!!", ":)", ":(", "so", "this", "isn't", "extremely", "police",
+    "flood", "rescued", "killed", "peace", "protest", "?", "love", "hate", "no", "without", "doubt",
+]
+
+
+def _corpus(n=300, seed=7):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 25))) for _ in range(n)]
+
+
+@pytest.fixture(scope="module")
+def scorer():
+    return BatchSentimentScorer()
+
+
+@pytest.mark.parametrize("texts", [CASES, _corpus()], ids=["rules", "random"])
+def test_vader_matches_polarity_scores(scorer, texts):
+    vader = get_vader()
+    for text, scores in zip(texts, scorer.vader_scores(texts)):
+        expected = vader.polarity_scores(text)
+        for key in ("neg", "neu", "pos", "compound"):
+            assert scores[key] == pytest.approx(expected[key], abs=1e-9), (text, key)
+
+
+@pytest.mark.parametrize("texts", [CASES, _corpus()], ids=["rules", "random"])
+def test_textblob_matches_sentiment(scorer, texts):
+    for text, polarity in zip(texts, scorer.textblob_scores(texts)):
+        assert polarity == pytest.approx(TextBlob(text).sentiment.polarity, abs=1e-9), text
+
+
+def test_bulk_matches_single():
+    assert get_sentiment_bulk(CASES) == pytest.approx([get_sentiment(t) for t in CASES], abs=1e-9)
@@ -0,0 +1,100 @@
+# tests/test_sketches.py
+'''
+SpaceSaving never under-counts and over-counts a key by at most its error (itself
+at most N / capacity); SlidingTopK forgets buckets that slid out of the window; and
+trending articles fed by the index are counted at their own date.
+'''
+import random
+from collections import Counter
+from datetime import date, datetime, timezone
+
+import pytest
+
+from services.aspect_service import nlp
+from services.trending_service import TrendingService, article_ts
+from utils.sketches import SpaceSaving, SlidingTopK
+
+
+def _stream(n=20000, keys=500, seed=5):
+    # Zipf-like: a few heavy hitters and a long tail
+    rng = random.Random(seed)
+    weights = [1 / (i + 1) for i in range(keys)]
+    return rng.choices([f"k{i}" for i in range(keys)], weights=weights, k=n)
+
+
+def _check_bounds(sketch, truth):
+    n = sum(truth.values())
+    assert sketch.total == n
+    for key, count in sketch.counts.items():
+        error = sketch.errors[key]
+        assert count - error <= truth[key] <= count
+        assert error <= n / sketch.capacity
+    # Every key above N / capacity is tracked
+    for key, count in truth.items():
+        if count > n / sketch.capacity:
+            assert key in sketch.counts
+
+
+def _summary(stream, capacity=100):
+    sketch = SpaceSaving(capacity)
+    sketch.update(stream)
+    return sketch
+
+
+@pytest.mark.parametrize("capacity", [20, 50, 200])
+def test_space_saving_error_bounds(capacity):
+    stream = _stream()
+    sketch = _summary(stream, capacity)
+    assert len(sketch) == capacity
+    _check_bounds(sketch, Counter(stream))
+    top = [key for key, _, _ in sketch.top(3)]
+    assert top == ["k0", "k1", "k2"]
+
+
+def test_merged_summaries_keep_bounds():
+    left, right = _stream(seed=1), _stream(seed=2)
+    merged = SpaceSaving(100).merge(_summary(left)).merge(_summary(right))
+    _check_bounds(merged, Counter(left) + Counter(right))
+
+
+def test_top_cache_follows_updates():
+    sketch = SpaceSaving(10)
+    sketch.update(["a", "a", "b", "c"])
+    assert sketch.top(1) == [("a", 2, 0)]
+    assert sketch.top(2) == [("a", 2, 0), ("b", 1, 0)]
+    sketch.update(["b", "b"])
+    assert sketch.top(1) == [("b", 3, 0)]
+    assert [key for key, _, _ in sketch.top(10)] == ["b", "a", "c"]
+
+
+def test_sliding_window_expiry():
+    window = SlidingTopK(bucket_seconds=10, n_buckets=3, capacity=10)
+    window.add(["old", "both"], ts=0)
+    window.add(["new", "both"], ts=25)
+    assert dict((k, c) for k, c, _ in window.top(10)) == {"old": 1, "both": 2, "new": 1}
+    # Bucket 0 is out of the window of buckets 1-3
+    assert dict((k, c) for k, c, _ in window.top(10, now=31)) == {"both": 1, "new": 1}
+    # Too old for the window: ignored
+    window.add(["late"], ts=5)
+    assert "late" not in dict((k, c) for k, c, _ in window.top(10))
+    assert window.top(10, now=100) == [] and window.total == 0
+
+
+def test_article_ts():
+    now = datetime(2024, 3, 10, 15, 0, tzinfo=timezone.utc).timestamp()
+    assert article_ts("2024-03-10", now) == now
+    assert article_ts(date(2024, 3, 8), now) == datetime(2024, 3, 8, 23, 59, 59, tzinfo=timezone.utc).timestamp()
+
+
+def test_index_fed_articles_use_their_date():
+    service = TrendingService()
+    now = datetime(2024, 3, 10, 15, 0, tzinfo=timezone.utc).timestamp()
+    docs = list(nlp.pipe(["Floods in Lahore.", "Rain in Karachi.", "Lahore again."]))
+    assert service.observe_docs(docs, ["2024-03-10", "2024-03-02", "2024-03-09"], ts=now) == 3
+
+    def locations(window):
+        return {item["key"]: item["count"] for item in service.top("location", window, now=now)["items"]}
+
+    assert locations("hour") == {"Lahore": 1}
+    assert locations("day") == {"Lahore": 2}
+    assert locations("week") == {"Lahore": 2}
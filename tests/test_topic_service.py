@@ -0,0 +1,61 @@
+# tests/test_topic_service.py
+'''
+Topic model registry: ids are validated before anything is read from disk, num_words
+does not make a new model, and only the most recently used model files are kept.
+'''
+import os
+import time
+
+import pytest
+
+from services.topic_service import TopicService, READY
+
+ARTICLES = [
+    "flood water rain river rescue relief camp",
+    "cricket match wicket batsman bowler stadium",
+    "flood rain river relief monsoon water",
+    "cricket stadium innings bowler match",
+] * 3
+
+
+def _wait(service, model_id):
+    for _ in range(200):
+        status = service.status(model_id)
+        if status["status"] not in ("pending", "running"):
+            return status
+        time.sleep(0.05)
+    raise AssertionError(f"{model_id} still {status['status']}")
+
+
+def _fit(service, articles=ARTICLES, **params):
+    params = dict({"num_topics": 2, "min_df": 1}, **params)
+    model_id = service.fit(articles, **params)["model_id"]
+    assert _wait(service, model_id)["status"] == READY
+    return model_id
+
+
+@pytest.mark.parametrize("model_id", ["../../etc/passwd", "0123456789ABCDEF", "0123", "0123456789abcdefg", ""])
+def test_invalid_model_id_is_unknown(tmp_path, model_id):
+    service = TopicService(str(tmp_path))
+    with pytest.raises(KeyError):
+        service.status(model_id)
+    with pytest.raises(KeyError):
+        service.topics(model_id)
+
+
+def test_num_words_is_not_part_of_the_id(tmp_path):
+    service = TopicService(str(tmp_path))
+    model_id = _fit(service, num_words=3)
+    assert service.fit(ARTICLES, num_topics=2, min_df=1, num_words=5)["model_id"] == model_id
+    assert [len(words) for words in service.topics(model_id)] == [3, 3]
+    assert [len(words) for words in service.topics(model_id, 5)] == [5, 5]
+
+
+def test_keeps_most_recently_used_files(tmp_path):
+    service = TopicService(str(tmp_path), cache_size=1, keep=2)
+    ids = [_fit(service, ARTICLES + [f"extra article {i}"]) for i in range(4)]
+    files = sorted(name[:-len(".joblib")] for name in os.listdir(tmp_path))
+    # The cached model is not counted against `keep`
+    assert files == sorted(ids[1:])
+    with pytest.raises(KeyError):
+        service.status(ids[0])
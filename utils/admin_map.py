@@ -0,0 +1,59 @@
+# utils/admin_map.py
+'''
+Province -> cities map used to place a location in Pakistan's administrative divisions.
+Shared by LocationService (admin mapping of extracted locations) and the parser's
+results store (province partition of every parsed article).
+'''
+
+PROVINCE_CITIES = {
+    "Punjab": [
+        "Lahore", "Rawalpindi", "Faisalabad", "Multan", "Gujranwala",
+        "Sialkot", "Sargodha", "Bahawalpur", "Rahim Yar Khan",
+        "Sheikhupura", "Kasur", "Okara", "Sahiwal", "Jhang",
+        "Toba Tek Singh", "Mianwali", "Attock", "Chakwal",
+        "Gujrat", "Mandi Bahauddin", "Muzaffargarh", "Dera Ghazi Khan",
+        "Pakpattan", "Vehari", "Khanewal", "Hafizabad",
+        "Nankana Sahib", "Layyah", "Burewala", "Sadiqabad",
+        "Khanpur", "Kot Momin", "Arifwala", "Wazirabad",
+        "Sambrial", "Kharian", "Jhelum"
+    ],
+    "Sindh": [
+        "Karachi", "Hyderabad", "Sukkur", "Larkana", "Mirpur Khas",
+        "Nawabshah", "Thatta", "Badin", "Dadu", "Jamshoro",
+        "Jacobabad", "Ghotki", "Khairpur", "Shikarpur", "Sanghar",
+        "Kashmore", "Umerkot", "Tando Allahyar", "Tando Muhammad Khan",
+        "Kotri", "Mirpur Mathelo", "Ranipur", "Qambar",
+        "Shahdadkot", "Tando Adam", "Manzoor Colony (Karachi)",
+        "Sultanabad (Karachi)", "Kehkeshan (Karachi)"
+    ],
+    "KPK": [
+        "Peshawar", "Mardan", "Swat", "Mingora", "Abbottabad",
+        "Mansehra", "Haripur", "Swabi", "Nowshera", "Charsadda",
+        "Kohat", "Dera Ismail Khan", "Bannu", "Battagram",
+        "Buner", "Lower Dir", "Upper Dir", "Chitral",
+        "Batkhela", "Karak", "Hangu", "Shangla",
+        "Pattan", "Banda", "Razar", "Beka",
+        "Gandaf", "Arkot", "Bandi Shungli"
+    ],
+    "Balochistan": [
+        "Quetta", "Gwadar", "Turbat", "Khuzdar", "Hub",
+        "Chaman", "Pishin", "Sibi", "Zhob",
+        "Loralai", "Kalat", "Panjgur", "Ormara",
+        "Dera Murad Jamali", "Usta Muhammad", "Kharan",
+        "Awaran", "Lasbela"
+    ]
+}
+
+# lowercased province or city -> province
+_PROVINCE_OF = {}
+for _province, _cities in PROVINCE_CITIES.items():
+    _PROVINCE_OF[_province.lower()] = _province
+    for _city in _cities:
+        _PROVINCE_OF.setdefault(_city.lower(), _province)
+
+
+def province_of(location):
+    """Province of a province or city name (case-insensitive), None when unknown."""
+    if not location or not isinstance(location, str):
+        return None
+    return _PROVINCE_OF.get(location.strip().lower())
@@ -0,0 +1,114 @@
+# utils/downsample.py
+'''
+Server-side downsampling for plotData series.
+Trend endpoints return one point per sentence; charts cannot show more points than
+they have pixels, so long series are reduced to `max_points` points that keep the
+visual shape (peaks and dips) of the original series.
+'''
+import numpy as np
+
+
+# ---------------------
+# SELECTION ALGORITHMS (return indices into the series)
+# ---------------------
+def lttb_indices(x, y, threshold):
+    """Largest-Triangle-Three-Buckets: `threshold` indices preserving the shape of (x, y)."""
+    n = len(y)
+    if threshold >= n:
+        return np.arange(n)
+    if threshold < 3:
+        return np.array([0, n - 1][:max(threshold, 1)])
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # First and last points are always kept, the rest is split into buckets
+    every = (n - 2) / (threshold - 2)
+    edges = (np.arange(threshold - 1) * every).astype(np.int64) + 1
+    edges[-1] = n - 1
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average of the next bucket (or the last point for the final bucket)
+        next_start = end
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        # Triangle area between the previously selected point, each candidate
+        # in this bucket and the average of the next bucket
+        areas = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(y, threshold):
+    """Min/max binning: the lowest and highest point of each bin, plus both ends."""
+    n = len(y)
+    if threshold >= n:
+        return np.arange(n)
+    y = np.asarray(y, dtype=float)
+    # Two points per bin plus the two ends must fit in `threshold`
+    bins = (threshold - 2) // 2
+    if bins < 1:
+        return np.array([0, n - 1][:max(threshold, 1)])
+    edges = np.linspace(1, n - 1, bins + 1).astype(np.int64)
+    keep = [0, n - 1]
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end <= start:
+            continue
+        chunk = y[start:end]
+        keep.append(start + int(np.argmin(chunk)))
+        keep.append(start + int(np.argmax(chunk)))
+    return np.unique(keep)
+
+
+# ---------------------
+# AXIS ENCODING
+# ---------------------
+def encode_range(x):
+    """{"start", "step", "count"} for an evenly spaced integer axis, None otherwise."""
+    if not isinstance(x, list) or not x:
+        return None
+    if not all(isinstance(v, int) for v in x[:2]):
+        return None
+    step = x[1] - x[0] if len(x) > 1 else 1
+    if step == 0 or any(b - a != step for a, b in zip(x, x[1:])):
+        return None
+    return {"start": x[0], "step": step, "count": len(x)}
+
+
+# ---------------------
+# PLOT DATA
+# ---------------------
+def downsample_point(point, max_points=None, method="lttb", compact_x=False):
+    """Downsample one plotData series in place and optionally encode its x axis compactly."""
+    y = point["y"]
+    x = point["x"]
+    if max_points and len(y) > max_points:
+        if method == "minmax":
+            idx = minmax_indices(y, max_points)
+        else:
+            idx = lttb_indices(x, y, max_points)
+        point["x"] = [x[i] for i in idx]
+        point["y"] = [y[i] for i in idx]
+    if compact_x:
+        encoded = encode_range(point["x"])
+        if encoded is not None:
+            point["x"] = encoded
+    return point
+
+
+def downsample_plot(result, max_points=None, method="lttb", compact_x=False):
+    """Apply downsample_point to every series of a {"plotData": [...]} response."""
+    if not max_points and not compact_x:
+        return result
+    for point in result.get("plotData", []):
+        downsample_point(point, max_points, method, compact_x)
+    return result
@@ -0,0 +1,126 @@
+# utils/keyword_matcher.py
+'''
+Multi-pattern keyword counting (Aho-Corasick).
+One automaton is compiled per keyword set and cached, so every text is scanned once
+no matter how many keywords are watched. Counts follow str.count semantics
+(non-overlapping occurrences of each keyword), optionally restricted to whole words.
+Uses the pyahocorasick C extension when installed, a pure-Python automaton otherwise.
+'''
+from collections import deque
+from functools import lru_cache
+from typing import List, Tuple
+
+try:
+    import ahocorasick
+except Exception:
+    ahocorasick = None
+
+
+class _PyAutomaton:
+    """Minimal pure-Python Aho-Corasick with the same iter() contract as pyahocorasick."""
+
+    def __init__(self):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+
+    def add_word(self, word, value):
+        node = 0
+        for ch in word:
+            nxt = self.goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+            node = nxt
+        self.out[node].append(value)
+
+    def make_automaton(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def iter(self, text):
+        goto, fail, out = self.goto, self.fail, self.out
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for value in out[node]:
+                yield i, value
+
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch == "_"
+
+
+class KeywordMatcher:
+    """Counts every keyword of a fixed set in one pass over a (lowercased) text."""
+
+    def __init__(self, keywords: List[str], whole_word: bool = False):
+        self.keywords = list(keywords)
+        self.whole_word = whole_word
+        # Duplicate keywords share one automaton entry
+        self._slots = {}
+        for i, kw in enumerate(self.keywords):
+            self._slots.setdefault(kw, []).append(i)
+        self._empty = self._slots.pop("", [])
+
+        self._automaton = ahocorasick.Automaton() if ahocorasick else _PyAutomaton()
+        for uid, kw in enumerate(self._slots):
+            self._automaton.add_word(kw, (uid, len(kw)))
+        self._uids = list(self._slots.values())
+        if self._uids:
+            self._automaton.make_automaton()
+
+    def count(self, text: str) -> List[int]:
+        """Occurrence count of every keyword in `text`, in keyword order."""
+        counts = [0] * len(self.keywords)
+        if self._uids:
+            found = [0] * len(self._uids)
+            # End of the last counted match per keyword (non-overlapping counts)
+            next_free = [0] * len(self._uids)
+            whole_word = self.whole_word
+            n = len(text)
+            for end, (uid, length) in self._automaton.iter(text):
+                start = end - length + 1
+                if start < next_free[uid]:
+                    continue
+                if whole_word and (
+                    (start > 0 and _is_word_char(text[start - 1]))
+                    or (end + 1 < n and _is_word_char(text[end + 1]))
+                ):
+                    continue
+                found[uid] += 1
+                next_free[uid] = end + 1
+            for uid, slots in enumerate(self._uids):
+                for i in slots:
+                    counts[i] = found[uid]
+        if self._empty and not self.whole_word:
+            # str.count("") semantics
+            for i in self._empty:
+                counts[i] = len(text) + 1
+        return counts
+
+    def count_bulk(self, texts: List[str]) -> List[List[int]]:
+        return [self.count(t) for t in texts]
+
+
+@lru_cache(maxsize=128)
+def _cached_matcher(keywords: Tuple[str, ...], whole_word: bool) -> KeywordMatcher:
+    return KeywordMatcher(list(keywords), whole_word)
+
+
+def get_matcher(keywords: List[str], whole_word: bool = False) -> KeywordMatcher:
+    """Compiled matcher for a keyword list (matched lowercase), cached per keyword set."""
+    return _cached_matcher(tuple(k.lower() for k in keywords), whole_word)
@@ -0,0 +1,135 @@
+'''
+Fast language routing for the NLP services.
+The English pipelines (spaCy en_core_web_sm, the gazetteer, VADER/TextBlob) produce
+nothing useful on Urdu or other non-English text. detect_language() first builds a
+Unicode script histogram over a prefix of the text; Arabic-script text is told apart
+as Urdu/Persian/Arabic by script-specific letters, and Latin text is scored on
+English, Roman Urdu and other European/Indonesian/Turkish function words. route_bulk() runs an expensive bulk function
+on the English items only and fills the rest with a cheap "unsupported" value.
+'''
+import re
+from collections import Counter
+from functools import lru_cache
+
+SUPPORTED_LANGUAGES = frozenset({"en"})
+# No letters at all (numbers, empty text): nothing to route, the normal path handles it
+UNDETERMINED = "und"
+# Only this many leading characters are looked at
+SAMPLE_CHARS = 2000
+
+SCRIPTS = {
+    "latin": re.compile(r"[A-Za-z\u00C0-\u024F]"),
+    "arabic": re.compile(r"[\u0600-\u06FF\u0750-\u077F\uFB50-\uFDFF\uFE70-\uFEFF]"),
+    "devanagari": re.compile(r"[\u0900-\u097F]"),
+    "cyrillic": re.compile(r"[\u0400-\u04FF]"),
+    "han": re.compile(r"[\u4E00-\u9FFF]"),
+    "kana": re.compile(r"[\u3040-\u30FF]"),
+    "hangul": re.compile(r"[\uAC00-\uD7AF]"),
+}
+SCRIPT_LANGUAGES = {"devanagari": "hi", "cyrillic": "ru", "han": "zh", "kana": "ja", "hangul": "ko"}
+
+# ٹ ڈ ڑ ں ھ ہ ے ۔ only occur in Urdu; پ چ ژ گ in Urdu and Persian, not Arabic
+URDU_LETTERS_RE = re.compile(r"[\u0679\u0688\u0691\u06BA\u06BE\u06C1\u06D2\u06D4]")
+PERSIAN_LETTERS_RE = re.compile(r"[\u067E\u0686\u0698\u06AF]")
+
+# Unicode letters, so accented function words (está, não, için) are matched too
+WORD_RE = re.compile(r"[^\W\d_]+")
+ENGLISH_WORDS = frozenset(
+    "the of and to in a is that for on with as was were by at from it he she they his her their this be has have had "
+    "are not or but an which will said after over into who been would also its than more about".split()
+)
+ROMAN_URDU_WORDS = frozenset(
+    "hai hain ka ki ke ko se mein aur nahi nahin kya yeh ye woh wo bhi tha thi thay hum tum ap aap kar "
+    "karna raha rahi gaya gayi liye lekin agar phir kuch sab".split()
+)
+# Function words of other Latin-script languages (Spanish, French, Portuguese, Italian,
+# German, Dutch, Indonesian/Malay, Turkish); none of them is an English word
+OTHER_LATIN_WORDS = frozenset(
+    "el los las del de la por una para que y es está pero como más "
+    "les des du et une dans pas sur qui avec ce cette sont nous vous "
+    "não uma são também foi pelo pela "
+    "della di che sono gli è anche "
+    "der das und ist nicht mit sich auf dem ein eine zu auch "
+    "het niet zijn ook "
+    "yang ini itu dengan untuk tidak dari dalam ada "
+    "ve bir bu için ile olarak çok".split()
+)
+# Latin text shorter than this many words is taken as English (too short to tell)
+MIN_WORDS = 4
+
+
+def script_histogram(text):
+    """Letter counts per script over the leading SAMPLE_CHARS characters."""
+    if not isinstance(text, str):
+        return Counter()
+    sample = text[:SAMPLE_CHARS]
+    counts = Counter()
+    for script, pattern in SCRIPTS.items():
+        n = len(pattern.findall(sample))
+        if n:
+            counts[script] = n
+    return counts
+
+
+def _latin_language(sample):
+    words = WORD_RE.findall(sample.lower())
+    if len(words) < MIN_WORDS:
+        return "en"
+    english = sum(w in ENGLISH_WORDS for w in words) / len(words)
+    urdu = sum(w in ROMAN_URDU_WORDS for w in words) / len(words)
+    if urdu > english and urdu >= 0.1:
+        return "ur-Latn"
+    # Only positive evidence routes Latin text away: lists of names or tags have
+    # almost no function words of any language and stay English
+    other = sum(w in OTHER_LATIN_WORDS for w in words) / len(words)
+    if other > english and other >= 0.1:
+        return "other"
+    return "en"
+
+
+# Keyed on the sample only, so the cache never holds more than SAMPLE_CHARS per entry
+@lru_cache(maxsize=20000)
+def _detect(sample):
+    histogram = script_histogram(sample)
+    if not histogram:
+        return UNDETERMINED
+    script = histogram.most_common(1)[0][0]
+    if script == "latin":
+        return _latin_language(sample)
+    if script == "arabic":
+        if URDU_LETTERS_RE.search(sample):
+            return "ur"
+        return "fa" if PERSIAN_LETTERS_RE.search(sample) else "ar"
+    return SCRIPT_LANGUAGES.get(script, "other")
+
+
+def detect_language(text):
+    """Language code of `text`: "en", "ur", "ur-Latn", "ar", "fa", "hi", ..., or "und"."""
+    if not isinstance(text, str):
+        return UNDETERMINED
+    return _detect(text[:SAMPLE_CHARS])
+
+
+def is_supported(text):
+    language = detect_language(text)
+    return language == UNDETERMINED or language in SUPPORTED_LANGUAGES
+
+
+def language_counts(texts):
+    """{language: number of texts} for a batch."""
+    return dict(Counter(detect_language(t) for t in texts))
+
+
+def route_bulk(texts, process, unsupported):
+    """
+    Results of `process` (a list -> list function) for the supported texts, in order,
+    with `unsupported()` in place of every other text.
+    """
+    supported = [i for i, t in enumerate(texts) if is_supported(t)]
+    if len(supported) == len(texts):
+        return process(texts)
+    results = [unsupported() for _ in texts]
+    if supported:
+        for i, result in zip(supported, process([texts[i] for i in supported])):
+            results[i] = result
+    return results
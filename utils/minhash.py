@@ -0,0 +1,202 @@
+# utils/minhash.py
+'''
+MinHash signatures and an LSH index for near-duplicate article detection.
+Text is lowercased, split into words and shingled into overlapping word n-grams.
+Every shingle is hashed with CRC32, which is stable across processes, so saved
+signatures stay valid. A signature keeps, for each of `num_perm` random hash
+functions (a * x + b) mod p, the minimum over the shingles. The share of equal
+signature positions estimates the Jaccard similarity of two shingle sets.
+LSH cuts a signature into `bands` bands of `rows` values. Texts that agree on a
+whole band share a bucket, so they become candidates without comparing every pair.
+Candidates are confirmed on the estimated similarity.
+'''
+import re
+import zlib
+
+import numpy as np
+
+NUM_PERM = 128
+SHINGLE_SIZE = 3
+THRESHOLD = 0.8
+SEED = 1
+
+# Hash values and permutation coefficients stay below this prime, so a * x + b fits in uint64
+_PRIME = np.uint64((1 << 31) - 1)
+_EMPTY = np.uint32((1 << 32) - 1)
+_WORD_RE = re.compile(r"\w+")
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """CRC32 hashes of the word `size`-grams of `text` (the whole text when it is shorter)."""
+    if not isinstance(text, str):
+        return np.zeros(0, dtype=np.uint64)
+    words = _WORD_RE.findall(text.lower())
+    if not words:
+        return np.zeros(0, dtype=np.uint64)
+    grams = {" ".join(words[i:i + size]) for i in range(max(1, len(words) - size + 1))}
+    return np.fromiter((zlib.crc32(g.encode("utf8")) for g in grams), dtype=np.uint64, count=len(grams))
+
+
+def lsh_params(num_perm=NUM_PERM, threshold=THRESHOLD):
+    """
+    (bands, rows) with bands * rows == num_perm whose S-curve midpoint (1/b)^(1/r) is
+    the highest one not above `threshold`: candidates are confirmed on the signatures
+    anyway, so erring low only costs comparisons while erring high misses duplicates.
+    """
+    pairs = [(num_perm // r, r) for r in range(1, num_perm + 1) if num_perm % r == 0]
+    midpoint = lambda p: (1.0 / p[0]) ** (1.0 / p[1])
+    below = [p for p in pairs if midpoint(p) <= threshold]
+    return max(below, key=midpoint) if below else min(pairs, key=midpoint)
+
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of two signatures."""
+    if a[0] == _EMPTY or b[0] == _EMPTY:
+        return 0.0
+    return float(np.mean(a == b))
+
+
+class MinHasher:
+
+    def __init__(self, num_perm=NUM_PERM, shingle_size=SHINGLE_SIZE, seed=SEED):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, int(_PRIME), size=num_perm).astype(np.uint64)
+        self.b = rng.randint(0, int(_PRIME), size=num_perm).astype(np.uint64)
+
+    def signature(self, text):
+        hashes = shingles(text, self.shingle_size)
+        if not len(hashes):
+            # No words: a signature that never matches anything
+            return np.full(self.num_perm, _EMPTY, dtype=np.uint32)
+        hashes %= _PRIME
+        values = (hashes[:, None] * self.a + self.b) % _PRIME
+        return values.min(axis=0).astype(np.uint32)
+
+    def signatures(self, texts):
+        """(len(texts), num_perm) uint32 matrix."""
+        out = np.empty((len(texts), self.num_perm), dtype=np.uint32)
+        for i, text in enumerate(texts):
+            out[i] = self.signature(text)
+        return out
+
+
+def _band_keys(signature, bands, rows):
+    return [signature[i * rows:(i + 1) * rows].tobytes() for i in range(bands)]
+
+
+def _find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def duplicate_groups(signatures, threshold=THRESHOLD):
+    """
+    Groups (lists of row numbers, first row first) of near-duplicate signatures, groups
+    of one left out. Every band bucket is checked against its first member only and
+    confirmed pairs are merged with union-find, so the work stays linear in the batch.
+    """
+    n, num_perm = signatures.shape
+    bands, rows = lsh_params(num_perm, threshold)
+    parent = list(range(n))
+    for band in range(bands):
+        buckets = {}
+        for i in range(n):
+            if signatures[i, 0] == _EMPTY:
+                continue
+            key = signatures[i, band * rows:(band + 1) * rows].tobytes()
+            first = buckets.setdefault(key, i)
+            if first == i:
+                continue
+            a, b = _find(parent, first), _find(parent, i)
+            if a != b and similarity(signatures[first], signatures[i]) >= threshold:
+                parent[max(a, b)] = min(a, b)
+    groups = {}
+    for i in range(n):
+        groups.setdefault(_find(parent, i), []).append(i)
+    return [g for g in groups.values() if len(g) > 1]
+
+
+class LSHIndex:
+
+    def __init__(self, num_perm=NUM_PERM, threshold=THRESHOLD):
+        self.num_perm = num_perm
+        self.threshold = threshold
+        self.bands, self.rows = lsh_params(num_perm, threshold)
+        self.tables = [{} for _ in range(self.bands)]
+        self.keys = []
+        self._positions = {}
+        self._signatures = np.zeros((0, num_perm), dtype=np.uint32)
+        self._size = 0
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __contains__(self, key):
+        return key in self._positions
+
+    def _append(self, signature):
+        if self._size == len(self._signatures):
+            grown = np.zeros((max(1024, 2 * self._size), self.num_perm), dtype=np.uint32)
+            grown[:self._size] = self._signatures[:self._size]
+            self._signatures = grown
+        self._signatures[self._size] = signature
+        self._size += 1
+        return self._size - 1
+
+    def insert(self, key, signature):
+        """Index `signature` under `key`; a key already indexed is left as it is."""
+        if key in self._positions or signature[0] == _EMPTY:
+            return False
+        position = self._append(signature)
+        self.keys.append(key)
+        self._positions[key] = position
+        for table, band_key in zip(self.tables, _band_keys(signature, self.bands, self.rows)):
+            table.setdefault(band_key, []).append(position)
+        return True
+
+    def query(self, signature):
+        """(key, similarity) of the most similar indexed signature at or above the threshold, or None."""
+        if signature[0] == _EMPTY:
+            return None
+        candidates = set()
+        for table, band_key in zip(self.tables, _band_keys(signature, self.bands, self.rows)):
+            candidates.update(table.get(band_key, ()))
+        best = None
+        for position in candidates:
+            score = similarity(self._signatures[position], signature)
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (self.keys[position], score)
+        return best
+
+    def save(self, path):
+        # Keys are saved as text; int keys are flagged so they load back as ints
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                keys=np.array([str(key) for key in self.keys], dtype=str),
+                int_keys=np.array([isinstance(key, int) for key in self.keys], dtype=bool),
+                signatures=self._signatures[:self._size],
+                params=np.array([self.num_perm, self.threshold], dtype=np.float64),
+            )
+        return path
+
+    @staticmethod
+    def load(path, threshold=None):
+        """
+        Index saved at `path`. With `threshold`, the index uses it (and its band layout)
+        instead of the threshold it was saved with; the bands are rebuilt from the saved
+        signatures either way.
+        """
+        with np.load(path) as data:
+            num_perm, saved = data["params"]
+            index = LSHIndex(int(num_perm), float(saved) if threshold is None else threshold)
+            keys = data["keys"].tolist()
+            if "int_keys" in data.files:
+                keys = [int(key) if is_int else key for key, is_int in zip(keys, data["int_keys"].tolist())]
+            for key, signature in zip(keys, data["signatures"]):
+                index.insert(key, signature)
+        return index
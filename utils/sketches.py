@@ -0,0 +1,128 @@
+# utils/sketches.py
+'''
+Bounded-memory streaming counters.
+SpaceSaving keeps the approximate heavy hitters of a stream in `capacity` counters
+(every key with true frequency above N / capacity is guaranteed to be tracked).
+SlidingTopK splits time into fixed buckets, keeps one SpaceSaving per bucket and a
+merged summary of the buckets inside the window, so a top-k query only reads that
+one summary, whatever the stream length. The sorted top of a summary is cached until
+its next update, so repeated reads between articles do not rescan the counters.
+'''
+import heapq
+import time
+
+
+class SpaceSaving:
+
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self.counts = {}
+        # Over-estimation inherited from the evicted counter, per key
+        self.errors = {}
+        # Lazy min-heap of (count, key); stale entries are skipped on eviction
+        self._heap = []
+        self.total = 0
+        # (k, [(key, count)]) of the last top() read, dropped on every update
+        self._top = None
+
+    def add(self, key, count=1):
+        self._top = None
+        self.total += count
+        counts = self.counts
+        if key in counts:
+            counts[key] += count
+        elif len(counts) < self.capacity:
+            counts[key] = count
+            self.errors[key] = 0
+        else:
+            # Replace the smallest counter, the newcomer inherits its count as error
+            while True:
+                c, victim = heapq.heappop(self._heap)
+                if counts.get(victim) == c:
+                    break
+            del counts[victim]
+            del self.errors[victim]
+            counts[key] = c + count
+            self.errors[key] = c
+        heapq.heappush(self._heap, (counts[key], key))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(c, k) for k, c in counts.items()]
+            heapq.heapify(self._heap)
+
+    def update(self, keys):
+        for key in keys:
+            self.add(key)
+
+    def merge(self, other):
+        """Fold another summary into this one (counts and errors add up)."""
+        for key, count in other.counts.items():
+            error = other.errors[key]
+            self.add(key, count)
+            self.errors[key] += error
+        self._top = None
+        return self
+
+    def top(self, k=10):
+        """[(key, count, error)] for the k largest counters, largest first."""
+        if self._top is None or (self._top[0] < k and len(self._top[1]) == self._top[0]):
+            self._top = (k, heapq.nlargest(k, self.counts.items(), key=lambda item: item[1]))
+        return [(key, count, self.errors[key]) for key, count in self._top[1][:k]]
+
+    def __len__(self):
+        return len(self.counts)
+
+
+class SlidingTopK:
+    """Heavy hitters over the last `n_buckets` buckets of `bucket_seconds` each."""
+
+    def __init__(self, bucket_seconds=300, n_buckets=12, capacity=1000):
+        self.bucket_seconds = bucket_seconds
+        self.n_buckets = n_buckets
+        self.capacity = capacity
+        self.buckets = {}
+        self.latest = None
+        self._window = SpaceSaving(capacity)
+
+    def _bucket_id(self, ts):
+        return int(ts // self.bucket_seconds)
+
+    def _rebuild(self):
+        window = SpaceSaving(self.capacity)
+        for bucket in self.buckets.values():
+            window.merge(bucket)
+        self._window = window
+
+    def _advance(self, bucket_id):
+        # Drop the buckets that slid out of the window and rebuild its summary
+        self.latest = bucket_id
+        oldest = bucket_id - self.n_buckets + 1
+        expired = [b for b in self.buckets if b < oldest]
+        for b in expired:
+            del self.buckets[b]
+        if expired:
+            self._rebuild()
+
+    def add(self, keys, ts=None):
+        bucket_id = self._bucket_id(time.time() if ts is None else ts)
+        if self.latest is None or bucket_id > self.latest:
+            self._advance(bucket_id)
+        elif bucket_id <= self.latest - self.n_buckets:
+            # Older than the window
+            return
+        bucket = self.buckets.get(bucket_id)
+        if bucket is None:
+            bucket = self.buckets[bucket_id] = SpaceSaving(self.capacity)
+        for key in keys:
+            bucket.add(key)
+            self._window.add(key)
+
+    def top(self, k=10, now=None):
+        if now is not None:
+            bucket_id = self._bucket_id(now)
+            if self.latest is None or bucket_id > self.latest:
+                self._advance(bucket_id)
+        return self._window.top(k)
+
+    @property
+    def total(self):
+        return self._window.total